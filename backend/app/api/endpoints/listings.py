@@ -1,5 +1,7 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
 from typing import List, Optional
+from secrets import token_hex
+from time import time
 from sqlalchemy.orm import Session
 
 from app.schemas.schemas import (
@@ -7,6 +9,7 @@ from app.schemas.schemas import (
     ListingStatus, PaginatedResponse, APIResponse
 )
 from app.repositories import listing_repo
+from app.core.responses import ORJSONResponse
 from app.db.database import get_db
 from app.core.deps import get_current_user
 from app.models.database_models import User
@@ -14,7 +17,7 @@ from app.models.database_models import User
 router = APIRouter()
 
 
-@router.get("", response_model=PaginatedResponse)
+@router.get("", response_class=ORJSONResponse)
 async def get_listings(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -29,48 +32,46 @@ async def get_listings(
     """
     Get listings với pagination, filtering, và search
     """
-    try:
-        # Build filters
-        filters = {}
-        if status:
-            filters["status"] = status
-        if category:
-            filters["category"] = category
-        
-        # Calculate skip value
-        skip = (page - 1) * size
-        
-        # Get listings với repository
-        result = listing_repo.get_multi(
-            db,
-            skip=skip,
-            limit=size,
-            filters=filters,
-            search=search,
-            search_fields=["title", "description", "category", "sku"],
-            sort_by=sort_by,
-            sort_order=sort_order,
-            user_id=current_user.id
-        )
-        
-        # Convert SQLAlchemy models to Pydantic schemas
-        pydantic_listings = [Listing.model_validate(listing) for listing in result["items"]]
-        
-        # Return PaginatedResponse with converted items
-        return {
-            "items": pydantic_listings,
-            "total": result["total"],
-            "page": result["page"],
-            "size": result["size"],
-            "pages": result["pages"],
-            "has_next": result["has_next"],
-            "has_prev": result["has_prev"],
-            "success": True,
-            "message": f"Retrieved {len(pydantic_listings)} listings"
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching listings: {str(e)}")
+    # Build filters
+    filters = {}
+    if status:
+        filters["status"] = status
+    if category:
+        filters["category"] = category
+    
+    # Calculate skip value
+    skip = (page - 1) * size
+    
+    # Get listings với repository
+    result = listing_repo.get_multi(
+        db,
+        skip=skip,
+        limit=size,
+        filters=filters,
+        search=search,
+        search_fields=["title", "description", "category", "sku"],
+        sort_by=sort_by,
+        sort_order=sort_order,
+        user_id=current_user.id,
+        columns_only=True
+    )
+
+    # Rows come back as plain dicts - one pass through orjson, no
+    # per-item pydantic validation and no jsonable_encoder walk
+    listings_data = result["items"]
+
+    return ORJSONResponse({
+        "items": listings_data,
+        "total": result["total"],
+        "page": result["page"],
+        "size": result["size"],
+        "pages": result["pages"],
+        "has_next": result["has_next"],
+        "has_prev": result["has_prev"],
+        "success": True,
+        "message": f"Retrieved {len(listings_data)} listings"
+    })
+    
 
 
 @router.get("/{listing_id}", response_model=Listing)
@@ -82,22 +83,17 @@ async def get_listing(
     """
     Get a specific listing by ID
     """
-    try:
-        listing = listing_repo.get(db, id=listing_id)
-        
-        if not listing:
-            raise HTTPException(status_code=404, detail="Listing not found")
-        
-        # Check ownership
-        if listing.user_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Not authorized to access this listing")
-        
-        return listing
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching listing: {str(e)}")
+    listing = listing_repo.get(db, id=listing_id)
+    
+    if not listing:
+        raise HTTPException(status_code=404, detail="Listing not found")
+    
+    # Check ownership
+    if listing.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this listing")
+    
+    return listing
+    
 
 
 @router.post("", response_model=Listing)
@@ -109,27 +105,22 @@ async def create_listing(
     """
     Create a new listing
     """
-    try:
-        # Generate unique ID
-        from datetime import datetime
-        import uuid
-        listing_id = f"listing_{int(datetime.now().timestamp())}_{str(uuid.uuid4())[:8]}"
-        
-        # Create listing data
-        listing_data = listing.model_dump()
-        listing_data['id'] = listing_id
-        
-        # Create listing với repository
-        new_listing = listing_repo.create(
-            db, 
-            obj_in=listing_data, 
-            user_id=current_user.id
-        )
-        
-        return new_listing
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error creating listing: {str(e)}")
+    # Generate unique ID
+    listing_id = f"listing_{int(time())}_{token_hex(4)}"
+    
+    # Create listing data
+    listing_data = listing.model_dump()
+    listing_data['id'] = listing_id
+    
+    # Create listing với repository
+    new_listing = listing_repo.create(
+        db, 
+        obj_in=listing_data, 
+        user_id=current_user.id
+    )
+    
+    return new_listing
+    
 
 
 @router.put("/{listing_id}", response_model=Listing)
@@ -142,30 +133,25 @@ async def update_listing(
     """
     Update an existing listing
     """
-    try:
-        # Get current listing
-        current_listing = listing_repo.get(db, id=listing_id)
-        
-        if not current_listing:
-            raise HTTPException(status_code=404, detail="Listing not found")
-        
-        # Check ownership
-        if current_listing.user_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Not authorized to update this listing")
-        
-        # Update listing
-        updated_listing = listing_repo.update(
-            db,
-            db_obj=current_listing,
-            obj_in=listing_update
-        )
-        
-        return updated_listing
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error updating listing: {str(e)}")
+    # Get current listing
+    current_listing = listing_repo.get(db, id=listing_id)
+    
+    if not current_listing:
+        raise HTTPException(status_code=404, detail="Listing not found")
+    
+    # Check ownership
+    if current_listing.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to update this listing")
+    
+    # Update listing
+    updated_listing = listing_repo.update(
+        db,
+        db_obj=current_listing,
+        obj_in=listing_update
+    )
+    
+    return updated_listing
+    
 
 
 @router.delete("/{listing_id}", response_model=APIResponse)
@@ -177,34 +163,28 @@ async def delete_listing(
     """
     Archive a listing (soft delete)
     """
-    try:
-        # Get current listing
-        current_listing = listing_repo.get(db, id=listing_id)
-        
-        if not current_listing:
-            raise HTTPException(status_code=404, detail="Listing not found")
-        
-        # Check ownership
-        if current_listing.user_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Not authorized to delete this listing")
-        
-        # Archive listing (soft delete)
-        from app.schemas.schemas import ListingUpdate
-        listing_repo.update(
-            db,
-            db_obj=current_listing,
-            obj_in=ListingUpdate(status=ListingStatus.ARCHIVED)
-        )
-        
-        return APIResponse(
-            success=True,
-            message="Listing archived successfully"
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error archiving listing: {str(e)}")
+    # Get current listing
+    current_listing = listing_repo.get(db, id=listing_id)
+    
+    if not current_listing:
+        raise HTTPException(status_code=404, detail="Listing not found")
+    
+    # Check ownership
+    if current_listing.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to delete this listing")
+    
+    # Archive listing (soft delete)
+    listing_repo.update(
+        db,
+        db_obj=current_listing,
+        obj_in=ListingUpdate(status=ListingStatus.ARCHIVED)
+    )
+    
+    return APIResponse(
+        success=True,
+        message="Listing archived successfully"
+    )
+    
 
 
 @router.get("/statistics", response_model=APIResponse)
@@ -215,17 +195,14 @@ async def get_statistics(
     """
     Get listing statistics for current user
     """
-    try:
-        stats = listing_repo.get_statistics(db, user_id=current_user.id)
-        
-        return APIResponse(
-            success=True,
-            message="Statistics retrieved successfully",
-            data=stats
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error getting statistics: {str(e)}")
+    stats = listing_repo.get_statistics(db, user_id=current_user.id)
+    
+    return APIResponse(
+        success=True,
+        message="Statistics retrieved successfully",
+        data=stats
+    )
+    
 
 
 @router.get("/search", response_model=PaginatedResponse)
@@ -239,21 +216,18 @@ async def search_listings(
     """
     Search listings by title, description, category, SKU
     """
-    try:
-        skip = (page - 1) * size
-        
-        result = listing_repo.search_listings(
-            db,
-            search=search,
-            user_id=current_user.id,
-            skip=skip,
-            limit=size
-        )
-        
-        return result
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error searching listings: {str(e)}")
+    skip = (page - 1) * size
+    
+    result = listing_repo.search_listings(
+        db,
+        search=search,
+        user_id=current_user.id,
+        skip=skip,
+        limit=size
+    )
+    
+    return result
+    
 
 
 @router.post("/sync", response_model=APIResponse)
@@ -264,16 +238,13 @@ async def sync_listings(
     """
     Sync listings with Google Sheets
     """
-    try:
-        # Simulate sync process
-        return APIResponse(
-            success=True,
-            message="Listings sync initiated successfully",
-            data={"status": "syncing", "message": "Sync process started"}
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error syncing listings: {str(e)}")
+    # Simulate sync process
+    return APIResponse(
+        success=True,
+        message="Listings sync initiated successfully",
+        data={"status": "syncing", "message": "Sync process started"}
+    )
+    
 
 
 @router.post("/bulk-update", response_model=APIResponse)
@@ -285,28 +256,15 @@ async def bulk_update_listings(
     """
     Bulk update multiple listings
     """
-    try:
-        # Validate ownership for all listings
-        listing_ids = [update.get("id") for update in updates if "id" in update]
-        
-        for listing_id in listing_ids:
-            listing = listing_repo.get(db, id=listing_id)
-            if not listing or listing.user_id != current_user.id:
-                raise HTTPException(
-                    status_code=403, 
-                    detail=f"Not authorized to update listing {listing_id}"
-                )
-        
-        # Perform bulk update
-        result = listing_repo.bulk_update(db, updates=updates)
-        
-        return APIResponse(
-            success=True,
-            message=f"Bulk update completed: {result['success']} successful, {result['failed']} failed",
-            data=result
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error in bulk update: {str(e)}")
\ No newline at end of file
+    # Ownership check folded into mỗi UPDATE ... RETURNING - rows không
+    # thuộc về user được report trong failed_ids thay vì drop âm thầm
+    result = listing_repo.bulk_update_owned(
+        db, updates=updates, user_id=current_user.id
+    )
+    
+    return APIResponse(
+        success=True,
+        message=f"Bulk update completed: {result['success']} successful, {result['failed']} failed",
+        data=result
+    )
+    
@@ -1,4 +1,9 @@
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from typing import List, Dict, Any, Optional
 from enum import Enum
 
@@ -7,14 +12,47 @@ from app.models.listing import (
     BulkOptimizationRequest, BulkOptimizationResponse,
     ListingStatus
 )
-from app.core.optimizer import EbayOptimizer
+from app.core.deps import get_optimizer, get_sheets_service
+from app.core.opt_cache import get_or_compute, make_key
+from app.core.optimizer import EbayOptimizer, keywords_cache_info, POWER_WORDS
+from app.core.responses import ORJSONResponse, conditional_response
 from app.core.strategies.optimization_strategies import OptimizationType
 from app.core.strategies.export_strategies import ExportFormat
 from app.services.google_sheets import GoogleSheetsService
 
-router = APIRouter()
-optimizer = EbayOptimizer()
-sheets_service = GoogleSheetsService()
+# orjson serialization cho mọi response của router - đáng kể với các
+# bulk payload nhiều description dài
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Optimizer/sheets singletons sống trên app.state (khởi tạo + warm trong
+# lifespan) và inject qua Depends - import router không còn chạm I/O
+
+# Precomputed cho hot path: set-membership trên tokens thay vì
+# substring-scan O(N·M) qua power_words mỗi request
+_WORD_RE = re.compile(r"\w+")
+POWER_WORDS_SET = POWER_WORDS
+
+# TTL cho cached optimizer output - pipeline là pure function của request
+_OPT_CACHE_TTL = 300
+
+# Upper bound cho bulk optimize - giữ memory/thread-pool use có hạn
+# deterministic thay vì phụ thuộc client gửi gì
+_MAX_BULK = 500
+
+# Shared pool cho bulk optimize - mỗi listing độc lập nên chạy song song
+# thay vì tuần tự, và giữ event loop không bị block
+_bulk_executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+
+
+def _cache_parts(request: OptimizationRequest, strategy_type) -> Dict[str, Any]:
+    return {
+        "title": request.title,
+        "description": request.description,
+        "category": request.category,
+        "keywords": request.keywords,
+        "item_specifics": request.item_specifics,
+        "strategy": strategy_type.value if strategy_type else None,
+    }
 
 
 class StrategyResponse(dict):
@@ -25,41 +63,28 @@ class StrategyResponse(dict):
 @router.post("/title", response_model=OptimizationResponse)
 async def optimize_title(
     request: OptimizationRequest,
-    strategy_type: Optional[OptimizationType] = Query(OptimizationType.BASIC, description="Optimization strategy to use")
+    strategy_type: Optional[OptimizationType] = Query(OptimizationType.BASIC, description="Optimization strategy to use"),
+    optimizer: EbayOptimizer = Depends(get_optimizer)
 ):
     """
     Optimize a single listing title
     """
-    try:
-        # Optimize title using strategy pattern
-        optimized_title, title_score = optimizer.optimize_title(
+    def _compute() -> OptimizationResponse:
+        # Fused pass - một strategy dispatch cho title + keywords +
+        # description thay vì ba call re-tokenize cùng input
+        bundle = optimizer.optimize_all(
             title=request.title,
+            description=request.description or "",
             category=request.category,
             keywords=request.keywords,
             item_specifics=request.item_specifics,
             strategy_type=strategy_type
         )
-        
-        # Generate keywords using strategy pattern
-        suggested_keywords = optimizer.generate_keywords(
-            title=request.title,
-            description=request.description or "",
-            category=request.category,
-            strategy_type=strategy_type
-        )
-        
-        # Optimize description if provided using strategy pattern
-        optimized_description = None
-        if request.description:
-            optimized_description = optimizer.optimize_description(
-                title=optimized_title,
-                description=request.description,
-                category=request.category,
-                item_specifics=request.item_specifics,
-                keywords=suggested_keywords,
-                strategy_type=strategy_type
-            )
-        
+        optimized_title = bundle["optimized_title"]
+        title_score = bundle["title_score"]
+        suggested_keywords = bundle["suggested_keywords"]
+        optimized_description = bundle["optimized_description"]
+
         # Calculate overall SEO score
         seo_score = title_score
         if optimized_description:
@@ -67,18 +92,22 @@ async def optimize_title(
             desc_length = len(optimized_description)
             if 500 <= desc_length <= 2000:
                 seo_score = min(seo_score + 10, 100)
-        
-        # Generate improvements list
+
+        # Generate improvements list - lower() một lần, check bằng
+        # token-set intersection thay vì scan lại title cho từng từ
+        title_lower = request.title.lower()
+        tokens = set(_WORD_RE.findall(title_lower))
+
         improvements = []
         if len(request.title) < 40:
             improvements.append("Title is too short. Add more descriptive keywords.")
         if len(request.title) > 80:
             improvements.append("Title exceeds 80 characters. Consider shortening.")
-        if not any(word in request.title.lower() for word in optimizer.power_words):
+        if POWER_WORDS_SET.isdisjoint(tokens):
             improvements.append("Add power words like 'new', 'authentic', 'genuine' for better visibility.")
-        if request.category and not any(kw in request.title.lower() for kw in suggested_keywords[:5]):
+        if request.category and tokens.isdisjoint(kw.lower() for kw in suggested_keywords[:5]):
             improvements.append("Include category-specific keywords in the title.")
-        
+
         return OptimizationResponse(
             original_title=request.title,
             optimized_title=optimized_title,
@@ -89,6 +118,11 @@ async def optimize_title(
             improvements=improvements,
             seo_score=seo_score
         )
+
+    try:
+        # Deterministic pipeline - repeated/duplicate listings hit cache
+        cache_key = make_key("title", _cache_parts(request, strategy_type))
+        return get_or_compute(cache_key, _OPT_CACHE_TTL, _compute)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error optimizing title: {str(e)}")
 
@@ -96,12 +130,13 @@ async def optimize_title(
 @router.post("/description")
 async def optimize_description(
     request: OptimizationRequest,
-    strategy_type: Optional[OptimizationType] = Query(OptimizationType.BASIC, description="Optimization strategy to use")
+    strategy_type: Optional[OptimizationType] = Query(OptimizationType.BASIC, description="Optimization strategy to use"),
+    optimizer: EbayOptimizer = Depends(get_optimizer)
 ):
     """
     Generate optimized description for a listing
     """
-    try:
+    def _compute() -> Dict[str, Any]:
         # Generate keywords first for better description optimization
         keywords = optimizer.generate_keywords(
             title=request.title,
@@ -109,7 +144,7 @@ async def optimize_description(
             category=request.category,
             strategy_type=strategy_type
         )
-        
+
         optimized_description = optimizer.optimize_description(
             title=request.title,
             description=request.description or "",
@@ -118,12 +153,16 @@ async def optimize_description(
             keywords=keywords,
             strategy_type=strategy_type
         )
-        
+
         return {
             "original_description": request.description,
             "optimized_description": optimized_description,
             "character_count": len(optimized_description)
         }
+
+    try:
+        cache_key = make_key("description", _cache_parts(request, strategy_type))
+        return get_or_compute(cache_key, _OPT_CACHE_TTL, _compute)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error optimizing description: {str(e)}")
 
@@ -131,152 +170,198 @@ async def optimize_description(
 @router.post("/keywords")
 async def generate_keywords(
     request: OptimizationRequest,
-    strategy_type: Optional[OptimizationType] = Query(OptimizationType.BASIC, description="Optimization strategy to use")
+    strategy_type: Optional[OptimizationType] = Query(OptimizationType.BASIC, description="Optimization strategy to use"),
+    optimizer: EbayOptimizer = Depends(get_optimizer)
 ):
     """
     Generate relevant keywords for a listing
     """
-    try:
+    def _compute() -> Dict[str, Any]:
         keywords = optimizer.generate_keywords(
             title=request.title,
             description=request.description or "",
             category=request.category,
             strategy_type=strategy_type
         )
-        
+
         return {
             "keywords": keywords,
             "count": len(keywords)
         }
+
+    try:
+        cache_key = make_key("keywords", _cache_parts(request, strategy_type))
+        return get_or_compute(cache_key, _OPT_CACHE_TTL, _compute)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating keywords: {str(e)}")
 
 
-@router.post("/bulk", response_model=BulkOptimizationResponse)
-async def bulk_optimize(request: Dict[str, Any]):
+def _optimize_one(optimizer: EbayOptimizer, listing: Dict[str, Any], flags) -> tuple:
+    """Optimize một listing cho bulk flow - chạy trên worker thread
+
+    Returns (result, error, sheet_update); mỗi phần tử là None khi
+    không áp dụng, để endpoint gather lại thành ba danh sách.
+    """
+    optimize_title, optimize_description, generate_keywords = flags
+    try:
+        # Prepare optimization request
+        opt_request = OptimizationRequest(
+            title=listing.get('title', ''),
+            description=listing.get('description'),
+            category=listing.get('category', 'general'),
+            keywords=listing.get('keywords', []),
+            item_specifics=listing.get('item_specifics', {})
+        )
+
+        # Fused pass với default strategy - bỏ qua description work khi
+        # flag tắt; các flag chỉ gate output nào được áp dụng
+        bundle = optimizer.optimize_all(
+            title=opt_request.title,
+            description=opt_request.description if optimize_description else "",
+            category=opt_request.category,
+            keywords=opt_request.keywords,
+            item_specifics=opt_request.item_specifics,
+            strategy_type=OptimizationType.BASIC  # Default strategy for bulk
+        )
+
+        optimized_title = bundle["optimized_title"] if optimize_title else listing.get('title', '')
+        title_score = bundle["title_score"] if optimize_title else 0
+        optimized_description = (
+            bundle["optimized_description"]
+            if optimize_description and opt_request.description
+            else listing.get('description')
+        )
+        suggested_keywords = (
+            bundle["suggested_keywords"] if generate_keywords
+            else listing.get('keywords', [])
+        )
+
+        # Calculate SEO score
+        seo_score = title_score
+        if optimized_description:
+            desc_length = len(optimized_description)
+            if 500 <= desc_length <= 2000:
+                seo_score = min(seo_score + 10, 100)
+
+        result = OptimizationResponse(
+            original_title=opt_request.title,
+            optimized_title=optimized_title,
+            title_score=title_score,
+            original_description=opt_request.description,
+            optimized_description=optimized_description,
+            suggested_keywords=suggested_keywords,
+            improvements=[],
+            seo_score=seo_score
+        )
+
+        # Chỉ copy + queue sheet update khi có field thực sự thay đổi
+        changed = bool(
+            optimize_title
+            or (optimize_description and opt_request.description)
+            or generate_keywords
+        )
+        if not changed:
+            return result, None, None
+
+        # Minimal patch cho sheets - không copy cả listing dict với
+        # description multi-KB; batch_update_listings merge theo field
+        patch = {
+            "id": listing.get('id'),
+            "sheet_row": listing.get('sheet_row'),
+            "title": optimized_title,
+            "keywords": suggested_keywords,
+            "status": ListingStatus.OPTIMIZED,
+        }
+        if optimized_description:
+            patch["description"] = optimized_description
+
+        return result, None, patch
+
+    except Exception as e:
+        return None, {"listing_id": listing.get('id'), "error": str(e)}, None
+
+
+@router.post("/bulk")
+async def bulk_optimize(
+    request: Dict[str, Any],
+    optimizer: EbayOptimizer = Depends(get_optimizer),
+    sheets_service: GoogleSheetsService = Depends(get_sheets_service)
+):
     """
     Optimize multiple listings at once
     """
     try:
         # Handle both direct listings array and listing_ids
+        listing_ids = None
         if "listings" in request:
             # Direct listings provided in request
             listings_to_optimize = request["listings"]
         elif "listing_ids" in request:
-            # Get listings from sheets by IDs
-            all_listings = sheets_service.get_all_listings()
-            listings_to_optimize = [
-                l for l in all_listings 
-                if l.get('id') in request["listing_ids"]
-            ]
+            # Dedup giữ thứ tự - duplicate id không lặp lại full
+            # optimizer work; cap để một request không chiếm cả pool
+            listing_ids = list(dict.fromkeys(request["listing_ids"]))
+            if len(listing_ids) > _MAX_BULK:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Too many listing IDs: {len(listing_ids)} (max {_MAX_BULK})"
+                )
+            # Batch lookup qua cached id index - không download cả sheet
+            # rồi linear-scan mỗi request
+            listings_to_optimize = list(
+                sheets_service.get_listings_by_ids(listing_ids).values()
+            )
         else:
             raise HTTPException(status_code=422, detail="Request must contain either 'listings' array or 'listing_ids' array")
         
         if not listings_to_optimize:
             raise HTTPException(status_code=404, detail="No listings found with provided IDs")
         
-        results = []
-        errors = []
-        updates_for_sheets = []
-        
         # Get optimization settings from request
         optimize_title = request.get("optimize_title", True)
-        optimize_description = request.get("optimize_description", True) 
+        optimize_description = request.get("optimize_description", True)
         generate_keywords = request.get("generate_keywords", True)
-        
-        for listing in listings_to_optimize:
-            try:
-                # Prepare optimization request
-                opt_request = OptimizationRequest(
-                    title=listing.get('title', ''),
-                    description=listing.get('description'),
-                    category=listing.get('category', 'general'),
-                    keywords=listing.get('keywords', []),
-                    item_specifics=listing.get('item_specifics', {})
-                )
-                
-                # Optimize title using strategy pattern
-                optimized_title = listing.get('title', '')
-                title_score = 0
-                if optimize_title:
-                    optimized_title, title_score = optimizer.optimize_title(
-                        title=opt_request.title,
-                        category=opt_request.category,
-                        keywords=opt_request.keywords,
-                        item_specifics=opt_request.item_specifics,
-                        strategy_type=OptimizationType.BASIC  # Default strategy for bulk
-                    )
-                
-                # Optimize description using strategy pattern
-                optimized_description = listing.get('description')
-                if optimize_description and opt_request.description:
-                    optimized_description = optimizer.optimize_description(
-                        title=optimized_title,
-                        description=opt_request.description,
-                        category=opt_request.category,
-                        item_specifics=opt_request.item_specifics,
-                        keywords=opt_request.keywords,
-                        strategy_type=OptimizationType.BASIC  # Default strategy for bulk
-                    )
-                
-                # Generate keywords using strategy pattern
-                suggested_keywords = listing.get('keywords', [])
-                if generate_keywords:
-                    suggested_keywords = optimizer.generate_keywords(
-                        title=optimized_title,
-                        description=optimized_description or "",
-                        category=opt_request.category,
-                        strategy_type=OptimizationType.BASIC  # Default strategy for bulk
-                    )
-                
-                # Calculate SEO score
-                seo_score = title_score
-                if optimized_description:
-                    desc_length = len(optimized_description)
-                    if 500 <= desc_length <= 2000:
-                        seo_score = min(seo_score + 10, 100)
-                
-                # Add to results
-                results.append(OptimizationResponse(
-                    original_title=opt_request.title,
-                    optimized_title=optimized_title,
-                    title_score=title_score,
-                    original_description=opt_request.description,
-                    optimized_description=optimized_description,
-                    suggested_keywords=suggested_keywords,
-                    improvements=[],
-                    seo_score=seo_score
-                ))
-                
-                # Prepare update for sheets
-                listing_update = listing.copy()
-                listing_update['title'] = optimized_title
-                if optimized_description:
-                    listing_update['description'] = optimized_description
-                listing_update['keywords'] = suggested_keywords
-                listing_update['status'] = ListingStatus.OPTIMIZED
-                updates_for_sheets.append(listing_update)
-                
-            except Exception as e:
-                errors.append({
-                    "listing_id": listing.get('id'),
-                    "error": str(e)
-                })
+        flags = (optimize_title, optimize_description, generate_keywords)
+
+        # Fast path: không flag nào bật thì không có việc gì để làm -
+        # return ngay, bỏ qua cả optimizer lẫn sheets round-trip
+        if not (optimize_title or optimize_description or generate_keywords):
+            total_count = len(listing_ids) if listing_ids is not None else len(request.get("listings", []))
+            return ORJSONResponse({
+                "total": total_count,
+                "successful": 0,
+                "failed": 0,
+                "results": [],
+                "errors": None
+            })
+
+        # Mỗi listing độc lập - dispatch lên thread pool và gather,
+        # thay vì chạy tuần tự N× single-listing latency
+        loop = asyncio.get_running_loop()
+        outputs = await asyncio.gather(*[
+            loop.run_in_executor(_bulk_executor, _optimize_one, optimizer, listing, flags)
+            for listing in listings_to_optimize
+        ])
+
+        results = [result for result, _, _ in outputs if result is not None]
+        errors = [error for _, error, _ in outputs if error is not None]
+        updates_for_sheets = [upd for _, _, upd in outputs if upd is not None]
         
         # Batch update sheets
         if updates_for_sheets:
             sheets_result = sheets_service.batch_update_listings(updates_for_sheets)
         
-        # Calculate total based on input type
-        total_count = len(request.get("listing_ids", [])) if "listing_ids" in request else len(request.get("listings", []))
-        
-        return BulkOptimizationResponse(
-            total=total_count,
-            successful=len(results),
-            failed=len(errors),
-            results=results,
-            errors=errors if errors else None
-        )
+        # Total phản ánh số id thực sự được xử lý (sau dedup)
+        total_count = len(listing_ids) if listing_ids is not None else len(request.get("listings", []))
+
+        # Serialize thẳng qua orjson - bỏ response_model revalidation
+        # trên hàng trăm OptimizationResponse
+        return ORJSONResponse({
+            "total": total_count,
+            "successful": len(results),
+            "failed": len(errors),
+            "results": [r.model_dump() for r in results],
+            "errors": errors if errors else None
+        })
     except HTTPException:
         raise
     except Exception as e:
@@ -284,14 +369,18 @@ async def bulk_optimize(request: Dict[str, Any]):
 
 
 @router.post("/analyze/{listing_id}")
-async def analyze_listing(listing_id: str):
+async def analyze_listing(
+    listing_id: str,
+    request: Request,
+    optimizer: EbayOptimizer = Depends(get_optimizer),
+    sheets_service: GoogleSheetsService = Depends(get_sheets_service)
+):
     """
     Analyze a listing and provide optimization suggestions
     """
     try:
-        # Get listing
-        all_listings = sheets_service.get_all_listings()
-        listing = next((l for l in all_listings if l.get('id') == listing_id), None)
+        # Get listing - single indexed lookup thay vì full-sheet scan
+        listing = sheets_service.get_listing_by_id(listing_id)
         
         if not listing:
             raise HTTPException(status_code=404, detail="Listing not found")
@@ -321,8 +410,9 @@ async def analyze_listing(listing_id: str):
                 "suggestion": "Use proper capitalization for better readability"
             })
         
-        # Check for power words
-        has_power_words = any(word in title.lower() for word in optimizer.power_words)
+        # Check for power words via token set - một lần lower + findall
+        title_tokens = set(_WORD_RE.findall(title.lower()))
+        has_power_words = not POWER_WORDS_SET.isdisjoint(title_tokens)
         if not has_power_words:
             title_issues.append({
                 "issue": "Missing power words",
@@ -358,7 +448,8 @@ async def analyze_listing(listing_id: str):
         # Generate suggestions
         keywords = optimizer.generate_keywords(title, description or "", category)
         
-        return {
+        # ETag để dashboard poll analysis không refetch payload không đổi
+        return conditional_response(request, {
             "listing_id": listing_id,
             "current_status": listing.get('status'),
             "title_analysis": {
@@ -372,15 +463,33 @@ async def analyze_listing(listing_id: str):
             },
             "suggested_keywords": keywords[:10],
             "optimization_potential": "high" if (title_issues or desc_issues) else "low"
-        }
+        })
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing listing: {str(e)}")
 
 
+@router.get("/cache-info")
+async def get_cache_info():
+    """
+    Debug: hit/miss stats của keyword memoization cache
+    """
+    info = keywords_cache_info()
+    return {
+        "keywords_cache": {
+            "hits": info.hits,
+            "misses": info.misses,
+            "maxsize": info.maxsize,
+            "currsize": info.currsize
+        }
+    }
+
+
 @router.get("/strategies")
-async def get_optimization_strategies():
+async def get_optimization_strategies(
+    optimizer: EbayOptimizer = Depends(get_optimizer)
+):
     """
     Get available optimization strategies
     """
@@ -395,7 +504,9 @@ async def get_optimization_strategies():
 
 
 @router.get("/export-formats")
-async def get_export_formats():
+async def get_export_formats(
+    optimizer: EbayOptimizer = Depends(get_optimizer)
+):
     """
     Get available export formats
     """
@@ -412,7 +523,8 @@ async def get_export_formats():
 @router.post("/listing/complete")
 async def optimize_complete_listing(
     request: OptimizationRequest,
-    strategy_type: Optional[OptimizationType] = Query(OptimizationType.BASIC, description="Optimization strategy to use")
+    strategy_type: Optional[OptimizationType] = Query(OptimizationType.BASIC, description="Optimization strategy to use"),
+    optimizer: EbayOptimizer = Depends(get_optimizer)
 ):
     """
     Optimize complete listing using strategy pattern
@@ -442,18 +554,18 @@ async def optimize_complete_listing(
 async def export_listings(
     listing_ids: List[str],
     export_format: Optional[ExportFormat] = Query(ExportFormat.CSV, description="Export format to use"),
-    filename: Optional[str] = Query(None, description="Custom filename")
+    filename: Optional[str] = Query(None, description="Custom filename"),
+    optimizer: EbayOptimizer = Depends(get_optimizer),
+    sheets_service: GoogleSheetsService = Depends(get_sheets_service)
 ):
     """
     Export listings using strategy pattern
     """
     try:
-        # Get listings data
-        all_listings = sheets_service.get_all_listings()
-        listings_to_export = [
-            listing for listing in all_listings
-            if listing.get('id') in listing_ids
-        ]
+        # Get listings data qua cached id index
+        listings_to_export = list(
+            sheets_service.get_listings_by_ids(listing_ids).values()
+        )
         
         if not listings_to_export:
             raise HTTPException(status_code=404, detail="No listings found with provided IDs")
@@ -2,8 +2,13 @@
 Sources API Endpoints - Supplier/Dropshipping Sources Management với SQLite repository
 """
 
-from fastapi import APIRouter, HTTPException, Query, Depends
+import base64
+import time
+import uuid
+
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
 from typing import List, Optional
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from datetime import datetime
 
@@ -12,15 +17,39 @@ from app.schemas.schemas import (
     SourceStatus, PaginatedResponse, APIResponse
 )
 from app.repositories import source_repo
+from app.core.responses import ORJSONResponse, conditional_response
 from app.db.database import get_db
 from app.core.deps import get_current_user
-from app.models.database_models import User
+from app.models.database_models import User, SourceStatusEnum
+
+# orjson serialization cho mọi response của router
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Một adapter build sẵn cho cả list - amortize validator setup qua batch
+# thay vì chạy model_validate per row
+_SOURCES_ADAPTER = TypeAdapter(List[Source])
+
 
-router = APIRouter()
+def _encode_cursor(source) -> str:
+    """Encode (last_sync, id) của row cuối trang thành opaque cursor"""
+    ts = source.last_sync.isoformat() if source.last_sync else ""
+    return base64.urlsafe_b64encode(f"{ts}:{source.id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        # rpartition: isoformat timestamp chứa ':' nên phải tách tại dấu
+        # ':' CUỐI (ngay trước source id - id không bao giờ chứa ':')
+        ts, _, source_id = raw.rpartition(":")
+        return (datetime.fromisoformat(ts) if ts else None, source_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=422, detail="Invalid cursor")
 
 
 @router.get("", response_model=PaginatedResponse)
 async def get_sources(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     status: Optional[SourceStatus] = Query(None, description="Filter by status"),
@@ -28,17 +57,53 @@ async def get_sources(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(20, ge=1, le=100, description="Page size"),
     sort_by: Optional[str] = Query("last_sync", description="Sort field"),
-    sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Sort order")
+    sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Sort order"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor từ next_cursor của trang trước (ưu tiên hơn page khi có)")
 ):
     """
     Get supplier sources với pagination, filtering, và search
+
+    Clients paginate sâu (>~1k rows) nên dùng cursor - O(size) per page
+    thay vì OFFSET scan; page/size vẫn hoạt động cho flow cũ.
     """
     try:
+        if cursor is not None:
+            items = source_repo.get_page_keyset(
+                db,
+                user_id=current_user.id,
+                limit=size,
+                cursor=_decode_cursor(cursor),
+                status=status,
+                search=search
+            )
+            pydantic_sources = _SOURCES_ADAPTER.validate_python(
+                items, from_attributes=True
+            )
+            next_cursor = _encode_cursor(items[-1]) if len(items) == size else None
+            return conditional_response(request, {
+                "items": _SOURCES_ADAPTER.dump_python(pydantic_sources),
+                "total": source_repo.count(
+                    db,
+                    filters={"status": status} if status else None,
+                    search=search,
+                    search_fields=["name", "website_url"],
+                    user_id=current_user.id
+                ),
+                "page": 0,
+                "size": size,
+                "pages": 0,
+                "has_next": next_cursor is not None,
+                "has_prev": True,
+                "next_cursor": next_cursor,
+                "success": True,
+                "message": f"Retrieved {len(pydantic_sources)} sources"
+            })
+
         # Build filters
         filters = {}
         if status:
             filters["status"] = status
-        
+
         # Calculate skip value
         skip = (page - 1) * size
         
@@ -55,21 +120,32 @@ async def get_sources(
             user_id=current_user.id
         )
         
-        # Convert SQLAlchemy models to Pydantic schemas
-        pydantic_sources = [Source.model_validate(source) for source in result["items"]]
+        # Convert SQLAlchemy models to Pydantic schemas trong một call
+        pydantic_sources = _SOURCES_ADAPTER.validate_python(
+            result["items"], from_attributes=True
+        )
         
-        # Return PaginatedResponse with converted items
-        return {
-            "items": pydantic_sources,
+        # Offset path vẫn trả next_cursor (khi sort mặc định) để client
+        # chuyển sang keyset flow từ trang kế tiếp
+        can_cursor = (
+            result["items"] and result["has_next"]
+            and sort_by == "last_sync" and sort_order == "desc"
+        )
+
+        # Return PaginatedResponse-shaped payload với ETag - polling
+        # clients nhận 304 khi trang không đổi
+        return conditional_response(request, {
+            "items": _SOURCES_ADAPTER.dump_python(pydantic_sources),
             "total": result["total"],
             "page": result["page"],
             "size": result["size"],
             "pages": result["pages"],
             "has_next": result["has_next"],
             "has_prev": result["has_prev"],
+            "next_cursor": _encode_cursor(result["items"][-1]) if can_cursor else None,
             "success": True,
             "message": f"Retrieved {len(pydantic_sources)} sources"
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching sources: {str(e)}")
@@ -78,6 +154,7 @@ async def get_sources(
 @router.get("/{source_id}", response_model=Source)
 async def get_source(
     source_id: str,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -86,16 +163,19 @@ async def get_source(
     """
     try:
         source = source_repo.get(db, id=source_id)
-        
+
         if not source:
             raise HTTPException(status_code=404, detail="Source not found")
-        
+
         # Check ownership
         if source.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Not authorized to access this source")
-        
-        return source
-        
+
+        return conditional_response(
+            request,
+            Source.model_validate(source, from_attributes=True).model_dump()
+        )
+
     except HTTPException:
         raise
     except Exception as e:
@@ -125,9 +205,9 @@ async def create_source(
                 detail="Source name already exists"
             )
         
-        # Generate unique ID
-        import uuid
-        source_id = f"source_{int(datetime.now().timestamp())}_{str(uuid.uuid4())[:8]}"
+        # Generate unique ID - time_ns tránh TZ conversion/allocation
+        # của datetime.now() trên hot path
+        source_id = f"source_{time.time_ns()}_{uuid.uuid4().hex[:8]}"
         
         # Create source data
         source_data = source.model_dump()
@@ -159,23 +239,27 @@ async def update_source(
     Update an existing source
     """
     try:
-        # Get current source
-        current_source = source_repo.get(db, id=source_id)
-        
-        if not current_source:
-            raise HTTPException(status_code=404, detail="Source not found")
-        
-        # Check ownership
-        if current_source.user_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Not authorized to update this source")
-        
-        # Update source
-        updated_source = source_repo.update(
-            db,
-            db_obj=current_source,
-            obj_in=source_update
+        # Ownership check gộp vào UPDATE ... RETURNING - một round-trip
+        # thay vì get() rồi update()
+        values = source_update.model_dump(exclude_unset=True)
+        if not values:
+            current_source = source_repo.get(db, id=source_id)
+            if not current_source:
+                raise HTTPException(status_code=404, detail="Source not found")
+            if current_source.user_id != current_user.id:
+                raise HTTPException(status_code=403, detail="Not authorized to update this source")
+            return current_source
+
+        updated_source = source_repo.update_owned(
+            db, source_id=source_id, user_id=current_user.id, values=values
         )
-        
+
+        if updated_source is None:
+            # Phân biệt 403/404 bằng một SELECT rẻ chỉ khi update miss
+            if source_repo.exists(db, id=source_id):
+                raise HTTPException(status_code=403, detail="Not authorized to update this source")
+            raise HTTPException(status_code=404, detail="Source not found")
+
         return updated_source
         
     except HTTPException:
@@ -194,19 +278,14 @@ async def delete_source(
     Delete a supplier source
     """
     try:
-        # Get current source
-        current_source = source_repo.get(db, id=source_id)
-        
-        if not current_source:
+        # Một DELETE với ownership trong WHERE thay vì get() + delete()
+        if not source_repo.delete_owned(
+            db, source_id=source_id, user_id=current_user.id
+        ):
+            if source_repo.exists(db, id=source_id):
+                raise HTTPException(status_code=403, detail="Not authorized to delete this source")
             raise HTTPException(status_code=404, detail="Source not found")
-        
-        # Check ownership
-        if current_source.user_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Not authorized to delete this source")
-        
-        # Delete source
-        source_repo.delete(db, id=source_id)
-        
+
         return APIResponse(
             success=True,
             message="Source deleted successfully"
@@ -317,28 +396,32 @@ async def sync_source(
     Sync a specific source
     """
     try:
-        # Check ownership first
-        source = source_repo.get(db, id=source_id)
-        if not source or source.user_id != current_user.id:
-            raise HTTPException(status_code=404, detail="Source not found")
-        
-        # Update sync status
-        updated_source = source_repo.update_sync_status(
+        # Ownership check gộp vào từng UPDATE ... RETURNING - không cần
+        # get() trước, và không re-read row sau mutation
+        updated_source = source_repo.update_owned(
             db,
             source_id=source_id,
-            status=SourceStatus.SYNCING,
-            last_sync=datetime.now()
+            user_id=current_user.id,
+            values={
+                "status": SourceStatusEnum.SYNCING,
+                "last_sync": datetime.now()
+            }
         )
-        
+        if updated_source is None:
+            raise HTTPException(status_code=404, detail="Source not found")
+
         # TODO: Implement actual sync logic here
         # For now, just mark as connected after "sync"
-        from app.models.database_models import SourceStatusEnum
-        final_source = source_repo.update_sync_status(
+        final_source = source_repo.update_owned(
             db,
             source_id=source_id,
-            status=SourceStatusEnum.CONNECTED
+            user_id=current_user.id,
+            values={
+                "status": SourceStatusEnum.CONNECTED,
+                "last_sync": datetime.now()
+            }
         )
-        
+
         return final_source
         
     except HTTPException:
@@ -357,14 +440,21 @@ async def bulk_sync_sources(
     Bulk sync multiple sources
     """
     try:
-        # Validate ownership for all sources
-        for source_id in source_ids:
-            source = source_repo.get(db, id=source_id)
-            if not source or source.user_id != current_user.id:
-                raise HTTPException(
-                    status_code=403, 
-                    detail=f"Not authorized to sync source {source_id}"
-                )
+        # Dedup giữ thứ tự - duplicate id không bị count/sync hai lần
+        source_ids = list(dict.fromkeys(source_ids))
+
+        # Validate ownership cho cả batch trong một query thay vì
+        # một round-trip per source; report đủ các ID fail một lần
+        owners = source_repo.get_owners_map(db, ids=source_ids)
+        unauthorized = [
+            source_id for source_id in source_ids
+            if owners.get(source_id) != current_user.id
+        ]
+        if unauthorized:
+            raise HTTPException(
+                status_code=403,
+                detail=f"Not authorized to sync sources: {', '.join(unauthorized)}"
+            )
         
         # Perform bulk sync
         result = source_repo.bulk_sync(
@@ -385,6 +475,35 @@ async def bulk_sync_sources(
         raise HTTPException(status_code=500, detail=f"Error syncing sources: {str(e)}")
 
 
+@router.post("/sync-stale", response_model=APIResponse)
+async def sync_stale_sources(
+    hours_threshold: int = Query(24, ge=1, le=168, description="Hours since last sync"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Sync tất cả sources quá hạn trong một call
+
+    Thay cho flow /need-sync rồi /bulk-sync với danh sách id - một UPDATE
+    statement phía DB, không round-trip per source.
+    """
+    try:
+        synced = source_repo.bulk_sync_stale(
+            db,
+            user_id=current_user.id,
+            hours_threshold=hours_threshold
+        )
+
+        return APIResponse(
+            success=True,
+            message=f"Sync started for {synced} stale sources",
+            data={"synced": synced}
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error syncing stale sources: {str(e)}")
+
+
 @router.put("/{source_id}/statistics", response_model=Source)
 async def update_statistics(
     source_id: str,
@@ -399,21 +518,28 @@ async def update_statistics(
     Update source statistics
     """
     try:
-        # Check ownership first
-        source = source_repo.get(db, id=source_id)
-        if not source or source.user_id != current_user.id:
-            raise HTTPException(status_code=404, detail="Source not found")
-        
-        # Update statistics
-        updated_source = source_repo.update_statistics(
-            db,
-            source_id=source_id,
-            total_products=total_products,
-            active_products=active_products,
-            total_revenue=total_revenue,
-            average_roi=average_roi
+        # Một UPDATE owned với các field được cung cấp
+        values = {
+            k: v for k, v in {
+                "total_products": total_products,
+                "active_products": active_products,
+                "total_revenue": total_revenue,
+                "average_roi": average_roi
+            }.items() if v is not None
+        }
+
+        if not values:
+            source = source_repo.get(db, id=source_id)
+            if not source or source.user_id != current_user.id:
+                raise HTTPException(status_code=404, detail="Source not found")
+            return source
+
+        updated_source = source_repo.update_owned(
+            db, source_id=source_id, user_id=current_user.id, values=values
         )
-        
+        if updated_source is None:
+            raise HTTPException(status_code=404, detail="Source not found")
+
         return updated_source
         
     except HTTPException:
@@ -432,17 +558,15 @@ async def calculate_statistics(
     Auto-calculate statistics based on actual product data
     """
     try:
-        # Check ownership first
-        source = source_repo.get(db, id=source_id)
-        if not source or source.user_id != current_user.id:
-            raise HTTPException(status_code=404, detail="Source not found")
-        
-        # Update auto-calculated stats
+        # Stats được aggregate từ products, write qua UPDATE owned
         updated_source = source_repo.update_auto_calculated_stats(
             db,
-            source_id=source_id
+            source_id=source_id,
+            user_id=current_user.id
         )
-        
+        if updated_source is None:
+            raise HTTPException(status_code=404, detail="Source not found")
+
         return updated_source
         
     except HTTPException:
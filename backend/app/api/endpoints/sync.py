@@ -2,136 +2,303 @@
 Sync API Endpoints - Bi-directional SQLite ↔ Google Sheets Synchronization
 """
 
-from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Depends, Response
+from fastapi.concurrency import run_in_threadpool
+from typing import Callable, Dict, Any, Literal, Optional
 from sqlalchemy.orm import Session
-import json
+from datetime import datetime
+from itertools import islice
+import orjson
+import threading
+import time
+import uuid
 
 from app.schemas.schemas import APIResponse
+from app.core.opt_cache import get_or_compute, invalidate, make_key
+from app.core.responses import ORJSONResponse
+from app.services.google_sheets import HttpError, _execute_with_backoff
 from app.services.sync_service import sync_service
-from app.db.database import get_db
+from app.db.database import get_db, SessionLocal
 from app.core.deps import get_current_user
-from app.models.database_models import User
+from app.models.database_models import ActivityLog, User, SyncJob, SyncJobStatusEnum
+from app.repositories import listing_repo
+from sqlalchemy import and_, func, select
 from app.core.config import settings
 
-router = APIRouter()
+# orjson serialization cho mọi response của router - history payload
+# với nested new_values là chỗ json.dumps stdlib tốn CPU nhất
+router = APIRouter(default_response_class=ORJSONResponse)
 
+# TTL cho polled read endpoints - status đổi chậm hơn poll interval của UI
+_STATUS_TTL = 15
+_HISTORY_TTL = 30
 
-@router.post("/listings/to-sheets", response_model=APIResponse)
+
+# Single-flight lock per user - double-click/multi-tab không được phép
+# chạy hai sync chồng nhau (Sheets quota + SQLite write lock là shared).
+# TTL là safety net nếu job chết trước khi release.
+_SYNC_LOCK_TTL = 300
+_sync_locks: Dict[int, float] = {}
+_sync_locks_guard = threading.Lock()
+
+
+def _acquire_sync_lock(user_id: int) -> bool:
+    now = time.monotonic()
+    with _sync_locks_guard:
+        expires_at = _sync_locks.get(user_id)
+        if expires_at is not None and expires_at > now:
+            return False
+        _sync_locks[user_id] = now + _SYNC_LOCK_TTL
+        return True
+
+
+def _release_sync_lock(user_id: int):
+    with _sync_locks_guard:
+        _sync_locks.pop(user_id, None)
+
+
+def _require_sync_lock(user_id: int):
+    """Raise 409 khi user đã có một sync đang chạy"""
+    if not _acquire_sync_lock(user_id):
+        raise HTTPException(
+            status_code=409,
+            detail="Sync already in progress for this user",
+            headers={"Retry-After": "30"}
+        )
+
+
+def _invalidate_sync_caches(user_id: int):
+    """Bust cached status/history của user sau khi một sync thay đổi state"""
+    invalidate(f"opt:sync_status:{user_id}:")
+    invalidate(f"opt:sync_history:{user_id}:")
+
+
+def _create_job(db: Session, user_id: int, kind: str) -> str:
+    """Insert job row ở trạng thái queued, trả về job id cho client poll"""
+    job_id = f"syncjob_{uuid.uuid4().hex[:12]}"
+    db.add(SyncJob(id=job_id, user_id=user_id, kind=kind))
+    db.commit()
+    return job_id
+
+
+def _run_sync_job(job_id: str, user_id: int, runner: Callable[[Session], Dict[str, Any]]):
+    """Chạy một sync job trên background task sau khi response đã trả
+
+    Sheets I/O + SQLite writes mất nhiều giây - chạy trong request
+    coroutine sẽ giữ event loop và connection-pool slot suốt thời gian
+    đó. Worker mở SessionLocal riêng (session của request đã đóng khi
+    task chạy) và ghi kết quả vào job row để client poll.
+    """
+    db = SessionLocal()
+    try:
+        db.query(SyncJob).filter(SyncJob.id == job_id).update(
+            {"status": SyncJobStatusEnum.RUNNING}, synchronize_session=False
+        )
+        db.commit()
+
+        result = runner(db)
+
+        db.query(SyncJob).filter(SyncJob.id == job_id).update({
+            "status": (
+                SyncJobStatusEnum.COMPLETED
+                if result.get("success", True) else SyncJobStatusEnum.FAILED
+            ),
+            "result_json": result,
+            "completed_at": datetime.now()
+        }, synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        db.query(SyncJob).filter(SyncJob.id == job_id).update({
+            "status": SyncJobStatusEnum.FAILED,
+            "error_message": str(e),
+            "completed_at": datetime.now()
+        }, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+        _release_sync_lock(user_id)
+        # Job vừa đổi sync state - status/history cache của user hết hạn
+        _invalidate_sync_caches(user_id)
+
+
+def _queued_response(job_id: str, kind: str) -> APIResponse:
+    return APIResponse(
+        success=True,
+        message=f"Sync job '{kind}' queued",
+        data={"job_id": job_id, "status": "queued"}
+    )
+
+
+@router.post("/listings/to-sheets", response_model=APIResponse, status_code=202)
 async def sync_listings_to_sheets(
+    background_tasks: BackgroundTasks,
     sheet_name: Optional[str] = Query(None, description="Target sheet name (uses config default if not specified)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Export SQLite listings to Google Sheets
+    Export SQLite listings to Google Sheets (background job - poll /sync/jobs/{id})
     """
+    user_id = current_user.id
+    _require_sync_lock(user_id)
     try:
-        result = sync_service.sync_listings_to_sheets(db, current_user.id, sheet_name)
-        
-        return APIResponse(
-            success=result["success"],
-            message=result["message"],
-            data=result
+        job_id = _create_job(db, user_id, "listings_to_sheets")
+        background_tasks.add_task(
+            _run_sync_job, job_id, user_id,
+            lambda job_db: sync_service.sync_listings_to_sheets(job_db, user_id, sheet_name)
         )
-        
+        return _queued_response(job_id, "listings_to_sheets")
+
     except Exception as e:
+        _release_sync_lock(user_id)
         raise HTTPException(status_code=500, detail=f"Error syncing listings to sheets: {str(e)}")
 
 
-@router.post("/listings/from-sheets", response_model=APIResponse)
+@router.post("/listings/from-sheets", response_model=APIResponse, status_code=202)
 async def sync_listings_from_sheets(
+    background_tasks: BackgroundTasks,
     sheet_name: Optional[str] = Query(None, description="Source sheet name (uses config default if not specified)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Import Google Sheets listings to SQLite
+    Import Google Sheets listings to SQLite (background job - poll /sync/jobs/{id})
     """
+    user_id = current_user.id
+    _require_sync_lock(user_id)
     try:
-        result = sync_service.sync_listings_from_sheets(db, current_user.id, sheet_name)
-        
-        return APIResponse(
-            success=result["success"],
-            message=result["message"],
-            data=result
+        job_id = _create_job(db, user_id, "listings_from_sheets")
+        background_tasks.add_task(
+            _run_sync_job, job_id, user_id,
+            lambda job_db: sync_service.sync_listings_from_sheets(job_db, user_id, sheet_name)
         )
-        
+        return _queued_response(job_id, "listings_from_sheets")
+
     except Exception as e:
+        _release_sync_lock(user_id)
         raise HTTPException(status_code=500, detail=f"Error syncing listings from sheets: {str(e)}")
 
 
-@router.post("/orders/to-sheets", response_model=APIResponse)
+@router.post("/orders/to-sheets", response_model=APIResponse, status_code=202)
 async def sync_orders_to_sheets(
+    background_tasks: BackgroundTasks,
     sheet_name: Optional[str] = Query(None, description="Target sheet name (uses ORDERS_SHEET_NAME config if not specified)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Export orders to Google Sheets for reporting
+    Export orders to Google Sheets for reporting (background job - poll /sync/jobs/{id})
     """
+    user_id = current_user.id
+    _require_sync_lock(user_id)
     try:
-        result = sync_service.sync_orders_to_sheets(db, current_user.id, sheet_name)
-        
-        return APIResponse(
-            success=result["success"],
-            message=result["message"],
-            data=result
+        job_id = _create_job(db, user_id, "orders_to_sheets")
+        background_tasks.add_task(
+            _run_sync_job, job_id, user_id,
+            lambda job_db: sync_service.sync_orders_to_sheets(job_db, user_id, sheet_name)
         )
-        
+        return _queued_response(job_id, "orders_to_sheets")
+
     except Exception as e:
+        _release_sync_lock(user_id)
         raise HTTPException(status_code=500, detail=f"Error exporting orders to sheets: {str(e)}")
 
 
-@router.post("/sources/to-sheets", response_model=APIResponse)
+@router.post("/sources/to-sheets", response_model=APIResponse, status_code=202)
 async def sync_sources_to_sheets(
+    background_tasks: BackgroundTasks,
     sheet_name: Optional[str] = Query(None, description="Target sheet name (uses SOURCES_SHEET_NAME config if not specified)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Export sources to Google Sheets for tracking
+    Export sources to Google Sheets for tracking (background job - poll /sync/jobs/{id})
     """
+    user_id = current_user.id
+    _require_sync_lock(user_id)
     try:
-        result = sync_service.sync_sources_to_sheets(db, current_user.id, sheet_name)
-        
-        return APIResponse(
-            success=result["success"],
-            message=result["message"],
-            data=result
+        job_id = _create_job(db, user_id, "sources_to_sheets")
+        background_tasks.add_task(
+            _run_sync_job, job_id, user_id,
+            lambda job_db: sync_service.sync_sources_to_sheets(job_db, user_id, sheet_name)
         )
-        
+        return _queued_response(job_id, "sources_to_sheets")
+
     except Exception as e:
+        _release_sync_lock(user_id)
         raise HTTPException(status_code=500, detail=f"Error exporting sources to sheets: {str(e)}")
 
 
-@router.post("/full-sync", response_model=APIResponse)
+@router.post("/full-sync", response_model=APIResponse, status_code=202)
 async def full_sync(
-    direction: str = Query("bidirectional", pattern="^(to_sheets|from_sheets|bidirectional)$", description="Sync direction"),
+    background_tasks: BackgroundTasks,
+    direction: Literal["to_sheets", "from_sheets", "bidirectional"] = Query("bidirectional", description="Sync direction"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Perform full synchronization between SQLite and Google Sheets
-    
+    (background job - poll /sync/jobs/{id})
+
     Directions:
     - to_sheets: Export SQLite data to Google Sheets
     - from_sheets: Import Google Sheets data to SQLite
     - bidirectional: Both import and export
     """
+    user_id = current_user.id
+    _require_sync_lock(user_id)
     try:
-        result = sync_service.full_sync(db, current_user.id, direction)
-        
-        return APIResponse(
-            success=result["success"],
-            message=result["message"],
-            data=result
+        job_id = _create_job(db, user_id, "full_sync")
+        background_tasks.add_task(
+            _run_sync_job, job_id, user_id,
+            lambda job_db: sync_service.full_sync(job_db, user_id, direction)
         )
-        
+        return _queued_response(job_id, "full_sync")
+
     except Exception as e:
+        _release_sync_lock(user_id)
         raise HTTPException(status_code=500, detail=f"Error performing full sync: {str(e)}")
 
 
+@router.get("/jobs/{job_id}", response_model=APIResponse)
+async def get_sync_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Poll status/result của một background sync job
+    """
+    try:
+        job = db.query(SyncJob).filter(
+            SyncJob.id == job_id,
+            SyncJob.user_id == current_user.id
+        ).first()
+
+        if not job:
+            raise HTTPException(status_code=404, detail="Sync job not found")
+
+        return APIResponse(
+            success=True,
+            message=f"Sync job is {job.status.value}",
+            data={
+                "job_id": job.id,
+                "kind": job.kind,
+                "status": job.status.value,
+                "result": job.result_json,
+                "error": job.error_message,
+                "created_at": job.created_at.isoformat() if job.created_at else None,
+                "completed_at": job.completed_at.isoformat() if job.completed_at else None
+            }
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting sync job: {str(e)}")
+
+
 @router.get("/status", response_model=APIResponse)
 async def get_sync_status(
     db: Session = Depends(get_db),
@@ -141,45 +308,60 @@ async def get_sync_status(
     Get current synchronization status and statistics
     """
     try:
-        result = sync_service.get_sync_status(db, current_user.id)
-        
-        return APIResponse(
-            success=result["success"],
-            message="Sync status retrieved successfully",
-            data=result
-        )
-        
+        user_id = current_user.id
+
+        def _compute() -> APIResponse:
+            result = sync_service.get_sync_status(db, user_id)
+            return APIResponse(
+                success=result["success"],
+                message="Sync status retrieved successfully",
+                data=result
+            )
+
+        # UI poll vài giây một lần - cache hit bỏ qua toàn bộ DB queries
+        # + serialization; jobs bust cache khi state đổi. Compute chạy
+        # trên threadpool vì cache miss kéo cả Sheets count (network I/O)
+        cache_key = make_key(f"sync_status:{user_id}", {})
+        return await run_in_threadpool(get_or_compute, cache_key, _STATUS_TTL, _compute)
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting sync status: {str(e)}")
 
 
-@router.post("/auto-sync", response_model=APIResponse)
+@router.post("/auto-sync", response_model=APIResponse, status_code=202)
 async def trigger_auto_sync(
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Manually trigger automatic synchronization
+    Manually trigger automatic synchronization (background job - poll /sync/jobs/{id})
     """
+    user_id = current_user.id
+    _require_sync_lock(user_id)
     try:
-        success = sync_service.schedule_auto_sync(current_user.id)
-        
-        if success:
-            return APIResponse(
-                success=True,
-                message="Auto-sync completed successfully"
-            )
-        else:
-            return APIResponse(
-                success=False,
-                message="Auto-sync failed or is disabled"
-            )
-        
+        job_id = _create_job(db, user_id, "auto_sync")
+
+        def _run_auto_sync(job_db: Session) -> Dict[str, Any]:
+            success = sync_service.schedule_auto_sync(user_id)
+            return {
+                "success": success,
+                "message": (
+                    "Auto-sync completed successfully" if success
+                    else "Auto-sync failed or is disabled"
+                )
+            }
+
+        background_tasks.add_task(_run_sync_job, job_id, user_id, _run_auto_sync)
+        return _queued_response(job_id, "auto_sync")
+
     except Exception as e:
+        _release_sync_lock(user_id)
         raise HTTPException(status_code=500, detail=f"Error triggering auto-sync: {str(e)}")
 
 
 @router.get("/config", response_model=APIResponse)
-async def get_sync_config():
+async def get_sync_config(db: Session = Depends(get_db)):
     """
     Get synchronization configuration
     """
@@ -187,9 +369,9 @@ async def get_sync_config():
         return APIResponse(
             success=True,
             message="Sync configuration retrieved successfully",
-            data=sync_service.sync_config
+            data=sync_service.load_sync_config(db)
         )
-        
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting sync config: {str(e)}")
 
@@ -198,60 +380,177 @@ async def get_sync_config():
 async def update_sync_config(
     enabled: Optional[bool] = Query(None, description="Enable/disable sync"),
     auto_sync_interval: Optional[int] = Query(None, ge=300, le=86400, description="Auto-sync interval in seconds"),
-    conflict_resolution: Optional[str] = Query(None, pattern="^(sqlite_wins|sheets_wins|manual)$", description="Conflict resolution strategy")
+    conflict_resolution: Optional[Literal["sqlite_wins", "sheets_wins", "manual"]] = Query(None, description="Conflict resolution strategy"),
+    db: Session = Depends(get_db)
 ):
     """
     Update synchronization configuration
     """
     try:
+        updates: Dict[str, Any] = {}
         if enabled is not None:
-            sync_service.sync_config["enabled"] = enabled
-        
+            updates["enabled"] = enabled
+
         if auto_sync_interval is not None:
-            sync_service.sync_config["auto_sync_interval"] = auto_sync_interval
-        
+            updates["auto_sync_interval"] = auto_sync_interval
+
         if conflict_resolution is not None:
-            sync_service.sync_config["conflict_resolution"] = conflict_resolution
-        
+            updates["conflict_resolution"] = conflict_resolution
+
         return APIResponse(
             success=True,
             message="Sync configuration updated successfully",
-            data=sync_service.sync_config
+            data=sync_service.save_sync_config(db, updates)
         )
-        
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating sync config: {str(e)}")
 
 
+_PROBE_TTL = 10
+
+# Số row trống tối đa blank inline trong batchUpdate đầu khi force-sync
+# với clear_first; tail lớn hơn dùng values.clear open-ended thay vì
+# upload hàng nghìn row trống
+_CLEAR_TAIL_ROWS = 500
+
+# Số row mỗi batchUpdate khi force-sync - giữ payload dưới size cap của
+# Sheets API và cho phép retry theo chunk
+_EXPORT_CHUNK_ROWS = 500
+
+
+def _chunked(rows, size: int):
+    """Yield các list tối đa `size` phần tử từ một iterable"""
+    it = iter(rows)
+    while True:
+        block = list(islice(it, size))
+        if not block:
+            return
+        yield block
+
+
+def _text(value) -> str:
+    return value or ""
+
+
+def _num(value) -> str:
+    return str(value) if value else "0"
+
+
+def _score(value) -> str:
+    return str(value) if value else ""
+
+
+# Converter per cột, theo đúng thứ tự select trong get_export_rows.
+# Row từ projection iterate positional nên build row là một C-level zip
+# qua tuple này thay vì 20 lần attribute lookup + inline branch mỗi row.
+_EXPORT_CONVERTERS = (
+    str,                                                            # Listing ID
+    _text,                                                          # eBay Item ID
+    _text,                                                          # SKU
+    _text,                                                          # Current Title
+    _text,                                                          # Optimized Title
+    _text,                                                          # Description
+    _text,                                                          # Category
+    _score,                                                         # Price
+    _num,                                                           # Quantity
+    _text,                                                          # Condition
+    lambda v: v.value,                                              # Status
+    lambda v: ",".join(v) if v else "",                             # Keywords
+    lambda v: orjson.dumps(v).decode() if v else "{}",              # Item Specifics
+    _num,                                                           # Views
+    _num,                                                           # Watchers
+    _num,                                                           # Sold
+    _score,                                                         # Performance Score
+    _score,                                                         # SEO Score
+    lambda v: v.isoformat() if v else "",                           # Created
+    lambda v: v.isoformat() if v else ""                            # Last Updated
+)
+
+
+def _listing_export_row(listing) -> list:
+    """Một listing Row (projection) -> row 20 cột cho force-sync export"""
+    return [conv(value) for conv, value in zip(_EXPORT_CONVERTERS, listing)]
+
+# Body của fallback response render sẵn một lần lúc import - branch này
+# hot khi UI poll status badge mà Sheets không khả dụng. Mỗi request vẫn
+# trả Response mới (middleware mutate headers nên không share instance).
+_FALLBACK_BODY = ORJSONResponse({
+    "success": False,
+    "message": "Using fallback mode - Google Sheets not available",
+    "data": {"fallback_mode": True}
+}).body
+
+
+def _probe_sheets(sheets_service) -> int:
+    """Lightweight connectivity probe - metadata-only spreadsheets.get
+
+    Trả về số sheet trong spreadsheet. Chỉ fetch sheetId properties
+    (vài chục byte) thay vì kéo toàn bộ listing rows, nên probe gần như
+    không tốn read quota dù frontend poll liên tục.
+    """
+    result = _execute_with_backoff(
+        sheets_service.service.spreadsheets().get(
+            spreadsheetId=sheets_service.spreadsheet_id,
+            fields="sheets(properties(sheetId))"
+        )
+    )
+    return len(result.get("sheets", []))
+
+
+def _sheet_row_counts(sheets_service) -> Dict[str, int]:
+    """Row counts cho mọi sheet trong một metadata round-trip
+
+    spreadsheets.get với fields title+gridProperties.rowCount trả về
+    ~100 byte thay vì download toàn bộ values của từng sheet, nên
+    validate là một HTTPS call thay vì ba lần kéo full data.
+    """
+    result = _execute_with_backoff(
+        sheets_service.service.spreadsheets().get(
+            spreadsheetId=sheets_service.spreadsheet_id,
+            fields="sheets(properties(title,gridProperties(rowCount)))"
+        )
+    )
+    return {
+        sheet["properties"]["title"]: sheet["properties"].get(
+            "gridProperties", {}
+        ).get("rowCount", 0)
+        for sheet in result.get("sheets", [])
+    }
+
+
 @router.post("/test-connection", response_model=APIResponse)
 async def test_sheets_connection():
     """
     Test Google Sheets API connection
     """
     try:
-        # Test by trying to get listings
         sheets_service = sync_service.sheets_service
-        
+
         if sheets_service.use_fallback:
-            return APIResponse(
-                success=False,
-                message="Using fallback mode - Google Sheets not available",
-                data={"fallback_mode": True}
-            )
-        
-        # Try to access sheets
-        listings = sheets_service.get_all_listings()
-        
+            return Response(content=_FALLBACK_BODY, media_type="application/json")
+
+        # Probe chạy trên threadpool để không block event loop; kết quả
+        # thành công cache 10s nên polling không đập vào Sheets quota.
+        # Exception không được cache - failure luôn probe lại.
+        cache_key = make_key("sheets_probe", {
+            "spreadsheet_id": sheets_service.spreadsheet_id
+        })
+        sheet_count = await run_in_threadpool(
+            get_or_compute, cache_key, _PROBE_TTL,
+            lambda: _probe_sheets(sheets_service)
+        )
+
         return APIResponse(
             success=True,
             message="Google Sheets connection successful",
             data={
                 "connection_status": "connected",
-                "listings_found": len(listings) if listings else 0,
+                "sheets_found": sheet_count,
                 "fallback_mode": False
             }
         )
-        
+
     except Exception as e:
         return APIResponse(
             success=False,
@@ -270,40 +569,54 @@ async def get_sync_history(
     Get synchronization history
     """
     try:
-        from app.models.database_models import ActivityLog
-        from sqlalchemy import desc, and_
-        
-        # Get sync-related activities
-        sync_activities = db.query(ActivityLog).filter(
-            and_(
-                ActivityLog.user_id == current_user.id,
-                ActivityLog.action.in_([
-                    "sync_export", "sync_import", "full_sync", 
-                    "sync_listings", "sync_orders"
-                ])
-            )
-        ).order_by(desc(ActivityLog.created_at)).limit(limit).all()
-        
-        # Format history
-        history = []
-        for activity in sync_activities:
-            history.append({
-                "id": activity.id,
-                "action": activity.action,
-                "entity_type": activity.entity_type,
-                "description": activity.description,
-                "success": activity.success,
-                "timestamp": activity.created_at.isoformat(),
-                "details": activity.new_values,
-                "error": activity.error_message
+        user_id = current_user.id
+
+        def _compute() -> bytes:
+            # Column projection thay vì ORM .all() - endpoint chỉ đọc
+            # nên bỏ qua full hydration (identity map, relationship
+            # setup) cho mỗi row; filter theo action_category int
+            # (indexed user_id+category+created_at) thay vì IN-list
+            stmt = select(
+                ActivityLog.id,
+                ActivityLog.action,
+                ActivityLog.entity_type,
+                ActivityLog.description,
+                ActivityLog.success,
+                ActivityLog.created_at,
+                ActivityLog.new_values,
+                ActivityLog.error_message
+            ).where(
+                ActivityLog.user_id == user_id,
+                ActivityLog.action_category == 1
+            ).order_by(ActivityLog.created_at.desc()).limit(limit)
+
+            history = [
+                {
+                    "id": row.id,
+                    "action": row.action,
+                    "entity_type": row.entity_type,
+                    "description": row.description,
+                    "success": row.success,
+                    "timestamp": row.created_at.isoformat(),
+                    "details": row.new_values,
+                    "error": row.error_message
+                }
+                for row in db.execute(stmt)
+            ]
+
+            # Cache giữ body bytes đã serialize - mỗi hit trong TTL chỉ
+            # trả lại buffer thay vì orjson.dumps lại cùng payload
+            return orjson.dumps({
+                "success": True,
+                "message": "Sync history retrieved successfully",
+                "data": history
             })
-        
-        return APIResponse(
-            success=True,
-            message="Sync history retrieved successfully",
-            data=history
-        )
-        
+
+        # Cache per (user, limit) - bust bởi jobs và clear-history
+        cache_key = make_key(f"sync_history:{user_id}", {"limit": limit})
+        body = get_or_compute(cache_key, _HISTORY_TTL, _compute)
+        return Response(content=body, media_type="application/json")
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting sync history: {str(e)}")
 
@@ -318,27 +631,35 @@ async def clear_sync_history(
     Clear old synchronization history
     """
     try:
-        from app.models.database_models import ActivityLog
-        from sqlalchemy import and_
-        from datetime import datetime, timedelta
-        
-        # Calculate cutoff date
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        # Delete old sync activities
-        deleted = db.query(ActivityLog).filter(
-            and_(
-                ActivityLog.user_id == current_user.id,
-                ActivityLog.action.in_([
-                    "sync_export", "sync_import", "full_sync", 
-                    "sync_listings", "sync_orders"
-                ]),
-                ActivityLog.created_at < cutoff_date
-            )
-        ).delete()
-        
-        db.commit()
-        
+        # Cutoff tính phía SQL theo UTC (created_at là server_default
+        # CURRENT_TIMESTAMP = UTC) - datetime.now() phía Python là local
+        # time nên lệch cutoff theo timezone của host. days đã được
+        # Query validate ge=1/le=365 nên f-string an toàn.
+        cutoff_expr = func.datetime('now', f'-{int(days)} days')
+
+        conditions = and_(
+            ActivityLog.user_id == current_user.id,
+            ActivityLog.action_category == 1,
+            ActivityLog.created_at < cutoff_expr
+        )
+
+        # Delete theo chunk 5000 id - một DELETE với id-subquery mỗi
+        # chunk thay vì SELECT ids về Python rồi DELETE lại, và commit
+        # giữa các chunk để không giữ write lock suốt một purge dài
+        batch_subq = select(ActivityLog.id).where(conditions).limit(5000).scalar_subquery()
+        deleted = 0
+        while True:
+            batch_deleted = db.query(ActivityLog).filter(
+                ActivityLog.id.in_(batch_subq)
+            ).delete(synchronize_session=False)
+            db.commit()
+            deleted += batch_deleted
+            if batch_deleted < 5000:
+                break
+
+        # History vừa đổi - bust cached reads của user
+        _invalidate_sync_caches(current_user.id)
+
         return APIResponse(
             success=True,
             message=f"Cleared {deleted} sync history records older than {days} days"
@@ -364,8 +685,8 @@ async def create_google_sheets():
                 data={"fallback_mode": True}
             )
         
-        # Create all required sheets
-        results = sheets_service.create_all_required_sheets()
+        # Create all required sheets - offload network I/O khỏi event loop
+        results = await run_in_threadpool(sheets_service.create_all_required_sheets)
         
         if "error" in results:
             return APIResponse(
@@ -388,6 +709,9 @@ async def create_google_sheets():
             }
         )
         
+    except HttpError:
+        # Để app-level handler map quota/transient error sang 503 + Retry-After
+        raise
     except Exception as e:
         return APIResponse(
             success=False,
@@ -396,107 +720,116 @@ async def create_google_sheets():
         )
 
 
-@router.post("/force-sync-listings", response_model=APIResponse)
+def _force_sync_listings_impl(db: Session, user_id: int, clear_first: bool) -> Dict[str, Any]:
+    """Body của force-sync chạy trong background job (worker thread)
+
+    Sheets I/O blocking trực tiếp ở đây là ổn - job không giữ event loop
+    hay connection-pool slot của request. Kết quả ghi vào job row.
+    """
+    # Column projection - export chỉ đọc scalar fields nên không cần
+    # hydrate full ORM entities cho tối đa 1000 rows
+    sqlite_listings = listing_repo.get_export_rows(db, user_id=user_id, limit=1000)
+
+    if not sqlite_listings:
+        return {"success": True, "message": "No listings found to sync", "synced_count": 0}
+
+    sheets_service = sync_service.sheets_service
+    target_sheet = getattr(settings, 'SHEET_NAME', 'Listings')
+
+    if not sheets_service.create_sheet_if_not_exists(target_sheet, "listings"):
+        return {"success": False, "message": "Failed to create Listings sheet"}
+
+    # Rows build qua generator và ghi theo chunk - peak memory O(chunk)
+    # thay vì materialize toàn bộ sheets payload, và mỗi chunk là một
+    # batchUpdate riêng nên retry theo chunk khi một request fail
+    total = len(sqlite_listings)
+    synced_count = 0
+
+    if sheets_service.service and sheets_service.spreadsheet_id:
+        # Tail thực tế dưới data mới lấy từ grid metadata (một call
+        # ~100 byte) thay vì đoán bằng cửa sổ cố định - sheet từng chứa
+        # nhiều row hơn total + _CLEAR_TAIL_ROWS sẽ không còn sót data cũ
+        tail_start = total + 2
+        tail_blank_rows = 0
+        if clear_first:
+            row_count = _sheet_row_counts(sheets_service).get(target_sheet, 0)
+            tail_blank_rows = max(0, row_count - (total + 1))
+            if tail_blank_rows > _CLEAR_TAIL_ROWS:
+                # Tail quá lớn để blank inline - một values.clear
+                # open-ended rẻ hơn ghi hàng nghìn row trống
+                _execute_with_backoff(
+                    sheets_service.service.spreadsheets().values().clear(
+                        spreadsheetId=sheets_service.spreadsheet_id,
+                        range=f"{target_sheet}!A{tail_start}:T"
+                    )
+                )
+                tail_blank_rows = 0
+
+        row_gen = (_listing_export_row(listing) for listing in sqlite_listings)
+        start_row = 2
+        for chunk in _chunked(row_gen, _EXPORT_CHUNK_ROWS):
+            end_row = start_row + len(chunk) - 1
+            data_entries = [{
+                "range": f"{target_sheet}!A{start_row}:T{end_row}",
+                "values": chunk
+            }]
+            if tail_blank_rows and start_row == 2:
+                # batchUpdate không có clear op - blank đúng số row cũ
+                # còn sót trong cùng request, không tốn round-trip
+                data_entries.append({
+                    "range": f"{target_sheet}!A{tail_start}:T{tail_start + tail_blank_rows - 1}",
+                    "values": [[""] * 20 for _ in range(tail_blank_rows)]
+                })
+
+            body = {
+                "valueInputOption": "USER_ENTERED",
+                "data": data_entries
+            }
+            _execute_with_backoff(
+                sheets_service.service.spreadsheets().values().batchUpdate(
+                    spreadsheetId=sheets_service.spreadsheet_id,
+                    body=body
+                )
+            )
+            synced_count += len(chunk)
+            start_row = end_row + 1
+    else:
+        synced_count = total
+
+    return {
+        "success": True,
+        "message": f"Force sync completed: {synced_count} listings exported with full SQLite data",
+        "synced_count": synced_count,
+        "target_sheet": target_sheet,
+        "cleared_first": clear_first,
+        "columns_count": 20
+    }
+
+
+@router.post("/force-sync-listings", response_model=APIResponse, status_code=202)
 async def force_sync_all_listings(
+    background_tasks: BackgroundTasks,
     clear_first: bool = Query(False, description="Clear existing data before sync"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Force sync all listings from SQLite to Google Sheets (bypass smart merge)
+    Force sync all listings to Google Sheets (background job - poll /sync/jobs/{id})
     """
+    user_id = current_user.id
+    _require_sync_lock(user_id)
+
     try:
-        from app.repositories import listing_repo
-        
-        # Get all listings from SQLite
-        result = listing_repo.get_multi(db, skip=0, limit=1000, user_id=current_user.id)
-        sqlite_listings = result["items"]
-        
-        if not sqlite_listings:
-            return APIResponse(
-                success=True,
-                message="No listings found to sync",
-                data={"synced_count": 0}
-            )
-        
-        # Get sheets service
-        sheets_service = sync_service.sheets_service
-        target_sheet = getattr(settings, 'SHEET_NAME', 'Listings')
-        
-        # Create sheet if needed
-        if not sheets_service.create_sheet_if_not_exists(target_sheet, "listings"):
-            return APIResponse(
-                success=False,
-                message="Failed to create Listings sheet"
-            )
-        
-        # Convert all listings to optimized sheets format (20 columns)
-        sheets_data = []
-        for listing in sqlite_listings:
-            sheets_row = [
-                str(listing.id),                                             # Listing ID
-                listing.item_id or "",                                      # eBay Item ID  
-                listing.sku or "",                                          # SKU
-                listing.title or "",                                        # Current Title
-                listing.optimized_title or "",                              # Optimized Title
-                listing.description or "",                                  # Description
-                listing.category or "",                                     # Category
-                str(listing.price) if listing.price else "",               # Price
-                str(listing.quantity) if listing.quantity else "0",        # Quantity
-                listing.condition or "",                                    # Condition
-                listing.status.value,                                       # Status
-                ",".join(listing.keywords) if listing.keywords else "",    # Keywords
-                json.dumps(listing.item_specifics) if listing.item_specifics else "{}", # Item Specifics
-                str(listing.views) if listing.views else "0",              # Views
-                str(listing.watchers) if listing.watchers else "0",        # Watchers
-                str(listing.sold) if listing.sold else "0",                # Sold
-                str(listing.performance_score) if listing.performance_score else "", # Performance Score
-                str(listing.seo_score) if listing.seo_score else "",       # SEO Score
-                listing.created_at.isoformat() if listing.created_at else "", # Created
-                listing.updated_at.isoformat() if listing.updated_at else ""  # Last Updated
-            ]
-            sheets_data.append(sheets_row)
-        
-        # Write to Google Sheets
-        if sheets_service.service and sheets_service.spreadsheet_id:
-            if clear_first:
-                # Clear existing data (except headers)
-                clear_range = f"{target_sheet}!A2:T"
-                sheets_service.service.spreadsheets().values().clear(
-                    spreadsheetId=sheets_service.spreadsheet_id,
-                    range=clear_range
-                ).execute()
-            
-            # Write all data
-            body = {
-                'values': sheets_data
-            }
-            
-            range_name = f"{target_sheet}!A2:T{len(sheets_data) + 1}"
-            sheets_service.service.spreadsheets().values().update(
-                spreadsheetId=sheets_service.spreadsheet_id,
-                range=range_name,
-                valueInputOption='USER_ENTERED',
-                body=body
-            ).execute()
-        
-        return APIResponse(
-            success=True,
-            message=f"Force sync completed: {len(sheets_data)} listings exported with full SQLite data",
-            data={
-                "synced_count": len(sheets_data),
-                "target_sheet": target_sheet,
-                "cleared_first": clear_first,
-                "columns_count": 20
-            }
+        job_id = _create_job(db, user_id, "force_sync_listings")
+        background_tasks.add_task(
+            _run_sync_job, job_id, user_id,
+            lambda job_db: _force_sync_listings_impl(job_db, user_id, clear_first)
         )
-        
+        return _queued_response(job_id, "force_sync_listings")
+
     except Exception as e:
-        return APIResponse(
-            success=False,
-            message=f"Force sync failed: {str(e)}",
-            data={"error": str(e)}
-        )
+        _release_sync_lock(user_id)
+        raise HTTPException(status_code=500, detail=f"Error triggering force sync: {str(e)}")
 
 
 @router.post("/validate-sheets", response_model=APIResponse)
@@ -514,53 +847,38 @@ async def validate_sheet_structure():
                 data={"fallback_mode": True}
             )
         
+        # Một metadata call (title + rowCount) thay vì ba lần download
+        # full sheet values chỉ để đếm rows; kết quả cache ngắn để
+        # validate lặp lại không tốn thêm round-trip
+        cache_key = make_key("sheets_row_counts", {
+            "spreadsheet_id": sheets_service.spreadsheet_id
+        })
+        row_counts = await run_in_threadpool(
+            get_or_compute, cache_key, _PROBE_TTL,
+            lambda: _sheet_row_counts(sheets_service)
+        )
+
+        required_sheets = {
+            "listings": sheets_service.sheet_name,
+            "orders": getattr(settings, 'ORDERS_SHEET_NAME', 'Orders'),
+            "sources": getattr(settings, 'SOURCES_SHEET_NAME', 'Sources')
+        }
+
         validation_results = {}
-        
-        # Check Listings sheet
-        try:
-            listings = sheets_service.get_all_listings()
-            validation_results["listings"] = {
-                "exists": True,
-                "row_count": len(listings) if listings else 0,
-                "status": "OK"
-            }
-        except Exception as e:
-            validation_results["listings"] = {
-                "exists": False,
-                "error": str(e),
-                "status": "ERROR"
-            }
-        
-        # Check Orders sheet
-        try:
-            orders = sheets_service.get_all_orders()
-            validation_results["orders"] = {
-                "exists": True,
-                "row_count": len(orders) if orders else 0,
-                "status": "OK"
-            }
-        except Exception as e:
-            validation_results["orders"] = {
-                "exists": False,
-                "error": str(e),
-                "status": "ERROR"
-            }
-        
-        # Check Sources sheet
-        try:
-            sources = sheets_service.get_all_sources()
-            validation_results["sources"] = {
-                "exists": True,
-                "row_count": len(sources) if sources else 0,
-                "status": "OK"
-            }
-        except Exception as e:
-            validation_results["sources"] = {
-                "exists": False,
-                "error": str(e),
-                "status": "ERROR"
-            }
-        
+        for key, sheet_title in required_sheets.items():
+            if sheet_title in row_counts:
+                validation_results[key] = {
+                    "exists": True,
+                    "row_count": row_counts[sheet_title],
+                    "status": "OK"
+                }
+            else:
+                validation_results[key] = {
+                    "exists": False,
+                    "error": f"Sheet '{sheet_title}' not found",
+                    "status": "ERROR"
+                }
+
         all_valid = all(result["status"] == "OK" for result in validation_results.values())
         
         return APIResponse(
@@ -569,6 +887,8 @@ async def validate_sheet_structure():
             data=validation_results
         )
         
+    except HttpError:
+        raise
     except Exception as e:
         return APIResponse(
             success=False,
@@ -4,14 +4,17 @@ Handles automation scheduling và performance monitoring API
 Single Responsibility: Manages automation API endpoints với comprehensive task management
 """
 
+import asyncio
+from functools import wraps
 from typing import List, Dict, Optional, Any
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db
 from app.core.auth import get_current_user, require_permission
+from app.core.opt_cache import get_or_compute, invalidate, make_key
 from app.services.automation_service import (
-    AutomationService, AutomationTask, AutomationTaskType, 
+    AutomationService, AutomationTask, AutomationTaskType,
     TaskFrequency, TaskStatus, PerformanceMonitor
 )
 from app.models.database_models import User
@@ -26,11 +29,38 @@ router = APIRouter()
 # Global automation service instance
 automation_service = AutomationService()
 
+# Summary/alerts aggregate qua toàn bộ metric history mỗi call - cache
+# ngắn đủ cho dashboard polling; bust khi scheduler start/stop
+_PERF_TTL = 60
+
+
+def handle_errors(message: str):
+    """Translate unexpected errors thành HTTPException 500 tại một chỗ
+
+    Mọi endpoint ở đây lặp lại đúng một khối try/except Exception ->
+    HTTPException(500, ...); decorator gom về một code path và giữ
+    HTTPException (404/400) đi qua nguyên vẹn - các khối cũ thiếu
+    re-raise nên nuốt chúng thành 500.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await fn(*args, **kwargs)
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"{message}: {str(e)}")
+        return wrapper
+    return decorator
+
+
 # ===========================================
 # TASK MANAGEMENT ENDPOINTS
 # ===========================================
 
 @router.get("/tasks", response_model=List[Dict[str, Any]])
+@handle_errors("Failed to get tasks")
 async def get_automation_tasks(
     status_filter: Optional[str] = Query(None, description="Filter by task status"),
     task_type_filter: Optional[str] = Query(None, description="Filter by task type"),
@@ -38,73 +68,62 @@ async def get_automation_tasks(
     db: Session = Depends(get_db)
 ):
     """Get all automation tasks"""
+    # Filters đẩy xuống service (inverted index) thay vì serialize
+    # hết rồi lọc lại; filter value không hợp lệ thì không task nào
+    # khớp - giữ nguyên behavior cũ
     try:
-        tasks = automation_service.get_tasks()
-        
-        # Apply filters
-        if status_filter:
-            tasks = [t for t in tasks if t["status"] == status_filter]
-        
-        if task_type_filter:
-            tasks = [t for t in tasks if t["task_type"] == task_type_filter]
-        
-        return tasks
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get tasks: {str(e)}")
+        status = TaskStatus(status_filter) if status_filter else None
+        task_type = AutomationTaskType(task_type_filter) if task_type_filter else None
+    except ValueError:
+        return []
+
+    return automation_service.get_tasks(status=status, task_type=task_type)
 
 @router.get("/tasks/{task_id}", response_model=Dict[str, Any])
+@handle_errors("Failed to get task")
 async def get_automation_task(
     task_id: str,
     current_user: User = Depends(require_permission("manager")),
     db: Session = Depends(get_db)
 ):
     """Get specific automation task"""
-    try:
-        task = automation_service.get_task(task_id)
-        
-        if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
-        
-        return task
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get task: {str(e)}")
+    task = automation_service.get_task(task_id)
+
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    return task
 
 @router.post("/tasks", response_model=Dict[str, Any])
+@handle_errors("Failed to create task")
 async def create_automation_task(
     task_request: AutomationTaskRequest,
     current_user: User = Depends(require_permission("admin")),
     db: Session = Depends(get_db)
 ):
     """Create new automation task"""
-    try:
-        # Create automation task
-        task = AutomationTask(
-            task_id=task_request.task_id,
-            task_type=AutomationTaskType(task_request.task_type),
-            frequency=TaskFrequency(task_request.frequency),
-            enabled=task_request.enabled,
-            parameters=task_request.parameters or {}
-        )
-        
-        success = automation_service.add_task(task)
-        
-        if not success:
-            raise HTTPException(status_code=400, detail="Failed to create task")
-        
-        return {
-            "success": True,
-            "message": f"Task {task_request.task_id} created successfully",
-            "task": task.to_dict()
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create task: {str(e)}")
+    # Create automation task
+    task = AutomationTask(
+        task_id=task_request.task_id,
+        task_type=AutomationTaskType(task_request.task_type),
+        frequency=TaskFrequency(task_request.frequency),
+        enabled=task_request.enabled,
+        parameters=task_request.parameters or {}
+    )
+
+    success = automation_service.add_task(task)
+
+    if not success:
+        raise HTTPException(status_code=400, detail="Failed to create task")
+
+    return {
+        "success": True,
+        "message": f"Task {task_request.task_id} created successfully",
+        "task": task.to_dict()
+    }
 
 @router.put("/tasks/{task_id}", response_model=Dict[str, Any])
+@handle_errors("Failed to update task")
 async def update_automation_task(
     task_id: str,
     task_update: AutomationTaskUpdate,
@@ -112,104 +131,95 @@ async def update_automation_task(
     db: Session = Depends(get_db)
 ):
     """Update automation task"""
-    try:
-        task = automation_service.tasks.get(task_id)
-        
-        if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
-        
-        # Update task properties
-        if task_update.enabled is not None:
-            task.enabled = task_update.enabled
-        
-        if task_update.frequency is not None:
-            task.frequency = TaskFrequency(task_update.frequency)
-            task.next_run = task.calculate_next_run()
-        
-        if task_update.parameters is not None:
-            task.parameters.update(task_update.parameters)
-        
-        return {
-            "success": True,
-            "message": f"Task {task_id} updated successfully",
-            "task": task.to_dict()
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update task: {str(e)}")
+    task = automation_service.get_task_obj(task_id)
+
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    # Update task properties
+    if task_update.enabled is not None:
+        task.enabled = task_update.enabled
+
+    if task_update.frequency is not None:
+        task.frequency = TaskFrequency(task_update.frequency)
+        task.next_run = task.calculate_next_run()
+
+    if task_update.parameters is not None:
+        task.update_parameters(task_update.parameters)
+
+    return {
+        "success": True,
+        "message": f"Task {task_id} updated successfully",
+        "task": task.to_dict()
+    }
 
 @router.delete("/tasks/{task_id}")
+@handle_errors("Failed to delete task")
 async def delete_automation_task(
     task_id: str,
     current_user: User = Depends(require_permission("admin")),
     db: Session = Depends(get_db)
 ):
     """Delete automation task"""
-    try:
-        success = automation_service.remove_task(task_id)
-        
-        if not success:
-            raise HTTPException(status_code=404, detail="Task not found")
-        
-        return {
-            "success": True,
-            "message": f"Task {task_id} deleted successfully"
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete task: {str(e)}")
+    success = automation_service.remove_task(task_id)
+
+    if not success:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    return {
+        "success": True,
+        "message": f"Task {task_id} deleted successfully"
+    }
 
 @router.post("/tasks/{task_id}/enable")
+@handle_errors("Failed to enable task")
 async def enable_automation_task(
     task_id: str,
     current_user: User = Depends(require_permission("admin")),
     db: Session = Depends(get_db)
 ):
     """Enable automation task"""
-    try:
-        success = automation_service.enable_task(task_id)
-        
-        if not success:
-            raise HTTPException(status_code=404, detail="Task not found")
-        
-        return {
-            "success": True,
-            "message": f"Task {task_id} enabled successfully"
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to enable task: {str(e)}")
+    success = automation_service.enable_task(task_id)
+
+    if not success:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    return {
+        "success": True,
+        "message": f"Task {task_id} enabled successfully"
+    }
 
 @router.post("/tasks/{task_id}/disable")
+@handle_errors("Failed to disable task")
 async def disable_automation_task(
     task_id: str,
     current_user: User = Depends(require_permission("admin")),
     db: Session = Depends(get_db)
 ):
     """Disable automation task"""
-    try:
-        success = automation_service.disable_task(task_id)
-        
-        if not success:
-            raise HTTPException(status_code=404, detail="Task not found")
-        
-        return {
-            "success": True,
-            "message": f"Task {task_id} disabled successfully"
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to disable task: {str(e)}")
+    success = automation_service.disable_task(task_id)
+
+    if not success:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    return {
+        "success": True,
+        "message": f"Task {task_id} disabled successfully"
+    }
 
 # ===========================================
 # TASK EXECUTION ENDPOINTS
 # ===========================================
 
+async def _execute_tasks_concurrently(tasks: List[AutomationTask]):
+    """Chạy một batch task đồng thời trên event loop"""
+    await asyncio.gather(
+        *(automation_service.execute_task(task) for task in tasks),
+        return_exceptions=True
+    )
+
 @router.post("/tasks/{task_id}/execute", response_model=Dict[str, Any])
+@handle_errors("Failed to execute task")
 async def execute_automation_task(
     task_id: str,
     background_tasks: BackgroundTasks,
@@ -217,31 +227,26 @@ async def execute_automation_task(
     db: Session = Depends(get_db)
 ):
     """Execute automation task immediately"""
-    try:
-        task = automation_service.tasks.get(task_id)
-        
-        if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
-        
-        if task.status == TaskStatus.RUNNING:
-            raise HTTPException(status_code=400, detail="Task is already running")
-        
-        # Execute task in background
-        background_tasks.add_task(automation_service.execute_task, task)
-        
-        return {
-            "success": True,
-            "message": f"Task {task_id} execution started",
-            "task_id": task_id,
-            "status": "started"
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to execute task: {str(e)}")
+    task = automation_service.get_task_obj(task_id)
+
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    if task.status == TaskStatus.RUNNING:
+        raise HTTPException(status_code=400, detail="Task is already running")
+
+    # Execute task in background
+    background_tasks.add_task(automation_service.execute_task, task)
+
+    return {
+        "success": True,
+        "message": f"Task {task_id} execution started",
+        "task_id": task_id,
+        "status": "started"
+    }
 
 @router.post("/execute-batch", response_model=Dict[str, Any])
+@handle_errors("Failed to execute batch")
 async def execute_batch_tasks(
     task_ids: List[str],
     background_tasks: BackgroundTasks,
@@ -249,58 +254,62 @@ async def execute_batch_tasks(
     db: Session = Depends(get_db)
 ):
     """Execute multiple tasks in batch"""
-    try:
-        results = []
-        
-        for task_id in task_ids:
-            task = automation_service.tasks.get(task_id)
-            
-            if not task:
-                results.append({"task_id": task_id, "status": "error", "message": "Task not found"})
-                continue
-            
-            if task.status == TaskStatus.RUNNING:
-                results.append({"task_id": task_id, "status": "skipped", "message": "Already running"})
-                continue
-            
-            # Execute task in background
-            background_tasks.add_task(automation_service.execute_task, task)
-            results.append({"task_id": task_id, "status": "started", "message": "Execution started"})
-        
-        return {
-            "success": True,
-            "message": f"Batch execution started for {len(task_ids)} tasks",
-            "results": results
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to execute batch: {str(e)}")
+    results = []
+    to_run = []
+
+    for task_id in task_ids:
+        task = automation_service.get_task_obj(task_id)
+
+        if not task:
+            results.append({"task_id": task_id, "status": "error", "message": "Task not found"})
+            continue
+
+        if task.status == TaskStatus.RUNNING:
+            results.append({"task_id": task_id, "status": "skipped", "message": "Already running"})
+            continue
+
+        to_run.append(task)
+        results.append({"task_id": task_id, "status": "started", "message": "Execution started"})
+
+    # Một background task gather cả batch - BackgroundTasks chạy
+    # từng entry tuần tự nên add per-task sẽ serialize N tasks;
+    # gather cho batch latency = max(t_i) thay vì sum(t_i)
+    if to_run:
+        background_tasks.add_task(_execute_tasks_concurrently, to_run)
+
+    return {
+        "success": True,
+        "message": f"Batch execution started for {len(task_ids)} tasks",
+        "results": results
+    }
 
 # ===========================================
 # PERFORMANCE MONITORING ENDPOINTS
 # ===========================================
 
 @router.get("/performance/summary", response_model=Dict[str, Any])
+@handle_errors("Failed to get performance summary")
 async def get_performance_summary(
     hours: int = Query(default=24, description="Time period in hours"),
     current_user: User = Depends(require_permission("manager")),
     db: Session = Depends(get_db)
 ):
     """Get comprehensive performance summary"""
-    try:
-        summary = automation_service.get_performance_summary(hours=hours)
-        
-        return {
-            "success": True,
-            "data": summary,
-            "period_hours": hours,
-            "generated_at": automation_service.performance_monitor.metrics.get("generated_at", "")
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get performance summary: {str(e)}")
+    cache_key = make_key("perf_summary", {"hours": hours})
+    summary = get_or_compute(
+        cache_key, _PERF_TTL,
+        lambda: automation_service.get_performance_summary(hours=hours)
+    )
+
+    return {
+        "success": True,
+        "data": summary,
+        "period_hours": hours,
+        "generated_at": automation_service.performance_monitor.metrics.get("generated_at", "")
+    }
 
 @router.get("/performance/metrics/{metric_name}", response_model=Dict[str, Any])
+@handle_errors("Failed to get metric")
 async def get_performance_metric(
     metric_name: str,
     hours: int = Query(default=24, description="Time period in hours"),
@@ -308,30 +317,20 @@ async def get_performance_metric(
     db: Session = Depends(get_db)
 ):
     """Get specific performance metric"""
-    try:
-        metrics = automation_service.performance_monitor.metrics.get(metric_name, [])
-        
-        # Filter by time period
-        from datetime import datetime, timedelta
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        
-        recent_metrics = [
-            m for m in metrics 
-            if datetime.fromisoformat(m["timestamp"]) > cutoff_time
-        ]
-        
-        return {
-            "success": True,
-            "metric_name": metric_name,
-            "data": recent_metrics,
-            "count": len(recent_metrics),
-            "period_hours": hours
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get metric: {str(e)}")
+    recent_metrics = automation_service.performance_monitor.get_metric_since(
+        metric_name, hours=hours
+    )
+
+    return {
+        "success": True,
+        "metric_name": metric_name,
+        "data": recent_metrics,
+        "count": len(recent_metrics),
+        "period_hours": hours
+    }
 
 @router.get("/performance/alerts", response_model=Dict[str, Any])
+@handle_errors("Failed to get alerts")
 async def get_performance_alerts(
     hours: int = Query(default=24, description="Time period in hours"),
     severity: Optional[str] = Query(None, description="Filter by severity: high, medium, low"),
@@ -339,168 +338,150 @@ async def get_performance_alerts(
     db: Session = Depends(get_db)
 ):
     """Get performance alerts"""
-    try:
-        alerts = automation_service.performance_monitor.get_active_alerts(hours=hours)
-        
-        # Filter by severity if specified
-        if severity:
-            alerts = [a for a in alerts if a.get("severity") == severity]
-        
-        return {
-            "success": True,
-            "alerts": alerts,
-            "count": len(alerts),
-            "period_hours": hours,
-            "severity_filter": severity
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get alerts: {str(e)}")
+    cache_key = make_key("perf_alerts", {"hours": hours, "severity": severity})
+
+    def _compute():
+        return automation_service.performance_monitor.get_active_alerts(
+            hours=hours, severity=severity
+        )
+
+    alerts = get_or_compute(cache_key, _PERF_TTL, _compute)
+
+    return {
+        "success": True,
+        "alerts": alerts,
+        "count": len(alerts),
+        "period_hours": hours,
+        "severity_filter": severity
+    }
 
 # ===========================================
 # SCHEDULER MANAGEMENT ENDPOINTS
 # ===========================================
 
 @router.post("/scheduler/start")
+@handle_errors("Failed to start scheduler")
 async def start_automation_scheduler(
     background_tasks: BackgroundTasks,
     current_user: User = Depends(require_permission("admin")),
     db: Session = Depends(get_db)
 ):
     """Start automation scheduler"""
-    try:
-        if automation_service.running:
-            return {
-                "success": True,
-                "message": "Scheduler is already running",
-                "status": "running"
-            }
-        
-        # Start scheduler in background
-        background_tasks.add_task(automation_service.run_scheduler)
-        
+    if automation_service.running:
         return {
             "success": True,
-            "message": "Automation scheduler started",
-            "status": "started"
+            "message": "Scheduler is already running",
+            "status": "running"
         }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to start scheduler: {str(e)}")
+
+    # Start scheduler in background
+    background_tasks.add_task(automation_service.run_scheduler)
+    invalidate("opt:perf_")
+
+    return {
+        "success": True,
+        "message": "Automation scheduler started",
+        "status": "started"
+    }
 
 @router.post("/scheduler/stop")
+@handle_errors("Failed to stop scheduler")
 async def stop_automation_scheduler(
     current_user: User = Depends(require_permission("admin")),
     db: Session = Depends(get_db)
 ):
     """Stop automation scheduler"""
-    try:
-        automation_service.stop_scheduler()
-        
-        return {
-            "success": True,
-            "message": "Automation scheduler stopped",
-            "status": "stopped"
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to stop scheduler: {str(e)}")
+    automation_service.stop_scheduler()
+    invalidate("opt:perf_")
+
+    return {
+        "success": True,
+        "message": "Automation scheduler stopped",
+        "status": "stopped"
+    }
 
 @router.get("/scheduler/status")
+@handle_errors("Failed to get scheduler status")
 async def get_scheduler_status(
     current_user: User = Depends(require_permission("manager")),
     db: Session = Depends(get_db)
 ):
     """Get automation scheduler status"""
-    try:
-        return {
-            "success": True,
-            "status": "running" if automation_service.running else "stopped",
-            "total_tasks": len(automation_service.tasks),
-            "enabled_tasks": len([t for t in automation_service.tasks.values() if t.enabled]),
-            "active_tasks": len([t for t in automation_service.tasks.values() if t.status == TaskStatus.RUNNING])
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get scheduler status: {str(e)}")
+    return {
+        "success": True,
+        "status": "running" if automation_service.running else "stopped",
+        "total_tasks": len(automation_service.tasks),
+        "enabled_tasks": automation_service.enabled_count,
+        "active_tasks": automation_service.count_by_status(TaskStatus.RUNNING)
+    }
 
 # ===========================================
 # CONFIGURATION ENDPOINTS
 # ===========================================
 
 @router.get("/config/task-types")
+@handle_errors("Failed to get task types")
 async def get_available_task_types(
     current_user: User = Depends(require_permission("manager")),
     db: Session = Depends(get_db)
 ):
     """Get available automation task types"""
-    try:
-        task_types = [
-            {
-                "value": task_type.value,
-                "label": task_type.value.replace("_", " ").title(),
-                "description": _get_task_type_description(task_type)
-            }
-            for task_type in AutomationTaskType
-        ]
-        
-        return {
-            "success": True,
-            "task_types": task_types
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get task types: {str(e)}")
+    return {
+        "success": True,
+        "task_types": _TASK_TYPE_PAYLOAD
+    }
 
 @router.get("/config/frequencies")
+@handle_errors("Failed to get frequencies")
 async def get_available_frequencies(
     current_user: User = Depends(require_permission("manager")),
     db: Session = Depends(get_db)
 ):
     """Get available task frequencies"""
-    try:
-        frequencies = [
-            {
-                "value": freq.value,
-                "label": freq.value.title(),
-                "description": _get_frequency_description(freq)
-            }
-            for freq in TaskFrequency
-        ]
-        
-        return {
-            "success": True,
-            "frequencies": frequencies
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get frequencies: {str(e)}")
+    return {
+        "success": True,
+        "frequencies": _FREQUENCY_PAYLOAD
+    }
 
 # ===========================================
 # UTILITY FUNCTIONS
 # ===========================================
 
-def _get_task_type_description(task_type: AutomationTaskType) -> str:
-    """Get description for task type"""
-    descriptions = {
-        AutomationTaskType.SYNC_SUPPLIERS: "Synchronize supplier data to Google Sheets",
-        AutomationTaskType.SYNC_PRODUCTS: "Synchronize product data to Google Sheets",
-        AutomationTaskType.SYNC_ORDERS: "Synchronize order data to Google Sheets",
-        AutomationTaskType.BACKUP_DATA: "Create comprehensive data backup",
-        AutomationTaskType.OPTIMIZE_PRICING: "Optimize product pricing based on algorithms",
-        AutomationTaskType.MONITOR_PERFORMANCE: "Monitor system and business performance",
-        AutomationTaskType.REORDER_CHECK: "Check for products needing reorder",
-        AutomationTaskType.SUPPLIER_EVALUATION: "Evaluate supplier performance metrics"
+# Enum-static nên build một lần lúc import - config endpoints chỉ trả
+# payload có sẵn thay vì rebuild dict + list mỗi request
+_TASK_TYPE_DESCRIPTIONS = {
+    AutomationTaskType.SYNC_SUPPLIERS: "Synchronize supplier data to Google Sheets",
+    AutomationTaskType.SYNC_PRODUCTS: "Synchronize product data to Google Sheets",
+    AutomationTaskType.SYNC_ORDERS: "Synchronize order data to Google Sheets",
+    AutomationTaskType.BACKUP_DATA: "Create comprehensive data backup",
+    AutomationTaskType.OPTIMIZE_PRICING: "Optimize product pricing based on algorithms",
+    AutomationTaskType.MONITOR_PERFORMANCE: "Monitor system and business performance",
+    AutomationTaskType.REORDER_CHECK: "Check for products needing reorder",
+    AutomationTaskType.SUPPLIER_EVALUATION: "Evaluate supplier performance metrics"
+}
+
+_FREQUENCY_DESCRIPTIONS = {
+    TaskFrequency.HOURLY: "Execute every hour",
+    TaskFrequency.DAILY: "Execute once per day",
+    TaskFrequency.WEEKLY: "Execute once per week",
+    TaskFrequency.MONTHLY: "Execute once per month",
+    TaskFrequency.CUSTOM: "Execute at custom intervals"
+}
+
+_TASK_TYPE_PAYLOAD = [
+    {
+        "value": task_type.value,
+        "label": task_type.value.replace("_", " ").title(),
+        "description": _TASK_TYPE_DESCRIPTIONS.get(task_type, "Custom automation task")
     }
-    return descriptions.get(task_type, "Custom automation task")
-
-def _get_frequency_description(frequency: TaskFrequency) -> str:
-    """Get description for frequency"""
-    descriptions = {
-        TaskFrequency.HOURLY: "Execute every hour",
-        TaskFrequency.DAILY: "Execute once per day",
-        TaskFrequency.WEEKLY: "Execute once per week",
-        TaskFrequency.MONTHLY: "Execute once per month",
-        TaskFrequency.CUSTOM: "Execute at custom intervals"
+    for task_type in AutomationTaskType
+]
+
+_FREQUENCY_PAYLOAD = [
+    {
+        "value": freq.value,
+        "label": freq.value.title(),
+        "description": _FREQUENCY_DESCRIPTIONS.get(freq, "Custom frequency")
     }
-    return descriptions.get(frequency, "Custom frequency")
\ No newline at end of file
+    for freq in TaskFrequency
+]
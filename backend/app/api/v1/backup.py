@@ -4,20 +4,21 @@ Handles comprehensive backup operations with supplier/product data
 Single Responsibility: Manages backup API endpoints with comprehensive data export
 """
 
+import asyncio
+
 from typing import List, Dict, Optional, Any
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.db.database import get_db
+from app.db.database import get_db, SessionLocal
 from app.core.auth import get_current_user, require_permission
-from app.services.enhanced_google_sheets import EnhancedGoogleSheetsService
-from app.services.supplier_service import SupplierService
-from app.services.product_service import ProductService
-from app.models.database_models import User, Supplier, Product, Order, Listing, Account
-from app.schemas.schemas import (
-    BackupResponse, BackupStatus, BackupRequest,
-    SupplierSchema, ProductSchema
+from app.services.enhanced_google_sheets import (
+    EnhancedGoogleSheetsService,
+    get_enhanced_sheets_service,
 )
+from app.models.database_models import User, Supplier, Product, Order, Listing, Account
+from app.schemas.schemas import BackupResponse, BackupStatus, BackupRequest
 
 router = APIRouter()
 
@@ -26,19 +27,14 @@ router = APIRouter()
 # ===========================================
 
 @router.post("/create-backup", response_model=BackupResponse)
-async def create_comprehensive_backup(
+def create_comprehensive_backup(
     backup_request: BackupRequest,
     background_tasks: BackgroundTasks,
     current_user: User = Depends(require_permission("admin")),
-    db: Session = Depends(get_db)
+    sheets_service: EnhancedGoogleSheetsService = Depends(get_enhanced_sheets_service)
 ):
     """Create comprehensive backup of all system data"""
     try:
-        # Initialize services
-        sheets_service = EnhancedGoogleSheetsService()
-        supplier_service = SupplierService(db)
-        product_service = ProductService(db)
-        
         # Create backup spreadsheet
         backup_spreadsheet_id = sheets_service.create_backup_spreadsheet()
         
@@ -49,8 +45,7 @@ async def create_comprehensive_backup(
         background_tasks.add_task(
             execute_comprehensive_backup,
             backup_spreadsheet_id,
-            backup_request,
-            db
+            backup_request
         )
         
         return BackupResponse(
@@ -65,35 +60,37 @@ async def create_comprehensive_backup(
         raise HTTPException(status_code=500, detail=f"Backup creation failed: {str(e)}")
 
 @router.get("/backup-status/{backup_id}", response_model=BackupStatus)
-async def get_backup_status(
+def get_backup_status(
     backup_id: str,
     current_user: User = Depends(require_permission("admin")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    sheets_service: EnhancedGoogleSheetsService = Depends(get_enhanced_sheets_service)
 ):
     """Get status of backup operation"""
     try:
-        sheets_service = EnhancedGoogleSheetsService()
-        
-        # Check if backup spreadsheet exists and has data
-        backup_info = sheets_service.get_sheet_data(backup_id, "Backup_Info")
-        
-        if not backup_info:
+        # Một values.batchGet (chỉ cột A) cho cả 6 sheet thay vì 6 lần
+        # get_sheet_data tuần tự kéo full rows chỉ để len()
+        row_counts = sheets_service.batch_get_row_counts(backup_id, [
+            "Backup_Info", "All_Orders", "All_Listings",
+            "All_Suppliers", "All_Products", "eBay_Accounts"
+        ])
+
+        if not row_counts.get("Backup_Info"):
             return BackupStatus(
                 backup_id=backup_id,
                 status="not_found",
                 progress=0,
                 message="Backup not found"
             )
-        
-        # Get data from all sheets to determine progress
+
         sheets_data = {
-            "orders": len(sheets_service.get_sheet_data(backup_id, "All_Orders")),
-            "listings": len(sheets_service.get_sheet_data(backup_id, "All_Listings")),
-            "suppliers": len(sheets_service.get_sheet_data(backup_id, "All_Suppliers")),
-            "products": len(sheets_service.get_sheet_data(backup_id, "All_Products")),
-            "accounts": len(sheets_service.get_sheet_data(backup_id, "eBay_Accounts"))
+            "orders": row_counts.get("All_Orders", 0),
+            "listings": row_counts.get("All_Listings", 0),
+            "suppliers": row_counts.get("All_Suppliers", 0),
+            "products": row_counts.get("All_Products", 0),
+            "accounts": row_counts.get("eBay_Accounts", 0)
         }
-        
+
         total_records = sum(sheets_data.values())
         
         return BackupStatus(
@@ -108,85 +105,115 @@ async def get_backup_status(
         raise HTTPException(status_code=500, detail=f"Failed to get backup status: {str(e)}")
 
 @router.post("/sync-to-backup/{backup_id}")
-async def sync_data_to_backup(
+def sync_data_to_backup(
     backup_id: str,
     data_types: List[str] = Query(default=["all"]),
+    page: int = Query(default=1, ge=1),
+    page_size: int = Query(default=500, ge=1, le=1000),
     current_user: User = Depends(require_permission("admin")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    sheets_service: EnhancedGoogleSheetsService = Depends(get_enhanced_sheets_service)
 ):
-    """Sync specific data types to existing backup"""
+    """Sync specific data types to existing backup (orders/listings phân trang theo page/page_size)"""
     try:
-        sheets_service = EnhancedGoogleSheetsService()
-        supplier_service = SupplierService(db)
-        product_service = ProductService(db)
-        
+        offset = (page - 1) * page_size
+
         synced_data = {}
-        
+        # Suppliers fetch một lần - cả nhánh suppliers lẫn suppliers_map
+        # cho products dùng chung list thay vì SELECT lại cùng rows
+        supplier_items = None
+
         if "all" in data_types or "suppliers" in data_types:
             # Sync suppliers
-            suppliers = supplier_service.get_all_suppliers(size=1000)
-            success = sheets_service.sync_suppliers_to_backup(backup_id, suppliers.items)
-            synced_data["suppliers"] = len(suppliers.items) if success else 0
-        
+            supplier_items = db.query(Supplier).limit(1000).all()
+            success = sheets_service.sync_suppliers_to_backup(backup_id, supplier_items)
+            synced_data["suppliers"] = len(supplier_items) if success else 0
+
         if "all" in data_types or "products" in data_types:
             # Sync products
-            products = product_service.get_all_products(size=1000)
-            suppliers_map = {s.id: s for s in supplier_service.get_all_suppliers(size=1000).items}
-            success = sheets_service.sync_products_to_backup(backup_id, products.items, suppliers_map)
-            synced_data["products"] = len(products.items) if success else 0
+            products = db.query(Product).limit(1000).all()
+            if supplier_items is None:
+                supplier_items = db.query(Supplier).limit(1000).all()
+            suppliers_map = {s.id: s for s in supplier_items}
+            success = sheets_service.sync_products_to_backup(backup_id, products, suppliers_map)
+            synced_data["products"] = len(products) if success else 0
         
         if "all" in data_types or "orders" in data_types:
-            # Sync orders
-            orders = db.query(Order).limit(1000).all()
-            success = sheets_service.sync_orders_to_backup(backup_id, orders)
-            synced_data["orders"] = len(orders) if success else 0
-        
+            # Sync orders - LIMIT/OFFSET trong SQL theo (created_at, id)
+            # thay vì cap cứng 1000; stream theo batch 500, đếm bằng SQL
+            success = sheets_service.sync_orders_to_backup(
+                backup_id,
+                db.query(Order)
+                .order_by(Order.created_at.desc(), Order.id)
+                .offset(offset).limit(page_size).yield_per(500)
+            )
+            total_orders = db.query(func.count(Order.id)).scalar() or 0
+            order_count = max(0, min(total_orders - offset, page_size))
+            synced_data["orders"] = order_count if success else 0
+
         if "all" in data_types or "listings" in data_types:
             # Sync listings
-            listings = db.query(Listing).limit(1000).all()
-            success = sheets_service.sync_listings_to_backup(backup_id, listings)
-            synced_data["listings"] = len(listings) if success else 0
-        
+            success = sheets_service.sync_listings_to_backup(
+                backup_id,
+                db.query(Listing)
+                .order_by(Listing.created_at.desc(), Listing.id)
+                .offset(offset).limit(page_size).yield_per(500)
+            )
+            total_listings = db.query(func.count(Listing.id)).scalar() or 0
+            listing_count = max(0, min(total_listings - offset, page_size))
+            synced_data["listings"] = listing_count if success else 0
+
         if "all" in data_types or "accounts" in data_types:
             # Sync accounts
-            accounts = db.query(Account).all()
-            success = sheets_service.sync_accounts_to_backup(backup_id, accounts)
-            synced_data["accounts"] = len(accounts) if success else 0
+            success = sheets_service.sync_accounts_to_backup(
+                backup_id, db.query(Account).yield_per(500)
+            )
+            account_count = db.query(func.count(Account.id)).scalar() or 0
+            synced_data["accounts"] = account_count if success else 0
         
         return {
             "success": True,
             "message": "Data synced to backup successfully",
             "backup_id": backup_id,
             "synced_data": synced_data,
-            "total_records": sum(synced_data.values())
+            "total_records": sum(synced_data.values()),
+            "page": page,
+            "page_size": page_size
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Sync to backup failed: {str(e)}")
 
 @router.get("/list-backups")
-async def list_all_backups(
+def list_all_backups(
+    page: int = Query(default=1, ge=1),
+    page_size: int = Query(default=50, ge=1, le=500),
     current_user: User = Depends(require_permission("admin")),
     db: Session = Depends(get_db)
 ):
-    """List all available backups"""
+    """List all available backups (phân trang sẵn cho khi nối Drive API)"""
     try:
         # This would require Google Drive API to list spreadsheets
         # For now, return mock data structure
+        backups = [
+            {
+                "backup_id": "fallback_backup_001",
+                "created_at": "2025-01-15T10:00:00Z",
+                "size": "1.2MB",
+                "records": 1500,
+                "status": "completed",
+                "includes": ["suppliers", "products", "orders", "listings", "accounts"]
+            }
+        ]
+        start = (page - 1) * page_size
         return {
             "success": True,
-            "backups": [
-                {
-                    "backup_id": "fallback_backup_001",
-                    "created_at": "2025-01-15T10:00:00Z",
-                    "size": "1.2MB",
-                    "records": 1500,
-                    "status": "completed",
-                    "includes": ["suppliers", "products", "orders", "listings", "accounts"]
-                }
-            ]
+            "items": backups[start:start + page_size],
+            "total": len(backups),
+            "page": page,
+            "page_size": page_size
         }
-        
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list backups: {str(e)}")
 
@@ -195,19 +222,16 @@ async def list_all_backups(
 # ===========================================
 
 @router.post("/sync-account-data/{account_email}")
-async def sync_account_data(
+def sync_account_data(
     account_email: str,
     include_suppliers: bool = Query(default=True),
     include_products: bool = Query(default=True),
     current_user: User = Depends(require_permission("manager")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    sheets_service: EnhancedGoogleSheetsService = Depends(get_enhanced_sheets_service)
 ):
     """Sync supplier/product data to specific account spreadsheet"""
     try:
-        sheets_service = EnhancedGoogleSheetsService()
-        supplier_service = SupplierService(db)
-        product_service = ProductService(db)
-        
         # Create or get account spreadsheet
         account_spreadsheet_id = sheets_service.create_account_spreadsheet(account_email)
         
@@ -215,19 +239,22 @@ async def sync_account_data(
             raise HTTPException(status_code=500, detail="Failed to create account spreadsheet")
         
         synced_data = {}
-        
+        supplier_items = None
+
         if include_suppliers:
             # Get suppliers for this account (you might want to filter by account)
-            suppliers = supplier_service.get_all_suppliers(size=500)
-            success = sheets_service.sync_suppliers_to_sheet(account_spreadsheet_id, suppliers.items)
-            synced_data["suppliers"] = len(suppliers.items) if success else 0
-        
+            supplier_items = db.query(Supplier).limit(500).all()
+            success = sheets_service.sync_suppliers_to_sheet(account_spreadsheet_id, supplier_items)
+            synced_data["suppliers"] = len(supplier_items) if success else 0
+
         if include_products:
             # Get products for this account
-            products = product_service.get_all_products(size=500)
-            suppliers_map = {s.id: s for s in supplier_service.get_all_suppliers(size=500).items}
-            success = sheets_service.sync_products_to_sheet(account_spreadsheet_id, products.items, suppliers_map)
-            synced_data["products"] = len(products.items) if success else 0
+            products = db.query(Product).limit(500).all()
+            if supplier_items is None:
+                supplier_items = db.query(Supplier).limit(500).all()
+            suppliers_map = {s.id: s for s in supplier_items}
+            success = sheets_service.sync_products_to_sheet(account_spreadsheet_id, products, suppliers_map)
+            synced_data["products"] = len(products) if success else 0
         
         return {
             "success": True,
@@ -241,17 +268,16 @@ async def sync_account_data(
         raise HTTPException(status_code=500, detail=f"Account sync failed: {str(e)}")
 
 @router.post("/share-backup/{backup_id}")
-async def share_backup_spreadsheet(
+def share_backup_spreadsheet(
     backup_id: str,
     email: str = Query(..., description="Email to share backup with"),
     role: str = Query(default="reader", description="Access role: reader, writer, or editor"),
     current_user: User = Depends(require_permission("admin")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    sheets_service: EnhancedGoogleSheetsService = Depends(get_enhanced_sheets_service)
 ):
     """Share backup spreadsheet with specific user"""
     try:
-        sheets_service = EnhancedGoogleSheetsService()
-        
         success = sheets_service.share_spreadsheet(backup_id, email, role)
         
         if not success:
@@ -274,46 +300,125 @@ async def share_backup_spreadsheet(
 
 async def execute_comprehensive_backup(
     backup_spreadsheet_id: str,
-    backup_request: BackupRequest,
-    db: Session
+    backup_request: BackupRequest
 ):
-    """Execute comprehensive backup in background"""
+    """Execute comprehensive backup in background.
+
+    Năm stage ghi vào 5 sheet tab độc lập nên chạy song song qua
+    asyncio.gather - wall-clock ≈ max(stage) thay vì tổng tuần tự.
+    Task không nhận request session: từ FastAPI 0.106 get_db teardown
+    chạy trước background task, nên mọi query đi qua Session task-owned.
+    Mỗi stage mở Session/sheets client riêng trong thread của nó
+    (googleapiclient http không thread-safe); Semaphore(4) giữ dưới
+    quota per-minute của Sheets API.
+    """
+    sheets_service = EnhancedGoogleSheetsService()
     try:
-        sheets_service = EnhancedGoogleSheetsService()
-        supplier_service = SupplierService(db)
-        product_service = ProductService(db)
-        
         includes = backup_request.includes or ["all"]
-        
+        supplier_items = None
+
+        if ("all" in includes or "suppliers" in includes
+                or "products" in includes):
+            # Suppliers fetch một lần off-loop - cả stage suppliers lẫn
+            # suppliers_map của products dùng chung list; không commit
+            # nên attributes vẫn đọc được sau khi session đóng (detached)
+            def _fetch_suppliers():
+                session = SessionLocal()
+                try:
+                    return session.query(Supplier).limit(2000).all()
+                finally:
+                    session.close()
+
+            supplier_items = await asyncio.to_thread(_fetch_suppliers)
+
+        def _backup_suppliers():
+            EnhancedGoogleSheetsService().sync_suppliers_to_backup(
+                backup_spreadsheet_id, supplier_items
+            )
+
+        def _backup_products():
+            suppliers_map = {s.id: s for s in supplier_items}
+            session = SessionLocal()
+            try:
+                EnhancedGoogleSheetsService().sync_products_to_backup(
+                    backup_spreadsheet_id,
+                    session.query(Product)
+                    .execution_options(stream_results=True)
+                    .limit(2000).yield_per(500),
+                    suppliers_map
+                )
+            finally:
+                session.close()
+
+        def _backup_orders():
+            # Server-side cursor (stream_results) + yield_per: DB fetch
+            # chạy gối đầu với Sheets upload, memory giữ tối đa 500 rows
+            session = SessionLocal()
+            try:
+                EnhancedGoogleSheetsService().sync_orders_to_backup(
+                    backup_spreadsheet_id,
+                    session.query(Order)
+                    .order_by(Order.created_at.desc(), Order.id)
+                    .execution_options(stream_results=True)
+                    .limit(5000).yield_per(500)
+                )
+            finally:
+                session.close()
+
+        def _backup_listings():
+            session = SessionLocal()
+            try:
+                EnhancedGoogleSheetsService().sync_listings_to_backup(
+                    backup_spreadsheet_id,
+                    session.query(Listing)
+                    .order_by(Listing.updated_at.desc(), Listing.id)
+                    .execution_options(stream_results=True)
+                    .limit(5000).yield_per(500)
+                )
+            finally:
+                session.close()
+
+        def _backup_accounts():
+            # Bảng accounts nhỏ - client-side fetch một lần là đủ
+            session = SessionLocal()
+            try:
+                EnhancedGoogleSheetsService().sync_accounts_to_backup(
+                    backup_spreadsheet_id, session.query(Account).all()
+                )
+            finally:
+                session.close()
+
+        semaphore = asyncio.Semaphore(4)
+
+        async def _run_stage(stage_fn):
+            async with semaphore:
+                await asyncio.to_thread(stage_fn)
+
+        stage_fns = []
         if "all" in includes or "suppliers" in includes:
-            # Backup all suppliers
-            suppliers = supplier_service.get_all_suppliers(size=2000)
-            sheets_service.sync_suppliers_to_backup(backup_spreadsheet_id, suppliers.items)
-        
+            stage_fns.append(_backup_suppliers)
         if "all" in includes or "products" in includes:
-            # Backup all products
-            products = product_service.get_all_products(size=2000)
-            suppliers_map = {s.id: s for s in supplier_service.get_all_suppliers(size=2000).items}
-            sheets_service.sync_products_to_backup(backup_spreadsheet_id, products.items, suppliers_map)
-        
+            stage_fns.append(_backup_products)
         if "all" in includes or "orders" in includes:
-            # Backup all orders
-            orders = db.query(Order).limit(5000).all()
-            sheets_service.sync_orders_to_backup(backup_spreadsheet_id, orders)
-        
+            stage_fns.append(_backup_orders)
         if "all" in includes or "listings" in includes:
-            # Backup all listings
-            listings = db.query(Listing).limit(5000).all()
-            sheets_service.sync_listings_to_backup(backup_spreadsheet_id, listings)
-        
+            stage_fns.append(_backup_listings)
         if "all" in includes or "accounts" in includes:
-            # Backup all accounts
-            accounts = db.query(Account).all()
-            sheets_service.sync_accounts_to_backup(backup_spreadsheet_id, accounts)
-        
+            stage_fns.append(_backup_accounts)
+
+        results = await asyncio.gather(
+            *(_run_stage(fn) for fn in stage_fns), return_exceptions=True
+        )
+        for stage_fn, result in zip(stage_fns, results):
+            if isinstance(result, Exception):
+                print(f"Backup stage {stage_fn.__name__} failed: {result}")
+                sheets_service.log_backup_error(
+                    backup_spreadsheet_id, f"{stage_fn.__name__}: {result}"
+                )
+
         # Update backup info with completion status
         sheets_service.update_backup_completion_status(backup_spreadsheet_id)
-        
+
     except Exception as e:
         print(f"Background backup failed: {e}")
         # Log error to backup spreadsheet
@@ -8,10 +8,16 @@ from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db
+from app.core.opt_cache import get_or_compute, invalidate, make_key
 from app.services.dashboard_analytics_service import DashboardAnalyticsService
 
 router = APIRouter()
 
+# Dashboard aggregations là read-heavy và giống nhau giữa các lần poll;
+# cache theo query params (không theo user - data là business-wide) để
+# cache hit bỏ qua toàn bộ aggregation SQL. Bust khi đổi KPI targets.
+_DASHBOARD_TTL = 300
+
 
 # ===========================================
 # COMPREHENSIVE DASHBOARD OVERVIEW
@@ -39,11 +45,18 @@ async def get_dashboard_overview(
     """
     try:
         analytics_service = DashboardAnalyticsService(db)
-        dashboard_data = analytics_service.get_dashboard_overview(
-            period_days=period_days,
-            include_forecasts=include_forecasts
+        cache_key = make_key("dashboard_overview", {
+            "period_days": period_days,
+            "include_forecasts": include_forecasts
+        })
+        dashboard_data = get_or_compute(
+            cache_key, _DASHBOARD_TTL,
+            lambda: analytics_service.get_dashboard_overview(
+                period_days=period_days,
+                include_forecasts=include_forecasts
+            )
         )
-        
+
         return {
             "success": True,
             "data": dashboard_data,
@@ -110,11 +123,15 @@ async def get_financial_metrics(
         analytics_service = DashboardAnalyticsService(db)
         
         from datetime import datetime, timedelta
-        date_from = datetime.utcnow() - timedelta(days=period_days)
-        date_to = datetime.utcnow()
-        
-        financial_metrics = analytics_service._calculate_financial_metrics(date_from, date_to)
-        
+
+        def _compute():
+            date_from = datetime.utcnow() - timedelta(days=period_days)
+            date_to = datetime.utcnow()
+            return analytics_service._calculate_financial_metrics(date_from, date_to)
+
+        cache_key = make_key("dashboard_financial", {"period_days": period_days})
+        financial_metrics = get_or_compute(cache_key, _DASHBOARD_TTL, _compute)
+
         return {
             "success": True,
             "data": financial_metrics,
@@ -145,11 +162,15 @@ async def get_operational_metrics(
         analytics_service = DashboardAnalyticsService(db)
         
         from datetime import datetime, timedelta
-        date_from = datetime.utcnow() - timedelta(days=period_days)
-        date_to = datetime.utcnow()
-        
-        operational_metrics = analytics_service._calculate_operational_metrics(date_from, date_to)
-        
+
+        def _compute():
+            date_from = datetime.utcnow() - timedelta(days=period_days)
+            date_to = datetime.utcnow()
+            return analytics_service._calculate_operational_metrics(date_from, date_to)
+
+        cache_key = make_key("dashboard_operational", {"period_days": period_days})
+        operational_metrics = get_or_compute(cache_key, _DASHBOARD_TTL, _compute)
+
         return {
             "success": True,
             "data": operational_metrics,
@@ -181,10 +202,14 @@ async def get_kpi_scorecard(
     """
     try:
         analytics_service = DashboardAnalyticsService(db)
-        dashboard_data = analytics_service.get_dashboard_overview(period_days=period_days)
-        
-        kpi_scorecard = analytics_service._generate_kpi_scorecard(dashboard_data)
-        
+
+        def _compute():
+            dashboard_data = analytics_service.get_dashboard_overview(period_days=period_days)
+            return analytics_service._generate_kpi_scorecard(dashboard_data)
+
+        cache_key = make_key("dashboard_kpi_scorecard", {"period_days": period_days})
+        kpi_scorecard = get_or_compute(cache_key, _DASHBOARD_TTL, _compute)
+
         return {
             "success": True,
             "data": kpi_scorecard,
@@ -228,7 +253,10 @@ async def update_kpi_targets(
             if target_value <= 0:
                 raise HTTPException(status_code=400, detail=f"Target value for {kpi_name} must be positive")
             analytics_service.kpi_targets[kpi_name] = target_value
-        
+
+        # Targets đổi làm scorecard/overview cached sai - bust ngay
+        invalidate("opt:dashboard_")
+
         return {
             "success": True,
             "data": {
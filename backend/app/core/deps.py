@@ -1,10 +1,13 @@
 from typing import Generator
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from app.core.optimizer import EbayOptimizer
 from app.core.security import verify_token
 from app.db.database import get_db
 from app.models.database_models import User
+from app.repositories.draft_listing import DraftListingRepository
+from app.services.google_sheets import GoogleSheetsService
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
@@ -31,4 +34,17 @@ def get_current_user(
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+def get_draft_repo(db: Session = Depends(get_db)) -> DraftListingRepository:
+    """Request-scoped DraftListingRepository - FastAPI caches the instance
+    per request, so handlers share one repo instead of constructing their own"""
+    return DraftListingRepository(db)
+
+def get_optimizer(request: Request) -> EbayOptimizer:
+    """Process-wide optimizer singleton - khởi tạo và warm trong lifespan"""
+    return request.app.state.optimizer
+
+def get_sheets_service(request: Request) -> GoogleSheetsService:
+    """Process-wide GoogleSheetsService - credentials load một lần ở startup"""
+    return request.app.state.sheets
\ No newline at end of file
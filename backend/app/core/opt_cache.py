@@ -0,0 +1,66 @@
+"""
+Optimization result cache - in-process TTL cache cho optimize endpoints
+
+Các endpoint /title, /description, /keywords là deterministic theo input,
+nên kết quả được cache theo SHA-256 của request đã normalize. LRU eviction
+giữ memory bounded; entry hết TTL bị drop khi đọc.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+_MAX_ENTRIES = 2048
+
+_lock = threading.Lock()
+_store: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+
+def make_key(endpoint: str, key_parts: Dict[str, Any]) -> str:
+    """Build cache key từ endpoint name + normalized request payload"""
+    digest = hashlib.sha256(
+        json.dumps(key_parts, sort_keys=True, default=str).encode()
+    ).hexdigest()[:32]
+    return f"opt:{endpoint}:{digest}"
+
+
+def invalidate(prefix: str) -> int:
+    """Drop mọi cached entry có key bắt đầu bằng prefix
+
+    Cho các read endpoint cache theo user - writer gọi với prefix
+    "opt:<endpoint>:<user_id>:" để bust cache ngay sau mutation thay
+    vì chờ TTL.
+    """
+    with _lock:
+        stale = [key for key in _store if key.startswith(prefix)]
+        for key in stale:
+            del _store[key]
+    return len(stale)
+
+
+def get_or_compute(key: str, ttl: float, fn: Callable[[], Any]) -> Any:
+    """Return cached value cho key, hoặc compute qua fn() và cache với TTL"""
+    now = time.monotonic()
+
+    with _lock:
+        entry = _store.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                _store.move_to_end(key)
+                return value
+            del _store[key]
+
+    # Compute ngoài lock - fn có thể chậm; exception thì không cache
+    value = fn()
+
+    with _lock:
+        _store[key] = (now + ttl, value)
+        _store.move_to_end(key)
+        while len(_store) > _MAX_ENTRIES:
+            _store.popitem(last=False)
+
+    return value
@@ -1,3 +1,5 @@
+import functools
+import hashlib
 import re
 from typing import List, Dict, Tuple, Optional
 from app.core.config import settings
@@ -12,23 +14,73 @@ from app.core.strategies.export_strategies import (
 )
 
 
+# Precompiled patterns + frozen word sets - hoisted khỏi hot path để
+# mỗi call chỉ còn một pattern.sub/search thay vì compile/build lại
+_SPECIAL_CHAR_RE = re.compile(r'[^\w\s-]')
+_WHITESPACE_RE = re.compile(r'\s+')
+_MULTI_BANG_RE = re.compile(r'[!]{2,}')
+_MULTI_DOT_RE = re.compile(r'[.]{2,}')
+_LONG_NUMBER_RE = re.compile(r'\d{5,}')
+
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during'
+})
+
+POWER_WORDS = frozenset({
+    'new', 'authentic', 'genuine', 'original', 'oem', 'premium', 'pro',
+    'limited', 'edition', 'rare', 'vintage', 'sealed', 'mint', 'perfect'
+})
+
+# Category keywords dưới dạng frozenset build một lần - mỗi title chỉ
+# cần một lần tokenize rồi một intersection per category, thay vì scan
+# lại danh sách keyword cho từng call
+_EMPTY_SET = frozenset()
+_CATEGORY_KEYWORD_SETS = {
+    category: frozenset(kw.lower() for kw in kws)
+    for category, kws in settings.EBAY_CATEGORIES.items()
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _strategy_for(strategy_type: OptimizationType):
+    """Shared stateless strategy instance per type - không tạo lại per call"""
+    context = OptimizationContext()
+    context.set_strategy(strategy_type)
+    return context.get_strategy()
+
+
+@functools.lru_cache(maxsize=8192)
+def _generate_keywords_cached(
+    strategy_type: OptimizationType, title: str, desc_hash: str, category: str
+) -> tuple:
+    """Memoized keyword generation - repeated listings skip tokenization
+
+    Key dùng blake2b hash của description để giữ key nhỏ; các strategy
+    hiện tại derive keywords từ title + category nên không cần text gốc.
+    """
+    return tuple(_strategy_for(strategy_type).generate_keywords(title, category))
+
+
+def keywords_cache_info():
+    """Cache hit/miss stats cho debug endpoint"""
+    return _generate_keywords_cached.cache_info()
+
+
 class EbayOptimizer:
     def __init__(self, optimization_strategy: OptimizationType = OptimizationType.BASIC):
         # Legacy attributes for backward compatibility
-        self.stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during'
-        }
-        
-        self.power_words = {
-            'new', 'authentic', 'genuine', 'original', 'oem', 'premium', 'pro',
-            'limited', 'edition', 'rare', 'vintage', 'sealed', 'mint', 'perfect'
-        }
-        
-        # Strategy pattern implementation
+        self.stop_words = _STOP_WORDS
+        self.power_words = POWER_WORDS
+
+        # Strategy pattern implementation. optimization_context chỉ còn
+        # phục vụ các legacy API (optimize_listing, get_available_*);
+        # các hot path resolve strategy local qua _strategy_for để không
+        # mutate shared state khi chạy trên nhiều worker thread.
+        self._default_strategy_type = optimization_strategy
         self.optimization_context = OptimizationContext()
         self.optimization_context.set_strategy(optimization_strategy)
-        
+
         self.export_context = ExportContext()
         
     def optimize_title(
@@ -43,17 +95,15 @@ class EbayOptimizer:
         Optimize eBay listing title using strategy pattern
         Returns: (optimized_title, score)
         """
-        # Use strategy pattern for optimization
-        if strategy_type:
-            self.optimization_context.set_strategy(strategy_type)
-        
+        # Resolve strategy local - không set lên shared context để các
+        # call song song với strategy khác nhau không giẫm lên nhau
+        strategy = _strategy_for(strategy_type or self._default_strategy_type)
+
         if not keywords:
             keywords = []
-        
-        result = self.optimization_context.get_strategy().optimize_title(
-            title, category, keywords
-        )
-        
+
+        result = strategy.optimize_title(title, category, keywords)
+
         return result["optimized_title"], result["title_score"]
     
     def optimize_description(
@@ -68,17 +118,13 @@ class EbayOptimizer:
         """
         Generate optimized description using strategy pattern
         """
-        # Use strategy pattern for optimization
-        if strategy_type:
-            self.optimization_context.set_strategy(strategy_type)
-        
+        strategy = _strategy_for(strategy_type or self._default_strategy_type)
+
         if not keywords:
             keywords = []
-        
-        result = self.optimization_context.get_strategy().optimize_description(
-            description, title, keywords
-        )
-        
+
+        result = strategy.optimize_description(description, title, keywords)
+
         return result["optimized_description"]
     
     def generate_keywords(
@@ -91,18 +137,61 @@ class EbayOptimizer:
         """
         Generate relevant keywords using strategy pattern
         """
-        # Use strategy pattern for keyword generation
-        if strategy_type:
-            self.optimization_context.set_strategy(strategy_type)
-        
-        return self.optimization_context.get_strategy().generate_keywords(
-            title, category, description
-        )
+        strategy = _strategy_for(strategy_type or self._default_strategy_type)
+
+        # Memoized theo (strategy, title, hash(description), category)
+        desc_hash = hashlib.blake2b(
+            (description or "").encode(), digest_size=8
+        ).hexdigest()
+        return list(_generate_keywords_cached(
+            strategy.strategy_type, title, desc_hash, category
+        ))
     
+    def optimize_all(
+        self,
+        title: str,
+        description: str,
+        category: str,
+        keywords: List[str] = None,
+        item_specifics: Dict[str, str] = None,
+        strategy_type: OptimizationType = None
+    ) -> Dict[str, any]:
+        """Fused pass: title, keywords và description trong một call
+
+        Resolve strategy một lần và share keyword memoization giữa các
+        bước, thay vì ba method call độc lập re-dispatch strategy và
+        re-tokenize cùng title/description. Các single-method API giữ
+        nguyên cho caller cũ.
+        """
+        strategy = _strategy_for(strategy_type or self._default_strategy_type)
+
+        title_result = strategy.optimize_title(title, category, keywords or [])
+
+        desc_hash = hashlib.blake2b(
+            (description or "").encode(), digest_size=8
+        ).hexdigest()
+        suggested_keywords = list(_generate_keywords_cached(
+            strategy.strategy_type, title, desc_hash, category
+        ))
+
+        optimized_description = None
+        if description:
+            desc_result = strategy.optimize_description(
+                description, title_result["optimized_title"], suggested_keywords
+            )
+            optimized_description = desc_result["optimized_description"]
+
+        return {
+            "optimized_title": title_result["optimized_title"],
+            "title_score": title_result["title_score"],
+            "suggested_keywords": suggested_keywords,
+            "optimized_description": optimized_description,
+        }
+
     def _tokenize(self, text: str) -> List[str]:
         """Tokenize text into words"""
         # Remove special characters but keep alphanumeric
-        text = re.sub(r'[^\w\s-]', ' ', text)
+        text = _SPECIAL_CHAR_RE.sub(' ', text)
         words = text.split()
         return [w for w in words if w]
     
@@ -140,25 +229,41 @@ class EbayOptimizer:
         elif 20 <= title_length < 40:
             score += 10
         
-        # Keyword presence (30 points)
+        # Keyword presence (30 points) - một lần lower + tokenize, các
+        # check sau đó là set intersection thay vì substring scan per word
         title_lower = title.lower()
-        
+        tokens = frozenset(self._tokenize(title_lower))
+
         # Check for power words (15 points)
-        power_word_count = sum(1 for word in self.power_words if word in title_lower)
+        power_word_count = len(self.power_words & tokens)
         score += min(power_word_count * 5, 15)
-        
+
         # Check for category keywords (15 points)
-        category_keywords = settings.EBAY_CATEGORIES.get(category.lower(), [])
-        category_match = sum(1 for kw in category_keywords if kw in title_lower)
+        category_keywords = _CATEGORY_KEYWORD_SETS.get(category.lower(), _EMPTY_SET)
+        category_match = len(category_keywords & tokens)
         score += min(category_match * 5, 15)
-        
-        # User keywords (20 points)
+
+        # User keywords (20 points) - keyword đơn dùng O(1) token lookup,
+        # phrase nhiều từ (vd "fast shipping") phải substring check vì
+        # không bao giờ nằm trong token set
         if keywords:
-            keyword_match = sum(1 for kw in keywords if kw.lower() in title_lower)
+            keyword_match = 0
+            for kw in keywords:
+                kw_lower = kw.lower()
+                if " " in kw_lower:
+                    if kw_lower in title_lower:
+                        keyword_match += 1
+                elif kw_lower in tokens:
+                    keyword_match += 1
             score += min(keyword_match * 4, 20)
-        
+
         # Readability (15 points)
-        if not any(char * 3 in title for char in title):  # No repeated characters
+        # Single pass thay vì any(char * 3 in title ...) vốn là O(n^2)
+        has_triple_run = any(
+            title[i] == title[i - 1] == title[i - 2]
+            for i in range(2, len(title))
+        )
+        if not has_triple_run:  # No repeated characters
             score += 5
         if title[0].isupper():  # Starts with capital
             score += 5
@@ -168,7 +273,7 @@ class EbayOptimizer:
         # Structure (15 points)
         if '-' in title or '|' in title:  # Has separators
             score += 5
-        if not re.search(r'\d{5,}', title):  # No long number strings
+        if not _LONG_NUMBER_RE.search(title):  # No long number strings
             score += 5
         if len(self._tokenize(title)) >= 3:  # At least 3 words
             score += 5
@@ -178,11 +283,11 @@ class EbayOptimizer:
     def _clean_description(self, description: str) -> str:
         """Clean and format description text"""
         # Remove excessive whitespace
-        description = re.sub(r'\s+', ' ', description)
-        
+        description = _WHITESPACE_RE.sub(' ', description)
+
         # Remove excessive punctuation
-        description = re.sub(r'[!]{2,}', '!', description)
-        description = re.sub(r'[.]{2,}', '.', description)
+        description = _MULTI_BANG_RE.sub('!', description)
+        description = _MULTI_DOT_RE.sub('.', description)
         
         # Break into paragraphs if too long
         if len(description) > 500:
@@ -246,6 +351,7 @@ class EbayOptimizer:
         """
         Change optimization strategy
         """
+        self._default_strategy_type = strategy_type
         self.optimization_context.set_strategy(strategy_type)
     
     def set_export_format(self, export_format: ExportFormat):
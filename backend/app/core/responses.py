@@ -0,0 +1,96 @@
+"""
+High-performance JSON responses với orjson
+Bypass FastAPI jsonable_encoder cho các list endpoints nặng về serialization
+"""
+
+import hashlib
+from decimal import Decimal
+from typing import Any, Iterable, Iterator
+
+import orjson
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+
+def _default(obj: Any) -> Any:
+    """Fallback serializer cho types orjson không hỗ trợ natively"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if hasattr(obj, "__table__"):
+        # SQLAlchemy model instance -> plain column dict
+        return {c.name: getattr(obj, c.name) for c in obj.__table__.columns}
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse serialized bằng orjson (Rust-level JSON writer)
+
+    Trả instance này trực tiếp từ endpoint để skip jsonable_encoder +
+    json.dumps của FastAPI - datetime được serialize natively.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+        )
+
+
+def compute_etag(payload: Any) -> str:
+    """Content-hash ETag cho read-only endpoints
+
+    blake2b của payload đã serialize - client gửi lại qua If-None-Match
+    thì endpoint trả 304 empty body thay vì full payload mỗi poll.
+    """
+    return hashlib.blake2b(
+        orjson.dumps(
+            payload,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+        ),
+        digest_size=12,
+    ).hexdigest()
+
+
+def conditional_response(request: Request, payload: Any,
+                         max_age: int = 30) -> Response:
+    """Trả payload với ETag, hoặc 304 khi If-None-Match khớp
+
+    Cho các GET endpoint bị dashboard poll vài giây một lần - bytes chỉ
+    đi qua wire khi nội dung thực sự đổi, browser/CDN giữ bản cũ theo
+    Cache-Control trong khoảng max_age.
+    """
+    etag = compute_etag(payload)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return ORJSONResponse(payload, headers={
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={max_age}",
+    })
+
+
+def stream_json_array(rows: Iterable[Any],
+                      message_template: str = "Found {count} items") -> Iterator[bytes]:
+    """Yield một APIResponse-shaped JSON payload từng fragment một
+
+    Dùng với StreamingResponse để DB cursor, serialization và socket
+    write overlap thay vì materialize cả payload trong memory.
+    `message_template` được format với `count` sau khi rows cạn.
+    """
+    yield b'{"success":true,"data":['
+    count = 0
+    for row in rows:
+        if count:
+            yield b','
+        yield orjson.dumps(
+            row,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+        )
+        count += 1
+    yield b'],"message":'
+    yield orjson.dumps(message_template.format(count=count))
+    yield b'}'
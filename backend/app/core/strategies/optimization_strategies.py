@@ -4,11 +4,57 @@ Open/Closed Principle: Open for extension, closed for modification
 """
 
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 from enum import Enum
 import re
 
 
+# Precompiled patterns + frozen sets dùng chung cho mọi strategy instance -
+# hoisted để hot path chỉ còn một findall/sub mỗi field
+_WORD_RE = re.compile(r'\b\w+\b')
+_WHITESPACE_RE = re.compile(r'\s+')
+_TITLE_SPECIAL_RE = re.compile(r'[^\w\s\-]')
+
+_STOP_WORDS = frozenset({
+    "a", "an", "the", "and", "or", "but", "in", "on", "at", "to", "for",
+    "of", "with", "by", "is", "are", "was", "were", "be", "been", "being"
+})
+
+_POWER_WORDS = frozenset({
+    "new", "premium", "authentic", "genuine", "original", "professional",
+    "quality", "durable", "lightweight", "compact", "portable", "wireless",
+    "fast", "quick", "instant", "easy", "simple", "secure", "safe",
+    "bestseller", "popular", "trending", "limited", "exclusive", "rare"
+})
+
+_CATEGORY_KEYWORDS = {
+    "electronics": ["electronic", "digital", "tech", "gadget"],
+    "clothing": ["apparel", "fashion", "wear", "style"],
+    "home": ["household", "indoor", "domestic", "living"],
+    "automotive": ["car", "vehicle", "auto", "motor"],
+    "collectibles": ["collectible", "vintage", "rare", "antique"],
+    "books": ["book", "literature", "reading", "educational"],
+    "toys": ["toy", "kids", "children", "play"],
+    "sports": ["sport", "fitness", "athletic", "outdoor"],
+    "jewelry": ["jewelry", "accessory", "fashion", "elegant"],
+    "health": ["health", "wellness", "care", "medical"]
+}
+
+
+@lru_cache(maxsize=4096)
+def _basic_keywords(title: str, category: str) -> tuple:
+    """Pure keyword derivation cho basic strategy - cached theo input
+
+    Cùng (title, category) cho cùng output nên identical listings
+    (bulk flows hay gặp) bỏ qua tokenize/set math hoàn toàn.
+    """
+    keywords = {w for w in _WORD_RE.findall(title.lower()) if len(w) > 2}
+    keywords.update(_CATEGORY_KEYWORDS.get(category.lower(), ["quality", "premium"]))
+    keywords -= _STOP_WORDS
+    return tuple(sorted(keywords))[:20]
+
+
 class OptimizationType(str, Enum):
     """Types of optimization strategies"""
     BASIC = "basic"
@@ -65,17 +111,9 @@ class BasicOptimizationStrategy(IOptimizationStrategy):
     
     def __init__(self):
         self.max_title_length = 80
-        self.power_words = [
-            "new", "premium", "authentic", "genuine", "original", "professional",
-            "quality", "durable", "lightweight", "compact", "portable", "wireless",
-            "fast", "quick", "instant", "easy", "simple", "secure", "safe",
-            "bestseller", "popular", "trending", "limited", "exclusive", "rare"
-        ]
-        
-        self.stop_words = {
-            "a", "an", "the", "and", "or", "but", "in", "on", "at", "to", "for",
-            "of", "with", "by", "is", "are", "was", "were", "be", "been", "being"
-        }
+        self.power_words = _POWER_WORDS
+
+        self.stop_words = _STOP_WORDS
     
     def optimize_title(self, title: str, category: str, keywords: List[str]) -> Dict[str, Any]:
         """Basic title optimization"""
@@ -120,20 +158,9 @@ class BasicOptimizationStrategy(IOptimizationStrategy):
     
     def generate_keywords(self, title: str, category: str, description: str = None) -> List[str]:
         """Generate basic keywords from title and category"""
-        keywords = set()
-        
-        # Extract from title
-        title_words = self._extract_words(title)
-        keywords.update(title_words)
-        
-        # Add category-specific keywords
-        category_keywords = self._get_category_keywords(category)
-        keywords.update(category_keywords)
-        
-        # Remove stop words
-        keywords = keywords - self.stop_words
-        
-        return list(keywords)[:20]  # Limit to 20 keywords
+        # Basic derivation không dùng description - cached helper theo
+        # (title, category) nên identical inputs không tokenize lại
+        return list(_basic_keywords(title, category))
     
     def calculate_score(self, title: str, description: str, keywords: List[str]) -> float:
         """Calculate basic optimization score"""
@@ -165,8 +192,8 @@ class BasicOptimizationStrategy(IOptimizationStrategy):
     def _clean_title(self, title: str) -> str:
         """Clean and normalize title"""
         # Remove extra spaces and special characters
-        cleaned = re.sub(r'\s+', ' ', title)
-        cleaned = re.sub(r'[^\w\s\-]', '', cleaned)
+        cleaned = _WHITESPACE_RE.sub(' ', title)
+        cleaned = _TITLE_SPECIAL_RE.sub('', cleaned)
         return cleaned.strip()
     
     def _add_power_words(self, title: str, keywords: List[str]) -> str:
@@ -218,13 +245,14 @@ class BasicOptimizationStrategy(IOptimizationStrategy):
         elif 30 <= len(title) <= 80:
             score += 10
         
-        # Keyword inclusion
+        # Keyword inclusion - một lần lower + tokenize cho cả hai check
         title_lower = title.lower()
+        tokens = frozenset(_WORD_RE.findall(title_lower))
         keyword_matches = sum(1 for kw in keywords if kw.lower() in title_lower)
         score += min(20, keyword_matches * 5)
-        
-        # Power words
-        power_word_count = sum(1 for pw in self.power_words if pw in title_lower)
+
+        # Power words - set intersection thay vì substring scan per word
+        power_word_count = len(self.power_words & tokens)
         score += min(10, power_word_count * 3)
         
         # No excessive capitalization
@@ -325,7 +353,7 @@ class BasicOptimizationStrategy(IOptimizationStrategy):
     
     def _extract_words(self, text: str) -> List[str]:
         """Extract meaningful words from text"""
-        words = re.findall(r'\b\w+\b', text.lower())
+        words = _WORD_RE.findall(text.lower())
         return [word for word in words if len(word) > 2]
     
     def _extract_brand(self, title: str) -> Optional[str]:
@@ -345,20 +373,7 @@ class BasicOptimizationStrategy(IOptimizationStrategy):
     
     def _get_category_keywords(self, category: str) -> List[str]:
         """Get category-specific keywords"""
-        category_map = {
-            "electronics": ["electronic", "digital", "tech", "gadget"],
-            "clothing": ["apparel", "fashion", "wear", "style"],
-            "home": ["household", "indoor", "domestic", "living"],
-            "automotive": ["car", "vehicle", "auto", "motor"],
-            "collectibles": ["collectible", "vintage", "rare", "antique"],
-            "books": ["book", "literature", "reading", "educational"],
-            "toys": ["toy", "kids", "children", "play"],
-            "sports": ["sport", "fitness", "athletic", "outdoor"],
-            "jewelry": ["jewelry", "accessory", "fashion", "elegant"],
-            "health": ["health", "wellness", "care", "medical"]
-        }
-        
-        return category_map.get(category.lower(), ["quality", "premium"])
+        return _CATEGORY_KEYWORDS.get(category.lower(), ["quality", "premium"])
 
 
 class AdvancedOptimizationStrategy(IOptimizationStrategy):
@@ -1,15 +1,58 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import orjson
 import os
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./ebay_optimizer.db")
 
+
+def _json_serializer(obj) -> str:
+    """orjson encode cho JSON columns - driver cần str, orjson trả bytes"""
+    return orjson.dumps(obj).decode()
+
+
+# Sync jobs giữ session qua cả Sheets round-trip (nhiều giây) nên pool
+# mặc định 5 connection saturate sớm; pre_ping + recycle loại stale
+# connection sau idle dài. :memory: sqlite dùng SingletonThreadPool
+# không nhận các pool arg này.
+_pool_kwargs = {} if ":memory:" in SQLALCHEMY_DATABASE_URL else {
+    "pool_size": 20,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_pre_ping": True,
+    "pool_recycle": 3600,
+}
+
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in SQLALCHEMY_DATABASE_URL else {}
+    connect_args={"check_same_thread": False} if "sqlite" in SQLALCHEMY_DATABASE_URL else {},
+    # JSON columns (ActivityLog.new_values, SyncJob.result_json, ...)
+    # encode/decode qua orjson thay vì stdlib json
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    **_pool_kwargs
 )
 
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Tune SQLite cho mixed read/write load (sync jobs + dashboard reads)
+
+        WAL cho phép reader không block writer (GET /sync/history vẫn chạy
+        khi một sync import đang mid-transaction); synchronous=NORMAL giảm
+        fsync mỗi commit (an toàn với WAL); busy_timeout tránh SQLITE_BUSY
+        khi nhiều session cùng ghi.
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -1,8 +1,15 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from datetime import datetime
 
+from app.core.optimizer import EbayOptimizer
+from app.core.responses import ORJSONResponse
+from app.services.google_sheets import GoogleSheetsService, HttpError as GSheetsHttpError
+from app.services.sync_service import sync_service
+
 from app.core.config import settings
 from app.api.endpoints import listings, optimize, auth, orders, sources, accounts, dashboard, export, sync, drafts, messages, account_sheets, products, roles, sheets_sync
 from app.api.endpoints import settings as settings_router
@@ -15,10 +22,24 @@ from app.models import database_models
 # Create database tables
 database_models.Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Singletons khởi tạo một lần per process ở startup thay vì lúc
+    # import router - credentials load / warmup không block import
+    app.state.optimizer = EbayOptimizer()
+    app.state.sheets = GoogleSheetsService()
+    # sync_service dùng chung client - một credentials load + một HTTP
+    # session pool + một listing index per process thay vì hai
+    sync_service.sheets_service = app.state.sheets
+    # Warm các lazy path (strategy instances, regex, caches)
+    app.state.optimizer.optimize_title("warmup", "general", [], {})
+    yield
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -200,12 +221,40 @@ async def health_check():
         "version": settings.VERSION
     }
 
+@app.exception_handler(GSheetsHttpError)
+async def sheets_http_error_handler(request, exc):
+    # Sheets quota/transient errors (429/5xx) map sang 503 + Retry-After
+    # để client back off thay vì nhận 500 generic và retry ngay lập tức
+    status = getattr(getattr(exc, "resp", None), "status", None) or 500
+    if status == 429 or status >= 500:
+        retry_after = str(exc.resp.get("retry-after") or "30")
+        return ORJSONResponse(
+            status_code=503,
+            content={
+                "success": False,
+                "message": "Google Sheets temporarily unavailable",
+                "detail": str(exc)
+            },
+            headers={"Retry-After": retry_after}
+        )
+    return ORJSONResponse(
+        status_code=status,
+        content={
+            "success": False,
+            "message": "Google Sheets request failed",
+            "detail": str(exc)
+        }
+    )
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
-    return JSONResponse(
+    # Single global handler - endpoints bỏ try/except Exception wrappers
+    # và để FastAPI route lỗi tới đây qua fast error path
+    return ORJSONResponse(
         status_code=500,
         content={
-            "detail": "An unexpected error occurred",
-            "error": str(exc)
+            "success": False,
+            "message": str(exc),
+            "detail": "An unexpected error occurred"
         }
     )
\ No newline at end of file
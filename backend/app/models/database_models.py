@@ -4,7 +4,7 @@ Chứa tất cả database tables: Users, Listings, Orders, Sources, Accounts
 """
 
 from sqlalchemy import (
-    Boolean, Column, Integer, String, Text, Float, DateTime, 
+    Boolean, Column, Integer, SmallInteger, String, Text, Float, DateTime,
     JSON, ForeignKey, Enum as SQLEnum, Index, DECIMAL, Date
 )
 from sqlalchemy.sql import func
@@ -193,6 +193,8 @@ class Listing(Base):
         Index('idx_listing_category', 'category'),
         Index('idx_listing_performance', 'performance_score'),
         Index('idx_listing_source_product', 'source_product_id'),
+        Index('idx_listing_created_id', 'created_at', 'id'),
+        Index('idx_listing_updated_id', 'updated_at', 'id'),
     )
 
 
@@ -294,6 +296,7 @@ class Order(Base):
         Index('idx_orders_assigned_to', 'assigned_to_user_id'),
         Index('idx_orders_blacklist', 'blacklist_status'),
         Index('idx_orders_status_change', 'last_status_change'),
+        Index('idx_order_created_id', 'created_at', 'id'),
     )
 
 
@@ -525,6 +528,8 @@ class ActivityLog(Base):
     
     # Activity info
     action = Column(String(100), nullable=False)  # create, update, delete, sync
+    # 0 = non-sync, 1 = sync - filter theo int indexed thay vì IN-list string
+    action_category = Column(SmallInteger, default=0, nullable=False)
     entity_type = Column(String(50), nullable=False)  # listing, order, account
     entity_id = Column(String(100), nullable=True)
     description = Column(Text, nullable=True)
@@ -550,6 +555,40 @@ class ActivityLog(Base):
         Index('idx_activity_user_date', 'user_id', 'created_at'),
         Index('idx_activity_entity', 'entity_type', 'entity_id'),
         Index('idx_activity_action', 'action'),
+        Index('idx_activity_user_cat_ts', 'user_id', 'action_category', 'created_at'),
+    )
+
+
+class SyncJobStatusEnum(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class SyncJob(Base):
+    """Background sync job - queued bởi /sync endpoints, poll qua /sync/jobs/{id}"""
+    __tablename__ = "sync_jobs"
+
+    id = Column(String(50), primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # Job info
+    kind = Column(String(50), nullable=False)  # listings_to_sheets, full_sync, ...
+    status = Column(SQLEnum(SyncJobStatusEnum), default=SyncJobStatusEnum.QUEUED, nullable=False)
+    result_json = Column(JSON, nullable=True)
+    error_message = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    user = relationship("User")
+
+    # Indexes
+    __table_args__ = (
+        Index('idx_sync_jobs_user_date', 'user_id', 'created_at'),
     )
 
 
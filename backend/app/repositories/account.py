@@ -27,11 +27,17 @@ class AccountRepository(CRUDBase[Account, AccountCreate, AccountUpdate]):
             and_(Account.email == email, Account.user_id == user_id)
         ).first()
 
+    def exists_for_user(self, db: Session, *, account_id: int, user_id: int) -> bool:
+        """Check account tồn tại và thuộc về user - single scalar round-trip, no ORM hydration"""
+        return db.query(Account.id).filter(
+            and_(Account.id == account_id, Account.user_id == user_id)
+        ).first() is not None
+
     def get_by_status(
-        self, 
-        db: Session, 
-        *, 
-        status: AccountStatusEnum, 
+        self,
+        db: Session,
+        *,
+        status: AccountStatusEnum,
         user_id: int,
         skip: int = 0, 
         limit: int = 100
@@ -55,17 +55,25 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         search_fields: Optional[List[str]] = None,
         sort_by: Optional[str] = None,
         sort_order: str = "asc",
-        user_id: Optional[int] = None
+        user_id: Optional[int] = None,
+        columns_only: bool = False
     ) -> Dict[str, Any]:
         """
         Get multiple records với pagination, filtering, search, sorting
-        
+
         Returns:
             Dict với keys: items, total, page, size, pages, has_next, has_prev
+
+        columns_only=True trả items là plain dicts (RowMapping) thay vì
+        ORM instances - skip identity map + descriptor overhead cho các
+        list endpoints chỉ serialize JSON.
         """
         try:
-            query = db.query(self.model)
-            
+            if columns_only:
+                query = db.query(*self.model.__table__.columns)
+            else:
+                query = db.query(self.model)
+
             # Apply user filter if provided
             if user_id is not None and hasattr(self.model, 'user_id'):
                 query = query.filter(self.model.user_id == user_id)
@@ -106,7 +114,9 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             
             # Apply pagination
             items = query.offset(skip).limit(limit).all()
-            
+            if columns_only:
+                items = [dict(row._mapping) for row in items]
+
             # Calculate pagination metadata
             page = (skip // limit) + 1 if limit > 0 else 1
             size = limit
@@ -290,19 +300,37 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             db.rollback()
             raise e
 
-    def count(self, db: Session, *, filters: Optional[Dict[str, Any]] = None, user_id: Optional[int] = None) -> int:
-        """Count records with optional filters"""
+    def count(
+        self,
+        db: Session,
+        *,
+        filters: Optional[Dict[str, Any]] = None,
+        search: Optional[str] = None,
+        search_fields: Optional[List[str]] = None,
+        user_id: Optional[int] = None
+    ) -> int:
+        """Count records with optional filters and search (same semantics as get_multi)"""
         try:
             query = db.query(func.count(self.model.id))
-            
+
             if user_id is not None and hasattr(self.model, 'user_id'):
                 query = query.filter(self.model.user_id == user_id)
-            
+
             if filters:
                 for field, value in filters.items():
                     if value is not None and hasattr(self.model, field):
                         query = query.filter(getattr(self.model, field) == value)
-            
+
+            if search and search_fields:
+                search_conditions = []
+                for field in search_fields:
+                    if hasattr(self.model, field):
+                        search_conditions.append(
+                            getattr(self.model, field).ilike(f"%{search}%")
+                        )
+                if search_conditions:
+                    query = query.filter(or_(*search_conditions))
+
             return query.scalar()
             
         except SQLAlchemyError as e:
@@ -4,22 +4,102 @@ Handles database operations for draft_listings table
 """
 
 from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc
+from sqlalchemy.orm import Session, selectinload, raiseload
+from sqlalchemy import and_, or_, desc, asc, func, insert, literal_column, select, update
 from app.repositories.base import BaseRepository
-from app.models.database_models import DraftListing, Account, SourceProduct
+from app.models.database_models import (
+    DraftListing, Account, SourceProduct, DraftStatusEnum, ImageStatusEnum
+)
+
+# Columns serialized by the draft list endpoint - selected directly so the
+# query skips ORM instance construction entirely
+_LIST_COLUMNS = (
+    DraftListing.id,
+    DraftListing.account_id,
+    DraftListing.source_product_id,
+    DraftListing.title,
+    DraftListing.description,
+    DraftListing.category,
+    DraftListing.price,
+    DraftListing.quantity,
+    DraftListing.condition,
+    DraftListing.gdrive_folder_url,
+    DraftListing.image_status,
+    DraftListing.edited_by,
+    DraftListing.edit_date,
+    DraftListing.status,
+    DraftListing.scheduled_date,
+    DraftListing.cost_price,
+    DraftListing.profit_margin,
+    DraftListing.notes,
+    DraftListing.created_at,
+    DraftListing.updated_at,
+)
 
 
 class DraftListingRepository(BaseRepository[DraftListing]):
     """Repository for DraftListing operations"""
-    
+
     def __init__(self, db: Session):
         super().__init__(DraftListing, db)
-    
+
+    def _search_filter(self, search: str):
+        """Dialect-aware full-text filter for title/description
+
+        PostgreSQL hits the GIN-indexed search_tsv column (see migration
+        004); SQLite falls back to the unindexed LIKE scan.
+        """
+        if self.db.get_bind().dialect.name == 'postgresql':
+            tsquery = func.websearch_to_tsquery('english', search)
+            return literal_column('draft_listings.search_tsv').op('@@')(tsquery)
+        return or_(
+            DraftListing.title.contains(search),
+            DraftListing.description.contains(search)
+        )
+
+    def _list_stmt(self,
+                   account_id: Optional[int] = None,
+                   status: Optional[str] = None,
+                   image_status: Optional[str] = None,
+                   search: Optional[str] = None,
+                   skip: int = 0,
+                   limit: int = 100):
+        """Build the Core SELECT backing list_dicts"""
+        stmt = select(*_LIST_COLUMNS)
+
+        if search:
+            stmt = stmt.where(self._search_filter(search))
+            stmt = stmt.order_by(desc(DraftListing.updated_at))
+        elif image_status:
+            stmt = stmt.where(DraftListing.image_status == image_status)
+            stmt = stmt.order_by(desc(DraftListing.edit_date))
+        elif status:
+            stmt = stmt.order_by(desc(DraftListing.updated_at))
+        else:
+            stmt = stmt.order_by(desc(DraftListing.created_at))
+
+        if status:
+            stmt = stmt.where(DraftListing.status == status)
+
+        if account_id:
+            stmt = stmt.where(DraftListing.account_id == account_id)
+
+        return stmt.offset(skip).limit(limit)
+
+    def list_dicts(self, **kwargs) -> List[Dict[str, Any]]:
+        """Get draft rows as plain dicts via a single Core SELECT
+
+        Bypasses ORM hydration (identity map, attribute descriptors) for
+        list endpoints that only emit JSON.
+        """
+        rows = self.db.execute(self._list_stmt(**kwargs)).mappings().all()
+        return [dict(row) for row in rows]
+
     def get_by_account_id(self, account_id: int, skip: int = 0, limit: int = 100) -> List[DraftListing]:
         """Get draft listings by account ID"""
         return (
             self.db.query(DraftListing)
+            .options(raiseload('*'))
             .filter(DraftListing.account_id == account_id)
             .order_by(desc(DraftListing.created_at))
             .offset(skip)
@@ -36,23 +116,37 @@ class DraftListingRepository(BaseRepository[DraftListing]):
             .all()
         )
     
-    def get_by_status(self, status: str, account_id: Optional[int] = None) -> List[DraftListing]:
+    def get_by_status(self, status: str, account_id: Optional[int] = None,
+                      skip: int = 0, limit: int = 100) -> List[DraftListing]:
         """Get drafts by status, optionally filtered by account"""
-        query = self.db.query(DraftListing).filter(DraftListing.status == status)
-        
+        query = self.db.query(DraftListing).options(raiseload('*')).filter(DraftListing.status == status)
+
         if account_id:
             query = query.filter(DraftListing.account_id == account_id)
-        
-        return query.order_by(desc(DraftListing.updated_at)).all()
-    
-    def get_by_image_status(self, image_status: str, account_id: Optional[int] = None) -> List[DraftListing]:
+
+        return (
+            query
+            .order_by(desc(DraftListing.updated_at))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def get_by_image_status(self, image_status: str, account_id: Optional[int] = None,
+                            skip: int = 0, limit: int = 100) -> List[DraftListing]:
         """Get drafts by image status"""
-        query = self.db.query(DraftListing).filter(DraftListing.image_status == image_status)
-        
+        query = self.db.query(DraftListing).options(raiseload('*')).filter(DraftListing.image_status == image_status)
+
         if account_id:
             query = query.filter(DraftListing.account_id == account_id)
-        
-        return query.order_by(desc(DraftListing.edit_date)).all()
+
+        return (
+            query
+            .order_by(desc(DraftListing.edit_date))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
     
     def get_ready_to_list(self, account_id: Optional[int] = None) -> List[DraftListing]:
         """Get drafts that are ready to list"""
@@ -95,11 +189,13 @@ class DraftListingRepository(BaseRepository[DraftListing]):
         )
     
     def get_with_account_and_source(self, draft_id: str) -> Optional[DraftListing]:
-        """Get draft with account and source product info"""
+        """Get draft with account and source product eagerly loaded"""
         return (
             self.db.query(DraftListing)
-            .join(Account, DraftListing.account_id == Account.id)
-            .outerjoin(SourceProduct, DraftListing.source_product_id == SourceProduct.id)
+            .options(
+                selectinload(DraftListing.account),
+                selectinload(DraftListing.source_product)
+            )
             .filter(DraftListing.id == draft_id)
             .first()
         )
@@ -111,13 +207,10 @@ class DraftListingRepository(BaseRepository[DraftListing]):
                      skip: int = 0,
                      limit: int = 50) -> List[DraftListing]:
         """Search drafts by title or description"""
-        search_filter = or_(
-            DraftListing.title.contains(query),
-            DraftListing.description.contains(query)
+        db_query = self.db.query(DraftListing).options(raiseload('*')).filter(
+            self._search_filter(query)
         )
         
-        db_query = self.db.query(DraftListing).filter(search_filter)
-        
         if account_id:
             db_query = db_query.filter(DraftListing.account_id == account_id)
         
@@ -166,59 +259,115 @@ class DraftListingRepository(BaseRepository[DraftListing]):
             self.db.refresh(draft)
         return draft
     
-    def bulk_update_status(self, draft_ids: List[str], status: str) -> int:
-        """Bulk update status for multiple drafts"""
-        updated = (
-            self.db.query(DraftListing)
-            .filter(DraftListing.id.in_(draft_ids))
-            .update({DraftListing.status: status}, synchronize_session=False)
+    def create_returning(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a draft and return the created fields in one statement
+
+        INSERT ... RETURNING skips the refresh SELECT that repo.create
+        would issue; no ORM instance is built for the response.
+        """
+        stmt = (
+            insert(DraftListing)
+            .values(**values)
+            .returning(
+                DraftListing.id,
+                DraftListing.account_id,
+                DraftListing.title,
+                DraftListing.status,
+                DraftListing.image_status,
+            )
+        )
+        row = dict(self.db.execute(stmt).mappings().one())
+        self.db.commit()
+        return row
+
+    def update_returning(self, draft_id: str, user_id: int,
+                         values: Dict[str, Any]) -> Optional[DraftListing]:
+        """Update a draft in one UPDATE ... RETURNING statement
+
+        Combines the ownership check and the mutation into a single
+        round-trip; returns None when the draft does not exist or
+        belongs to another user.
+        """
+        stmt = (
+            update(DraftListing)
+            .where(
+                DraftListing.id == draft_id,
+                DraftListing.user_id == user_id
+            )
+            .values(**values)
+            .returning(DraftListing)
+        )
+        updated = self.db.execute(stmt).scalar_one_or_none()
+        self.db.commit()
+        return updated
+
+    def bulk_update_status(self, draft_ids: List[str], status: str,
+                           user_id: Optional[int] = None) -> int:
+        """Bulk update status for multiple drafts in one UPDATE statement"""
+        query = self.db.query(DraftListing).filter(DraftListing.id.in_(draft_ids))
+
+        if user_id is not None:
+            query = query.filter(DraftListing.user_id == user_id)
+
+        updated = query.update(
+            {DraftListing.status: status, DraftListing.updated_at: func.now()},
+            synchronize_session=False
         )
         self.db.commit()
         return updated
     
     def get_analytics(self, account_id: Optional[int] = None) -> Dict[str, Any]:
-        """Get draft analytics"""
-        query = self.db.query(DraftListing)
-        
-        if account_id:
-            query = query.filter(DraftListing.account_id == account_id)
-        
-        total = query.count()
-        
-        # Status breakdown
-        status_counts = self.count_by_status(account_id)
-        
-        # Image status breakdown
-        image_status_counts = self.count_by_image_status(account_id)
-        
-        # Average profit margin
-        avg_profit = (
-            query
-            .filter(DraftListing.profit_margin.isnot(None))
-            .with_entities(self.db.func.avg(DraftListing.profit_margin))
-            .scalar() or 0
-        )
-        
-        # Price range
-        price_stats = (
-            query
-            .filter(DraftListing.price.isnot(None))
-            .with_entities(
-                self.db.func.min(DraftListing.price),
-                self.db.func.max(DraftListing.price),
-                self.db.func.avg(DraftListing.price)
+        """Get draft analytics in a single aggregate query
+
+        COUNT(*) FILTER (WHERE ...) collapses the per-status counts,
+        profit and price stats into one table scan instead of one
+        query per metric.
+        """
+        columns = [func.count(DraftListing.id).label('total')]
+
+        for status in DraftStatusEnum:
+            columns.append(
+                func.count(DraftListing.id)
+                .filter(DraftListing.status == status)
+                .label(f'status_{status.value}')
             )
-            .first()
-        )
-        
+
+        for image_status in ImageStatusEnum:
+            columns.append(
+                func.count(DraftListing.id)
+                .filter(DraftListing.image_status == image_status)
+                .label(f'image_{image_status.value}')
+            )
+
+        columns.extend([
+            func.avg(DraftListing.profit_margin).label('avg_profit'),
+            func.min(DraftListing.price).label('min_price'),
+            func.max(DraftListing.price).label('max_price'),
+            func.avg(DraftListing.price).label('avg_price'),
+        ])
+
+        stmt = select(*columns)
+        if account_id:
+            stmt = stmt.where(DraftListing.account_id == account_id)
+
+        row = self.db.execute(stmt).one()._asdict()
+
         return {
-            'total_drafts': total,
-            'status_breakdown': status_counts,
-            'image_status_breakdown': image_status_counts,
-            'average_profit_margin': float(avg_profit),
+            'total_drafts': row['total'],
+            'status_breakdown': {
+                status.value: row[f'status_{status.value}']
+                for status in DraftStatusEnum
+                if row[f'status_{status.value}']
+            },
+            'image_status_breakdown': {
+                image_status.value: row[f'image_{image_status.value}']
+                for image_status in ImageStatusEnum
+                if row[f'image_{image_status.value}']
+            },
+            'average_profit_margin': float(row['avg_profit'] or 0),
             'price_stats': {
-                'min': float(price_stats[0]) if price_stats[0] else 0,
-                'max': float(price_stats[1]) if price_stats[1] else 0,
-                'avg': float(price_stats[2]) if price_stats[2] else 0
+                'min': float(row['min_price']) if row['min_price'] else 0,
+                'max': float(row['max_price']) if row['max_price'] else 0,
+                'avg': float(row['avg_price']) if row['avg_price'] else 0
             }
         }
\ No newline at end of file
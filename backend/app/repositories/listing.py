@@ -4,7 +4,7 @@ Listing Repository - Specialized CRUD operations cho Listing model
 
 from typing import Optional, List, Dict, Any
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func, desc, asc
+from sqlalchemy import and_, or_, func, desc, asc, select, update
 from datetime import datetime, timedelta
 
 from app.repositories.base import CRUDBase
@@ -147,6 +147,24 @@ class ListingRepository(CRUDBase[Listing, ListingCreate, ListingUpdate]):
             )
         ).order_by(desc(Listing.created_at)).limit(limit).all()
 
+    def get_export_rows(self, db: Session, *, user_id: int, limit: int = 1000) -> List[Any]:
+        """Column projection cho sheets export - Row tuples thay vì ORM objects
+
+        Export chỉ đọc 20 scalar fields mỗi row nên bỏ qua full ORM
+        hydration (identity map, descriptors); Row vẫn cho attribute
+        access theo tên cột như entity.
+        """
+        stmt = select(
+            Listing.id, Listing.ebay_item_id, Listing.sku, Listing.title,
+            Listing.optimized_title, Listing.description, Listing.category,
+            Listing.price, Listing.quantity, Listing.condition,
+            Listing.status, Listing.keywords, Listing.item_specifics,
+            Listing.views, Listing.watchers, Listing.sold,
+            Listing.performance_score, Listing.seo_score,
+            Listing.created_at, Listing.updated_at
+        ).where(Listing.user_id == user_id).limit(limit)
+        return db.execute(stmt).all()
+
     def get_listings_with_orders(self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100) -> List[Listing]:
         """Get listings có orders"""
         return db.query(Listing).options(joinedload(Listing.orders)).filter(
@@ -189,6 +207,54 @@ class ListingRepository(CRUDBase[Listing, ListingCreate, ListingUpdate]):
             "failed": len(listing_ids) - updated
         }
 
+    def bulk_update_owned(
+        self,
+        db: Session,
+        *,
+        updates: List[Dict[str, Any]],
+        user_id: int
+    ) -> Dict[str, Any]:
+        """Bulk update với ownership enforced trong từng UPDATE ... RETURNING
+
+        Mỗi update chạy một statement duy nhất (WHERE id AND user_id) thay
+        vì SELECT-rồi-mutate qua ORM; RETURNING cho biết chính xác rows
+        nào được chạm tới nên unauthorized/missing ids được report thay vì
+        bị drop âm thầm. Tất cả trong một transaction.
+        """
+        settable = set(Listing.__table__.columns.keys()) - {"id", "user_id"}
+        requested_ids = []
+        touched = set()
+
+        for update_data in updates:
+            if "id" not in update_data:
+                continue
+
+            obj_id = update_data["id"]
+            requested_ids.append(obj_id)
+
+            payload = {k: v for k, v in update_data.items() if k in settable}
+            if not payload:
+                continue
+
+            stmt = (
+                update(Listing)
+                .where(and_(Listing.id == obj_id, Listing.user_id == user_id))
+                .values(**payload)
+                .returning(Listing.id)
+            )
+            returned_id = db.execute(stmt).scalar_one_or_none()
+            if returned_id is not None:
+                touched.add(returned_id)
+
+        db.commit()
+
+        failed_ids = [obj_id for obj_id in requested_ids if obj_id not in touched]
+        return {
+            "success": len(touched),
+            "failed": len(failed_ids),
+            "failed_ids": failed_ids
+        }
+
     def get_statistics(self, db: Session, *, user_id: int) -> Dict[str, Any]:
         """Get listing statistics for user"""
         stats = {}
@@ -4,7 +4,7 @@ Source Repository - Specialized CRUD operations cho Source model
 
 from typing import Optional, List, Dict, Any
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func, desc, asc
+from sqlalchemy import and_, or_, func, desc, asc, update
 from datetime import datetime, timedelta
 
 from app.repositories.base import CRUDBase
@@ -60,6 +60,53 @@ class SourceRepository(CRUDBase[Source, SourceCreate, SourceUpdate]):
             user_id=user_id
         )
 
+    def get_page_keyset(
+        self,
+        db: Session,
+        *,
+        user_id: int,
+        limit: int = 20,
+        cursor: Optional[tuple] = None,
+        status: Optional[SourceStatusEnum] = None,
+        search: Optional[str] = None
+    ) -> List[Source]:
+        """Keyset pagination theo (last_sync DESC, id DESC)
+
+        cursor là (last_sync, id) của row cuối trang trước; query chỉ
+        lấy các row "sau" cursor nên chi phí là O(limit) bất kể độ sâu,
+        thay vì OFFSET scan-và-bỏ. Rows với last_sync NULL xếp cuối
+        (SQLite coi NULL nhỏ nhất khi DESC).
+        """
+        query = db.query(Source).filter(Source.user_id == user_id)
+
+        if status:
+            query = query.filter(Source.status == status)
+        if search:
+            pattern = f"%{search}%"
+            query = query.filter(or_(
+                Source.name.ilike(pattern),
+                Source.website_url.ilike(pattern)
+            ))
+
+        if cursor:
+            last_sync, last_id = cursor
+            if last_sync is None:
+                # Đã ở vùng NULL cuối danh sách - chỉ còn so theo id
+                query = query.filter(and_(
+                    Source.last_sync.is_(None),
+                    Source.id < last_id
+                ))
+            else:
+                query = query.filter(or_(
+                    Source.last_sync < last_sync,
+                    and_(Source.last_sync == last_sync, Source.id < last_id),
+                    Source.last_sync.is_(None)
+                ))
+
+        return query.order_by(
+            desc(Source.last_sync), desc(Source.id)
+        ).limit(limit).all()
+
     def get_connected_sources(self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100) -> Dict[str, Any]:
         """Get all connected sources"""
         return self.get_by_status(db, status=SourceStatusEnum.CONNECTED, user_id=user_id, skip=skip, limit=limit)
@@ -215,6 +262,49 @@ class SourceRepository(CRUDBase[Source, SourceCreate, SourceUpdate]):
         
         return stats
 
+    def update_owned(
+        self,
+        db: Session,
+        *,
+        source_id: str,
+        user_id: int,
+        values: Dict[str, Any]
+    ) -> Optional[Source]:
+        """Update source trong một UPDATE ... RETURNING với ownership check
+
+        Gộp check ownership và mutation vào một round-trip; trả về None
+        khi row không tồn tại hoặc thuộc user khác (caller phân biệt
+        404/403 qua exists()).
+        """
+        stmt = (
+            update(Source)
+            .where(and_(Source.id == source_id, Source.user_id == user_id))
+            .values(**values)
+            .returning(Source)
+        )
+        source = db.execute(stmt).scalar_one_or_none()
+        db.commit()
+        return source
+
+    def delete_owned(self, db: Session, *, source_id: str, user_id: int) -> bool:
+        """Delete source với ownership check trong một DELETE statement"""
+        deleted = db.query(Source).filter(
+            and_(Source.id == source_id, Source.user_id == user_id)
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted > 0
+
+    def get_owners_map(self, db: Session, *, ids: List[str]) -> Dict[str, int]:
+        """Map source_id → user_id cho một batch IDs trong một query
+
+        Dùng cho ownership checks hàng loạt - một round-trip thay vì
+        một get() per source.
+        """
+        rows = db.query(Source.id, Source.user_id).filter(
+            Source.id.in_(ids)
+        ).all()
+        return {row[0]: row[1] for row in rows}
+
     def bulk_sync(self, db: Session, *, source_ids: List[str], user_id: int) -> Dict[str, Any]:
         """Bulk sync multiple sources"""
         updated = db.query(Source).filter(
@@ -234,6 +324,33 @@ class SourceRepository(CRUDBase[Source, SourceCreate, SourceUpdate]):
             "failed": len(source_ids) - updated
         }
 
+    def bulk_sync_stale(
+        self, db: Session, *, user_id: int, hours_threshold: int = 24
+    ) -> int:
+        """Mark tất cả sources quá hạn sync trong một UPDATE statement
+
+        Cùng criteria với get_sources_need_sync nhưng không kéo rows về
+        Python - một statement thay vì select + N per-id updates.
+        """
+        cutoff_time = datetime.now() - timedelta(hours=hours_threshold)
+        updated = db.query(Source).filter(
+            and_(
+                Source.user_id == user_id,
+                Source.auto_sync == True,
+                Source.status == SourceStatusEnum.CONNECTED,
+                or_(
+                    Source.last_sync.is_(None),
+                    Source.last_sync < cutoff_time
+                )
+            )
+        ).update({
+            "status": SourceStatusEnum.SYNCING,
+            "last_sync": datetime.now()
+        }, synchronize_session=False)
+
+        db.commit()
+        return updated
+
     def get_product_count(self, db: Session, *, source_id: str) -> int:
         """Get product count for source"""
         return db.query(func.count(SourceProduct.id)).filter(
@@ -251,12 +368,10 @@ class SourceRepository(CRUDBase[Source, SourceCreate, SourceUpdate]):
         
         return float(avg_roi) if avg_roi else None
 
-    def update_auto_calculated_stats(self, db: Session, *, source_id: str) -> Optional[Source]:
+    def update_auto_calculated_stats(
+        self, db: Session, *, source_id: str, user_id: int
+    ) -> Optional[Source]:
         """Update statistics based on actual product data"""
-        source = self.get(db, id=source_id)
-        if not source:
-            return None
-        
         # Calculate from actual products
         total_products = self.get_product_count(db, source_id=source_id)
         active_products = db.query(func.count(SourceProduct.id)).filter(
@@ -265,20 +380,20 @@ class SourceRepository(CRUDBase[Source, SourceCreate, SourceUpdate]):
                 SourceProduct.in_stock == True
             )
         ).scalar()
-        
+
         average_roi = self.calculate_roi(db, source_id=source_id)
-        
-        # Update source
-        source.total_products = total_products
-        source.active_products = active_products
+
+        # Một UPDATE owned thay vì get + mutate + refresh
+        values = {
+            "total_products": total_products,
+            "active_products": active_products,
+        }
         if average_roi is not None:
-            source.average_roi = average_roi
-        
-        db.add(source)
-        db.commit()
-        db.refresh(source)
-        
-        return source
+            values["average_roi"] = average_roi
+
+        return self.update_owned(
+            db, source_id=source_id, user_id=user_id, values=values
+        )
 
 
 # Create repository instance
@@ -563,6 +563,9 @@ class PaginatedResponse(BaseModel):
     pages: int
     has_next: bool
     has_prev: bool
+    # Keyset pagination - set bởi các endpoint hỗ trợ cursor; client
+    # truyền lại giá trị này thay vì page để tránh OFFSET scan sâu
+    next_cursor: Optional[str] = None
 
 
 # Bulk Operations
@@ -5,7 +5,10 @@ Single Responsibility: Manages automation workflows và scheduling operations
 """
 
 import asyncio
-from typing import List, Dict, Optional, Any, Callable
+import threading
+from bisect import bisect_right
+from collections import defaultdict, deque
+from typing import List, Dict, Optional, Any, Callable, Set
 from datetime import datetime, timedelta
 import json
 import logging
@@ -66,17 +69,66 @@ class AutomationTask:
     ):
         self.task_id = task_id
         self.task_type = task_type
-        self.frequency = frequency
-        self.enabled = enabled
+        # to_dict cache - invalidate (_touch) khi bất kỳ field nào đổi,
+        # nên list-tasks lặp lại trên task không đổi gần như zero-cost
+        self._cached_dict: Optional[Dict[str, Any]] = None
+        self._frequency = frequency
+        self._enabled = enabled
         self.parameters = parameters or {}
         self.last_run: Optional[datetime] = None
         self.next_run: Optional[datetime] = None
-        self.status = TaskStatus.PENDING
+        self._status = TaskStatus.PENDING
+        # Service gắn listener khi add_task để giữ per-status index đồng bộ
+        self._status_listener: Optional[Callable[["AutomationTask", TaskStatus, TaskStatus], None]] = None
+        self._enabled_listener: Optional[Callable[["AutomationTask", bool, bool], None]] = None
         self.execution_count = 0
         self.success_count = 0
         self.failure_count = 0
         self.last_result: Optional[Dict[str, Any]] = None
         
+    def _touch(self):
+        """Invalidate cached to_dict sau khi task mutate"""
+        self._cached_dict = None
+
+    @property
+    def status(self) -> TaskStatus:
+        return self._status
+
+    @status.setter
+    def status(self, value: TaskStatus):
+        old_status = self._status
+        self._status = value
+        self._touch()
+        if self._status_listener and old_status != value:
+            self._status_listener(self, old_status, value)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        old_enabled = self._enabled
+        self._enabled = value
+        self._touch()
+        if self._enabled_listener and old_enabled != value:
+            self._enabled_listener(self, old_enabled, value)
+
+    @property
+    def frequency(self) -> TaskFrequency:
+        return self._frequency
+
+    @frequency.setter
+    def frequency(self, value: TaskFrequency):
+        self._frequency = value
+        self._touch()
+
+    def update_parameters(self, params: Dict[str, Any]):
+        """Merge parameters và invalidate cache - dùng thay cho
+        parameters.update() trực tiếp để cache không bị stale"""
+        self.parameters.update(params)
+        self._touch()
+
     def calculate_next_run(self) -> datetime:
         """Calculate next execution time"""
         now = datetime.now()
@@ -109,10 +161,18 @@ class AutomationTask:
             self.status = TaskStatus.FAILED
         
         self.last_result = result
-    
+        self._touch()
+
     def to_dict(self) -> Dict[str, Any]:
-        """Convert task to dictionary"""
-        return {
+        """Convert task to dictionary (cached tới lần mutate kế tiếp)
+
+        Caller không được mutate dict trả về - nó được share giữa các
+        lần đọc cho tới khi task thay đổi.
+        """
+        if self._cached_dict is not None:
+            return self._cached_dict
+
+        self._cached_dict = {
             "task_id": self.task_id,
             "task_type": self.task_type.value,
             "frequency": self.frequency.value,
@@ -127,6 +187,7 @@ class AutomationTask:
             "success_rate": self.success_count / max(self.execution_count, 1) * 100,
             "last_result": self.last_result
         }
+        return self._cached_dict
 
 
 class PerformanceMonitor:
@@ -135,24 +196,56 @@ class PerformanceMonitor:
     def __init__(self):
         self.metrics: Dict[str, List[Dict[str, Any]]] = {}
         self.alerts: List[Dict[str, Any]] = []
-        
+        # Epoch timestamps song song với metrics/alerts (cùng thứ tự append)
+        # để filter theo cutoff bằng bisect thay vì parse fromisoformat
+        # từng record mỗi lần đọc
+        self._metric_ts: Dict[str, List[float]] = {}
+        self._alert_ts: List[float] = []
+        # Buffer ingest: record_metric chỉ append vào deque (O(1), giữ lock
+        # rất ngắn); trim + alert check chạy theo batch khi drain thay vì
+        # per-event trên hot path
+        self._buffer: deque = deque()
+        self._buffer_lock = threading.Lock()
+        self._buffer_flush_size = 1000
+
     def record_metric(self, metric_name: str, value: float, metadata: Optional[Dict[str, Any]] = None):
-        """Record a performance metric"""
+        """Record a performance metric (buffered - flushed on read or khi đầy)"""
+        with self._buffer_lock:
+            self._buffer.append((metric_name, value, metadata or {}, datetime.now()))
+            should_flush = len(self._buffer) >= self._buffer_flush_size
+        if should_flush:
+            self._drain_buffer()
+
+    def _drain_buffer(self):
+        """Flush buffered events vào metrics/alerts structures"""
+        with self._buffer_lock:
+            if not self._buffer:
+                return
+            events = list(self._buffer)
+            self._buffer.clear()
+        for metric_name, value, metadata, now in events:
+            self._ingest(metric_name, value, metadata, now)
+
+    def _ingest(self, metric_name: str, value: float, metadata: Dict[str, Any], now: datetime):
+        """Apply một metric event vào persistent structures"""
         if metric_name not in self.metrics:
             self.metrics[metric_name] = []
-        
+            self._metric_ts[metric_name] = []
+
         metric_data = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "value": value,
-            "metadata": metadata or {}
+            "metadata": metadata
         }
-        
+
         self.metrics[metric_name].append(metric_data)
-        
+        self._metric_ts[metric_name].append(now.timestamp())
+
         # Keep only last 1000 records per metric
         if len(self.metrics[metric_name]) > 1000:
             self.metrics[metric_name] = self.metrics[metric_name][-1000:]
-        
+            self._metric_ts[metric_name] = self._metric_ts[metric_name][-1000:]
+
         # Check for alerts
         self._check_alerts(metric_name, value, metadata)
     
@@ -177,31 +270,45 @@ class PerformanceMonitor:
                 trigger_alert = True
             
             if trigger_alert:
+                now = datetime.now()
                 alert = {
                     "metric_name": metric_name,
                     "value": value,
                     "threshold": threshold,
                     "severity": "high" if abs(value - threshold) > threshold * 0.5 else "medium",
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": now.isoformat(),
                     "metadata": metadata or {}
                 }
                 self.alerts.append(alert)
-                
+                self._alert_ts.append(now.timestamp())
+
                 # Keep only last 100 alerts
                 if len(self.alerts) > 100:
                     self.alerts = self.alerts[-100:]
+                    self._alert_ts = self._alert_ts[-100:]
     
+    def get_metric_since(self, metric_name: str, hours: int = 24) -> List[Dict[str, Any]]:
+        """Lấy records của một metric trong N giờ gần nhất.
+
+        Timestamps append theo thứ tự tăng dần nên bisect trên list epoch
+        tìm được điểm cắt trong O(log n) - không parse timestamp nào.
+        """
+        self._drain_buffer()
+        records = self.metrics.get(metric_name)
+        if not records:
+            return []
+        cutoff = (datetime.now() - timedelta(hours=hours)).timestamp()
+        start = bisect_right(self._metric_ts[metric_name], cutoff)
+        return records[start:]
+
     def get_metrics_summary(self, hours: int = 24) -> Dict[str, Any]:
         """Get metrics summary for specified time period"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
+        self._drain_buffer()
         summary = {}
-        
-        for metric_name, records in self.metrics.items():
-            recent_records = [
-                r for r in records 
-                if datetime.fromisoformat(r["timestamp"]) > cutoff_time
-            ]
-            
+
+        for metric_name in self.metrics:
+            recent_records = self.get_metric_since(metric_name, hours=hours)
+
             if recent_records:
                 values = [r["value"] for r in recent_records]
                 summary[metric_name] = {
@@ -212,16 +319,17 @@ class PerformanceMonitor:
                     "latest": values[-1],
                     "trend": "up" if len(values) > 1 and values[-1] > values[0] else "down"
                 }
-        
+
         return summary
-    
-    def get_active_alerts(self, hours: int = 24) -> List[Dict[str, Any]]:
-        """Get active alerts from specified time period"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        return [
-            alert for alert in self.alerts
-            if datetime.fromisoformat(alert["timestamp"]) > cutoff_time
-        ]
+
+    def get_active_alerts(self, hours: int = 24, severity: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get active alerts from specified time period, optionally by severity"""
+        self._drain_buffer()
+        cutoff = (datetime.now() - timedelta(hours=hours)).timestamp()
+        recent = self.alerts[bisect_right(self._alert_ts, cutoff):]
+        if severity:
+            return [alert for alert in recent if alert.get("severity") == severity]
+        return recent
 
 
 class AutomationService:
@@ -232,6 +340,11 @@ class AutomationService:
     
     def __init__(self):
         self.tasks: Dict[str, AutomationTask] = {}
+        # Inverted indexes cho filtered list - đọc theo status/type là
+        # O(k) set lookup thay vì scan toàn bộ tasks mỗi request
+        self._by_status: Dict[TaskStatus, Set[str]] = defaultdict(set)
+        self._by_type: Dict[AutomationTaskType, Set[str]] = defaultdict(set)
+        self._enabled_count = 0
         self.performance_monitor = PerformanceMonitor()
         self.logger = logging.getLogger(__name__)
         self.running = False
@@ -286,8 +399,8 @@ class AutomationService:
                 parameters=task_config.get("parameters", {})
             )
             task.next_run = task.calculate_next_run()
-            self.tasks[task.task_id] = task
-    
+            self.add_task(task)
+
     # ===========================================
     # TASK MANAGEMENT
     # ===========================================
@@ -299,6 +412,12 @@ class AutomationService:
                 task.next_run = task.calculate_next_run()
             
             self.tasks[task.task_id] = task
+            self._by_status[task.status].add(task.task_id)
+            self._by_type[task.task_type].add(task.task_id)
+            if task.enabled:
+                self._enabled_count += 1
+            task._status_listener = self._reindex_status
+            task._enabled_listener = self._recount_enabled
             self.logger.info(f"Added automation task: {task.task_id}")
             return True
             
@@ -310,7 +429,13 @@ class AutomationService:
         """Remove automation task"""
         try:
             if task_id in self.tasks:
-                del self.tasks[task_id]
+                task = self.tasks.pop(task_id)
+                task._status_listener = None
+                task._enabled_listener = None
+                self._by_status[task.status].discard(task_id)
+                self._by_type[task.task_type].discard(task_id)
+                if task.enabled:
+                    self._enabled_count -= 1
                 self.logger.info(f"Removed automation task: {task_id}")
                 return True
             return False
@@ -333,10 +458,55 @@ class AutomationService:
             return True
         return False
     
-    def get_tasks(self) -> List[Dict[str, Any]]:
-        """Get all automation tasks"""
-        return [task.to_dict() for task in self.tasks.values()]
+    def _reindex_status(self, task: AutomationTask, old_status: TaskStatus, new_status: TaskStatus):
+        """Move task giữa các per-status sets khi status đổi"""
+        self._by_status[old_status].discard(task.task_id)
+        self._by_status[new_status].add(task.task_id)
+
+    def _recount_enabled(self, task: AutomationTask, old_enabled: bool, new_enabled: bool):
+        """Giữ _enabled_count đồng bộ khi task enable/disable"""
+        self._enabled_count += 1 if new_enabled else -1
+
+    def count_by_status(self, status: TaskStatus) -> int:
+        """Số task đang ở status cho trước - O(1) nhờ per-status index"""
+        return len(self._by_status[status])
+
+    @property
+    def enabled_count(self) -> int:
+        """Số task đang enabled - counter cập nhật theo transitions"""
+        return self._enabled_count
+
+    def get_tasks(
+        self,
+        status: Optional[TaskStatus] = None,
+        task_type: Optional[AutomationTaskType] = None
+    ) -> List[Dict[str, Any]]:
+        """Get automation tasks, optionally filtered by status/type
+
+        Filters resolve qua inverted index nên chỉ materialize to_dict
+        cho các task khớp thay vì serialize rồi lọc lại bằng Python.
+        """
+        if status is None and task_type is None:
+            return [task.to_dict() for task in self.tasks.values()]
+
+        if status is not None and task_type is not None:
+            task_ids = self._by_status[status] & self._by_type[task_type]
+        elif status is not None:
+            task_ids = self._by_status[status]
+        else:
+            task_ids = self._by_type[task_type]
+
+        return [self.tasks[task_id].to_dict() for task_id in task_ids]
     
+    def get_task_obj(self, task_id: str) -> Optional[AutomationTask]:
+        """Lookup task object theo id - read path duy nhất cho endpoints
+
+        Hiện là dict O(1) in-memory; nếu tasks chuyển sang persistent
+        storage thì read-through caching chỉ cần thêm tại đây thay vì
+        rải khắp các endpoint đang với thẳng vào self.tasks.
+        """
+        return self.tasks.get(task_id)
+
     def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Get specific automation task"""
         if task_id in self.tasks:
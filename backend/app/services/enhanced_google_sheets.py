@@ -5,7 +5,11 @@ Single Responsibility: Manages enhanced Google Sheets operations with per-accoun
 """
 
 import os
-from typing import List, Dict, Optional, Any, Tuple
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import List, Dict, Optional, Any, Iterable, Tuple
 from datetime import datetime
 import json
 
@@ -21,6 +25,23 @@ except ImportError:
 from app.core.config import settings
 from app.models.database_models import Supplier, Product
 
+# Credentials load một lần cho cả process (object thread-safe, chỉ việc
+# đọc file + parse key là đắt); mỗi thread build service riêng từ đây
+_credentials_lock = threading.Lock()
+_cached_credentials = None
+
+
+def _load_sheets_credentials():
+    global _cached_credentials
+    if _cached_credentials is None:
+        with _credentials_lock:
+            if _cached_credentials is None:
+                _cached_credentials = service_account.Credentials.from_service_account_file(
+                    settings.GOOGLE_SHEETS_CREDENTIALS_PATH,
+                    scopes=['https://www.googleapis.com/auth/spreadsheets']
+                )
+    return _cached_credentials
+
 
 class EnhancedGoogleSheetsService:
     """
@@ -45,11 +66,7 @@ class EnhancedGoogleSheetsService:
             
         try:
             if os.path.exists(settings.GOOGLE_SHEETS_CREDENTIALS_PATH):
-                credentials = service_account.Credentials.from_service_account_file(
-                    settings.GOOGLE_SHEETS_CREDENTIALS_PATH,
-                    scopes=['https://www.googleapis.com/auth/spreadsheets']
-                )
-                self.service = build('sheets', 'v4', credentials=credentials)
+                self.service = build('sheets', 'v4', credentials=_load_sheets_credentials())
                 print("✅ Enhanced Google Sheets service initialized successfully")
             else:
                 print(f"Warning: Google Sheets credentials not found at {settings.GOOGLE_SHEETS_CREDENTIALS_PATH}")
@@ -601,6 +618,39 @@ class EnhancedGoogleSheetsService:
             print(f"Error getting sheet data: {error}")
             return []
     
+    def batch_get_row_counts(self, spreadsheet_id: str, sheet_names: List[str]) -> Dict[str, int]:
+        """Đếm rows của nhiều sheet trong một values.batchGet
+
+        Chỉ request cột A với majorDimension=COLUMNS nên mỗi sheet trả
+        về một list giá trị cột thay vì full rows - một HTTP round-trip
+        cho cả spreadsheet thay vì N lần get_sheet_data chỉ để len().
+        """
+        if self.use_fallback:
+            return {
+                name: len(self.fallback_data.get(name.lower(), []))
+                for name in sheet_names
+            }
+
+        if not self.service:
+            return {name: 0 for name in sheet_names}
+
+        try:
+            result = self.service.spreadsheets().values().batchGet(
+                spreadsheetId=spreadsheet_id,
+                ranges=[f"{name}!A:A" for name in sheet_names],
+                majorDimension="COLUMNS"
+            ).execute()
+
+            counts = {}
+            for name, value_range in zip(sheet_names, result.get('valueRanges', [])):
+                columns = value_range.get('values', [])
+                counts[name] = len(columns[0]) if columns else 0
+            return counts
+
+        except HttpError as error:
+            print(f"Error getting row counts: {error}")
+            return {name: 0 for name in sheet_names}
+
     def batch_update_sheet(self, spreadsheet_id: str, updates: List[Dict[str, Any]]) -> bool:
         """Perform batch updates across multiple sheets"""
         if self.use_fallback:
@@ -656,6 +706,58 @@ class EnhancedGoogleSheetsService:
     # BACKUP-SPECIFIC OPERATIONS
     # ===========================================
     
+    # Adaptive batch append: Sheets API tính quota per-request nên một
+    # append 5000 rows hay 5000 append 1-row đều tệ. Batch đầu 500 rows,
+    # RTT nhanh (<0.5s) thì double, bị 429/5xx thì halve và gửi lại
+    _APPEND_BATCH_INITIAL = 500
+    _APPEND_BATCH_MIN = 50
+    _APPEND_BATCH_MAX = 2000
+    _APPEND_FAST_RTT = 0.5
+
+    def _adaptive_append(self, spreadsheet_id: str, sheet_name: str,
+                         rows: Iterable[List[Any]]) -> int:
+        """Append rows vào sheet theo batch thích ứng, trả về số rows đã ghi.
+
+        Rows stream từ iterator/generator - không materialize toàn bộ
+        dataset trước khi gửi.
+        """
+        batch_size = self._APPEND_BATCH_INITIAL
+        total = 0
+        rows_iter = iter(rows)
+
+        while True:
+            batch = list(islice(rows_iter, batch_size))
+            if not batch:
+                return total
+
+            pending = deque([batch])
+            while pending:
+                chunk = pending.popleft()
+                started = time.monotonic()
+                try:
+                    self.service.spreadsheets().values().append(
+                        spreadsheetId=spreadsheet_id,
+                        range=f"{sheet_name}!A2",
+                        valueInputOption='RAW',
+                        body={'values': chunk}
+                    ).execute()
+                except HttpError as error:
+                    status = getattr(getattr(error, 'resp', None), 'status', None)
+                    retryable = status == 429 or (status is not None and status >= 500)
+                    if retryable and len(chunk) > self._APPEND_BATCH_MIN:
+                        # Chia đôi chunk hiện tại và thu nhỏ batch tiếp theo
+                        mid = len(chunk) // 2
+                        pending.appendleft(chunk[mid:])
+                        pending.appendleft(chunk[:mid])
+                        batch_size = max(self._APPEND_BATCH_MIN, batch_size // 2)
+                        time.sleep(1)
+                        continue
+                    raise
+                total += len(chunk)
+                if (time.monotonic() - started < self._APPEND_FAST_RTT
+                        and batch_size < self._APPEND_BATCH_MAX):
+                    batch_size = min(self._APPEND_BATCH_MAX, batch_size * 2)
+
     def sync_suppliers_to_backup(self, backup_spreadsheet_id: str, suppliers: List[Supplier]) -> bool:
         """Sync suppliers to backup spreadsheet All_Suppliers sheet"""
         return self.sync_suppliers_to_sheet_by_name(backup_spreadsheet_id, "All_Suppliers", suppliers)
@@ -667,62 +769,51 @@ class EnhancedGoogleSheetsService:
     def sync_orders_to_backup(self, backup_spreadsheet_id: str, orders: List) -> bool:
         """Sync orders to backup spreadsheet All_Orders sheet"""
         if self.use_fallback:
-            print(f"📝 Fallback: Would sync {len(orders)} orders to backup")
+            print(f"📝 Fallback: Would sync {sum(1 for _ in orders)} orders to backup")
             return True
         
         if not self.service:
             return False
         
         try:
-            # Prepare order data
-            order_data = []
-            for order in orders:
-                row = [
-                    getattr(order, 'id', ''),
-                    getattr(order, 'order_number', ''),
-                    getattr(order, 'customer_name', ''),
-                    getattr(order, 'customer_email', ''),
-                    getattr(order, 'product_name', ''),
-                    getattr(order, 'product_sku', ''),
-                    getattr(order, 'quantity', 0),
-                    getattr(order, 'unit_price', 0.0),
-                    getattr(order, 'total_price', 0.0),
-                    getattr(order, 'order_status', ''),
-                    getattr(order, 'payment_status', ''),
-                    getattr(order, 'shipping_status', ''),
-                    getattr(order, 'order_date', ''),
-                    getattr(order, 'ship_date', ''),
-                    getattr(order, 'delivery_date', ''),
-                    getattr(order, 'tracking_number', ''),
-                    getattr(order, 'carrier', ''),
-                    getattr(order, 'supplier_id', ''),
-                    getattr(order, 'supplier_name', ''),
-                    getattr(order, 'cost_price', 0.0),
-                    getattr(order, 'profit_margin', 0.0),
-                    getattr(order, 'customer_rating', 0),
-                    getattr(order, 'notes', ''),
-                    getattr(order, 'created_at', ''),
-                    getattr(order, 'updated_at', '')
-                ]
-                order_data.append(row)
-            
+            # Stream order rows qua generator - không giữ cả dataset
+            def _order_rows():
+                for order in orders:
+                    yield [
+                        getattr(order, 'id', ''),
+                        getattr(order, 'order_number', ''),
+                        getattr(order, 'customer_name', ''),
+                        getattr(order, 'customer_email', ''),
+                        getattr(order, 'product_name', ''),
+                        getattr(order, 'product_sku', ''),
+                        getattr(order, 'quantity', 0),
+                        getattr(order, 'unit_price', 0.0),
+                        getattr(order, 'total_price', 0.0),
+                        getattr(order, 'order_status', ''),
+                        getattr(order, 'payment_status', ''),
+                        getattr(order, 'shipping_status', ''),
+                        getattr(order, 'order_date', ''),
+                        getattr(order, 'ship_date', ''),
+                        getattr(order, 'delivery_date', ''),
+                        getattr(order, 'tracking_number', ''),
+                        getattr(order, 'carrier', ''),
+                        getattr(order, 'supplier_id', ''),
+                        getattr(order, 'supplier_name', ''),
+                        getattr(order, 'cost_price', 0.0),
+                        getattr(order, 'profit_margin', 0.0),
+                        getattr(order, 'customer_rating', 0),
+                        getattr(order, 'notes', ''),
+                        getattr(order, 'created_at', ''),
+                        getattr(order, 'updated_at', '')
+                    ]
+
             # Clear and write data
             self._clear_sheet_data(backup_spreadsheet_id, "All_Orders")
-            
-            if order_data:
-                range_name = f"All_Orders!A2:Y{len(order_data) + 1}"
-                body = {'values': order_data}
-                
-                self.service.spreadsheets().values().update(
-                    spreadsheetId=backup_spreadsheet_id,
-                    range=range_name,
-                    valueInputOption='USER_ENTERED',
-                    body=body
-                ).execute()
-            
-            print(f"✅ Synced {len(orders)} orders to backup")
+            written = self._adaptive_append(backup_spreadsheet_id, "All_Orders", _order_rows())
+
+            print(f"✅ Synced {written} orders to backup")
             return True
-            
+
         except Exception as error:
             print(f"Error syncing orders to backup: {error}")
             return False
@@ -730,61 +821,50 @@ class EnhancedGoogleSheetsService:
     def sync_listings_to_backup(self, backup_spreadsheet_id: str, listings: List) -> bool:
         """Sync listings to backup spreadsheet All_Listings sheet"""
         if self.use_fallback:
-            print(f"📝 Fallback: Would sync {len(listings)} listings to backup")
+            print(f"📝 Fallback: Would sync {sum(1 for _ in listings)} listings to backup")
             return True
         
         if not self.service:
             return False
         
         try:
-            # Prepare listing data
-            listing_data = []
-            for listing in listings:
-                row = [
-                    getattr(listing, 'id', ''),
-                    getattr(listing, 'ebay_item_id', ''),
-                    getattr(listing, 'sku', ''),
-                    getattr(listing, 'title', ''),
-                    getattr(listing, 'description', ''),
-                    getattr(listing, 'category', ''),
-                    getattr(listing, 'condition', ''),
-                    getattr(listing, 'price', 0.0),
-                    getattr(listing, 'quantity', 0),
-                    getattr(listing, 'status', ''),
-                    getattr(listing, 'views', 0),
-                    getattr(listing, 'watchers', 0),
-                    getattr(listing, 'sold_quantity', 0),
-                    getattr(listing, 'revenue', 0.0),
-                    getattr(listing, 'performance_score', 0.0),
-                    getattr(listing, 'seo_score', 0.0),
-                    getattr(listing, 'keywords', ''),
-                    getattr(listing, 'primary_supplier', ''),
-                    getattr(listing, 'backup_supplier', ''),
-                    getattr(listing, 'cost_price', 0.0),
-                    getattr(listing, 'profit_margin', 0.0),
-                    getattr(listing, 'stock_level', 0),
-                    getattr(listing, 'updated_at', ''),
-                    getattr(listing, 'created_at', '')
-                ]
-                listing_data.append(row)
-            
+            # Stream listing rows qua generator
+            def _listing_rows():
+                for listing in listings:
+                    yield [
+                        getattr(listing, 'id', ''),
+                        getattr(listing, 'ebay_item_id', ''),
+                        getattr(listing, 'sku', ''),
+                        getattr(listing, 'title', ''),
+                        getattr(listing, 'description', ''),
+                        getattr(listing, 'category', ''),
+                        getattr(listing, 'condition', ''),
+                        getattr(listing, 'price', 0.0),
+                        getattr(listing, 'quantity', 0),
+                        getattr(listing, 'status', ''),
+                        getattr(listing, 'views', 0),
+                        getattr(listing, 'watchers', 0),
+                        getattr(listing, 'sold_quantity', 0),
+                        getattr(listing, 'revenue', 0.0),
+                        getattr(listing, 'performance_score', 0.0),
+                        getattr(listing, 'seo_score', 0.0),
+                        getattr(listing, 'keywords', ''),
+                        getattr(listing, 'primary_supplier', ''),
+                        getattr(listing, 'backup_supplier', ''),
+                        getattr(listing, 'cost_price', 0.0),
+                        getattr(listing, 'profit_margin', 0.0),
+                        getattr(listing, 'stock_level', 0),
+                        getattr(listing, 'updated_at', ''),
+                        getattr(listing, 'created_at', '')
+                    ]
+
             # Clear and write data
             self._clear_sheet_data(backup_spreadsheet_id, "All_Listings")
-            
-            if listing_data:
-                range_name = f"All_Listings!A2:X{len(listing_data) + 1}"
-                body = {'values': listing_data}
-                
-                self.service.spreadsheets().values().update(
-                    spreadsheetId=backup_spreadsheet_id,
-                    range=range_name,
-                    valueInputOption='USER_ENTERED',
-                    body=body
-                ).execute()
-            
-            print(f"✅ Synced {len(listings)} listings to backup")
+            written = self._adaptive_append(backup_spreadsheet_id, "All_Listings", _listing_rows())
+
+            print(f"✅ Synced {written} listings to backup")
             return True
-            
+
         except Exception as error:
             print(f"Error syncing listings to backup: {error}")
             return False
@@ -792,51 +872,40 @@ class EnhancedGoogleSheetsService:
     def sync_accounts_to_backup(self, backup_spreadsheet_id: str, accounts: List) -> bool:
         """Sync eBay accounts to backup spreadsheet eBay_Accounts sheet"""
         if self.use_fallback:
-            print(f"📝 Fallback: Would sync {len(accounts)} accounts to backup")
+            print(f"📝 Fallback: Would sync {sum(1 for _ in accounts)} accounts to backup")
             return True
         
         if not self.service:
             return False
         
         try:
-            # Prepare account data
-            account_data = []
-            for account in accounts:
-                row = [
-                    getattr(account, 'id', ''),
-                    getattr(account, 'email', ''),
-                    getattr(account, 'store_name', ''),
-                    getattr(account, 'account_type', ''),
-                    getattr(account, 'status', ''),
-                    getattr(account, 'health_score', 0),
-                    getattr(account, 'usage_limit', 0),
-                    getattr(account, 'current_listings', 0),
-                    getattr(account, 'monthly_revenue', 0.0),
-                    getattr(account, 'total_orders', 0),
-                    getattr(account, 'success_rate', 0.0),
-                    getattr(account, 'last_sync', ''),
-                    getattr(account, 'created_at', ''),
-                    getattr(account, 'updated_at', '')
-                ]
-                account_data.append(row)
-            
+            # Stream account rows qua generator
+            def _account_rows():
+                for account in accounts:
+                    yield [
+                        getattr(account, 'id', ''),
+                        getattr(account, 'email', ''),
+                        getattr(account, 'store_name', ''),
+                        getattr(account, 'account_type', ''),
+                        getattr(account, 'status', ''),
+                        getattr(account, 'health_score', 0),
+                        getattr(account, 'usage_limit', 0),
+                        getattr(account, 'current_listings', 0),
+                        getattr(account, 'monthly_revenue', 0.0),
+                        getattr(account, 'total_orders', 0),
+                        getattr(account, 'success_rate', 0.0),
+                        getattr(account, 'last_sync', ''),
+                        getattr(account, 'created_at', ''),
+                        getattr(account, 'updated_at', '')
+                    ]
+
             # Clear and write data
             self._clear_sheet_data(backup_spreadsheet_id, "eBay_Accounts")
-            
-            if account_data:
-                range_name = f"eBay_Accounts!A2:N{len(account_data) + 1}"
-                body = {'values': account_data}
-                
-                self.service.spreadsheets().values().update(
-                    spreadsheetId=backup_spreadsheet_id,
-                    range=range_name,
-                    valueInputOption='USER_ENTERED',
-                    body=body
-                ).execute()
-            
-            print(f"✅ Synced {len(accounts)} accounts to backup")
+            written = self._adaptive_append(backup_spreadsheet_id, "eBay_Accounts", _account_rows())
+
+            print(f"✅ Synced {written} accounts to backup")
             return True
-            
+
         except Exception as error:
             print(f"Error syncing accounts to backup: {error}")
             return False
@@ -844,65 +913,53 @@ class EnhancedGoogleSheetsService:
     def sync_suppliers_to_sheet_by_name(self, spreadsheet_id: str, sheet_name: str, suppliers: List[Supplier]) -> bool:
         """Sync suppliers to a specific sheet by name"""
         if self.use_fallback:
-            print(f"📝 Fallback: Would sync {len(suppliers)} suppliers to {sheet_name}")
+            print(f"📝 Fallback: Would sync {sum(1 for _ in suppliers)} suppliers to {sheet_name}")
             return True
         
         if not self.service:
             return False
         
         try:
-            # Use the same logic as sync_suppliers_to_sheet but with custom sheet name
-            supplier_data = []
-            for supplier in suppliers:
-                row = [
-                    supplier.id,
-                    supplier.name,
-                    supplier.company_name or '',
-                    supplier.contact_person or '',
-                    supplier.email or '',
-                    supplier.phone or '',
-                    supplier.address or '',
-                    supplier.country or '',
-                    supplier.website or '',
-                    supplier.business_type or '',
-                    supplier.payment_terms or '',
-                    supplier.minimum_order_value or 0,
-                    supplier.currency or 'USD',
-                    supplier.discount_tier or '',
-                    supplier.priority_level or 3,
-                    supplier.performance_rating or 0.0,
-                    supplier.reliability_score or 0,
-                    supplier.total_orders or 0,
-                    supplier.successful_orders or 0,
-                    supplier.average_delivery_days or 15,
-                    0.0,  # quality_rating placeholder
-                    0.0,  # cost_efficiency placeholder
-                    supplier.status or 'active',
-                    supplier.tags or '',
-                    supplier.notes or '',
-                    supplier.created_at.isoformat() if supplier.created_at else '',
-                    supplier.updated_at.isoformat() if supplier.updated_at else ''
-                ]
-                supplier_data.append(row)
-            
+            # Stream supplier rows qua generator
+            def _supplier_rows():
+                for supplier in suppliers:
+                    yield [
+                        supplier.id,
+                        supplier.name,
+                        supplier.company_name or '',
+                        supplier.contact_person or '',
+                        supplier.email or '',
+                        supplier.phone or '',
+                        supplier.address or '',
+                        supplier.country or '',
+                        supplier.website or '',
+                        supplier.business_type or '',
+                        supplier.payment_terms or '',
+                        supplier.minimum_order_value or 0,
+                        supplier.currency or 'USD',
+                        supplier.discount_tier or '',
+                        supplier.priority_level or 3,
+                        supplier.performance_rating or 0.0,
+                        supplier.reliability_score or 0,
+                        supplier.total_orders or 0,
+                        supplier.successful_orders or 0,
+                        supplier.average_delivery_days or 15,
+                        0.0,  # quality_rating placeholder
+                        0.0,  # cost_efficiency placeholder
+                        supplier.status or 'active',
+                        supplier.tags or '',
+                        supplier.notes or '',
+                        supplier.created_at.isoformat() if supplier.created_at else '',
+                        supplier.updated_at.isoformat() if supplier.updated_at else ''
+                    ]
+
             # Clear existing data
             self._clear_sheet_data(spreadsheet_id, sheet_name)
-            
-            # Write new data
-            if supplier_data:
-                range_name = f"{sheet_name}!A2:Z{len(supplier_data) + 1}"
-                body = {'values': supplier_data}
-                
-                self.service.spreadsheets().values().update(
-                    spreadsheetId=spreadsheet_id,
-                    range=range_name,
-                    valueInputOption='USER_ENTERED',
-                    body=body
-                ).execute()
-            
-            print(f"✅ Synced {len(suppliers)} suppliers to {sheet_name}")
+            written = self._adaptive_append(spreadsheet_id, sheet_name, _supplier_rows())
+
+            print(f"✅ Synced {written} suppliers to {sheet_name}")
             return True
-            
+
         except Exception as error:
             print(f"Error syncing suppliers to {sheet_name}: {error}")
             return False
@@ -910,72 +967,60 @@ class EnhancedGoogleSheetsService:
     def sync_products_to_sheet_by_name(self, spreadsheet_id: str, sheet_name: str, products: List[Product], suppliers_map: Dict[int, Supplier]) -> bool:
         """Sync products to a specific sheet by name"""
         if self.use_fallback:
-            print(f"📝 Fallback: Would sync {len(products)} products to {sheet_name}")
+            print(f"📝 Fallback: Would sync {sum(1 for _ in products)} products to {sheet_name}")
             return True
         
         if not self.service:
             return False
         
         try:
-            # Use the same logic as sync_products_to_sheet but with custom sheet name
-            product_data = []
-            for product in products:
-                # Get supplier names
-                primary_supplier = suppliers_map.get(product.primary_supplier_id)
-                backup_supplier = suppliers_map.get(product.backup_supplier_id)
-                
-                # Calculate profit margin
-                profit_margin = 0.0
-                if product.selling_price and product.cost_price:
-                    profit_margin = ((product.selling_price - product.cost_price) / product.selling_price) * 100
-                
-                row = [
-                    product.id,
-                    product.sku,
-                    product.name,
-                    product.description or '',
-                    product.category or '',
-                    product.cost_price or 0.0,
-                    product.selling_price or 0.0,
-                    round(profit_margin, 2),
-                    product.stock_level or 0,
-                    product.minimum_stock or 0,
-                    product.maximum_stock or 0,
-                    product.weight or 0.0,
-                    product.dimensions or '',
-                    product.primary_supplier_id or '',
-                    primary_supplier.name if primary_supplier else '',
-                    product.backup_supplier_id or '',
-                    backup_supplier.name if backup_supplier else '',
-                    product.average_rating or 0.0,
-                    product.total_sales or 0,
-                    product.revenue or 0.0,
-                    product.return_rate_percent or 0.0,
-                    product.performance_score or 0.0,
-                    product.status or 'active',
-                    product.created_at.isoformat() if product.created_at else '',
-                    product.updated_at.isoformat() if product.updated_at else ''
-                ]
-                product_data.append(row)
-            
+            # Stream product rows qua generator
+            def _product_rows():
+                for product in products:
+                    # Get supplier names
+                    primary_supplier = suppliers_map.get(product.primary_supplier_id)
+                    backup_supplier = suppliers_map.get(product.backup_supplier_id)
+
+                    # Calculate profit margin
+                    profit_margin = 0.0
+                    if product.selling_price and product.cost_price:
+                        profit_margin = ((product.selling_price - product.cost_price) / product.selling_price) * 100
+
+                    yield [
+                        product.id,
+                        product.sku,
+                        product.name,
+                        product.description or '',
+                        product.category or '',
+                        product.cost_price or 0.0,
+                        product.selling_price or 0.0,
+                        round(profit_margin, 2),
+                        product.stock_level or 0,
+                        product.minimum_stock or 0,
+                        product.maximum_stock or 0,
+                        product.weight or 0.0,
+                        product.dimensions or '',
+                        product.primary_supplier_id or '',
+                        primary_supplier.name if primary_supplier else '',
+                        product.backup_supplier_id or '',
+                        backup_supplier.name if backup_supplier else '',
+                        product.average_rating or 0.0,
+                        product.total_sales or 0,
+                        product.revenue or 0.0,
+                        product.return_rate_percent or 0.0,
+                        product.performance_score or 0.0,
+                        product.status or 'active',
+                        product.created_at.isoformat() if product.created_at else '',
+                        product.updated_at.isoformat() if product.updated_at else ''
+                    ]
+
             # Clear existing data
             self._clear_sheet_data(spreadsheet_id, sheet_name)
-            
-            # Write new data
-            if product_data:
-                range_name = f"{sheet_name}!A2:Y{len(product_data) + 1}"
-                body = {'values': product_data}
-                
-                self.service.spreadsheets().values().update(
-                    spreadsheetId=spreadsheet_id,
-                    range=range_name,
-                    valueInputOption='USER_ENTERED',
-                    body=body
-                ).execute()
-            
-            print(f"✅ Synced {len(products)} products to {sheet_name}")
+            written = self._adaptive_append(spreadsheet_id, sheet_name, _product_rows())
+
+            print(f"✅ Synced {written} products to {sheet_name}")
             return True
-            
+
         except Exception as error:
             print(f"Error syncing products to {sheet_name}: {error}")
             return False
@@ -1022,4 +1067,20 @@ class EnhancedGoogleSheetsService:
             ).execute()
             
         except Exception as error:
-            print(f"Error logging backup error: {error}")
\ No newline at end of file
+            print(f"Error logging backup error: {error}")
+
+# Per-thread instance cho request handlers: httplib2 transport của
+# googleapiclient KHÔNG thread-safe nên không được chia sẻ một service
+# giữa các threadpool threads. Phần đắt (credentials) cache process-wide
+# qua _load_sheets_credentials; build() dùng static discovery nên tạo
+# service per thread là rẻ.
+_thread_local = threading.local()
+
+
+def get_enhanced_sheets_service() -> EnhancedGoogleSheetsService:
+    """FastAPI dependency trả về EnhancedGoogleSheetsService của thread hiện tại"""
+    service = getattr(_thread_local, "sheets_service", None)
+    if service is None:
+        service = EnhancedGoogleSheetsService()
+        _thread_local.sheets_service = service
+    return service
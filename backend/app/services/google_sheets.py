@@ -1,4 +1,6 @@
 import os
+import random
+import time
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 import json
@@ -12,17 +14,62 @@ except ImportError:
     GOOGLE_API_AVAILABLE = False
     print("Warning: Google API libraries not installed. Using fallback mode.")
 
+    class HttpError(Exception):
+        """Stub để except/isinstance vẫn hợp lệ khi chạy fallback mode"""
+        pass
+
 from app.core.config import settings
 from app.models.listing import Listing, ListingStatus
 
+# Sheets API enforce per-minute quota - 429/5xx là transient và nên retry
+# với exponential backoff + jitter thay vì surface thành error cho user
+_RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+_RETRY_MAX_ELAPSED = 120.0
+_RETRY_MAX_WAIT = 64.0
+
+
+def _execute_with_backoff(request):
+    """Execute một Sheets API request, retry transient errors
+
+    Exponential backoff với full jitter (1s → 64s, tối đa 120s tổng);
+    honor Retry-After header khi server chỉ định. Non-retryable errors
+    và timeout budget cạn thì raise cho caller xử lý như cũ.
+    """
+    deadline = time.monotonic() + _RETRY_MAX_ELAPSED
+    wait = 1.0
+    while True:
+        try:
+            return request.execute()
+        except HttpError as error:
+            status = getattr(error.resp, "status", None)
+            if status not in _RETRYABLE_STATUSES:
+                raise
+
+            retry_after = None
+            try:
+                retry_after = float(error.resp.get("retry-after"))
+            except (TypeError, ValueError):
+                pass
+
+            delay = retry_after if retry_after else random.uniform(0, wait)
+            if time.monotonic() + delay >= deadline:
+                raise
+            time.sleep(delay)
+            wait = min(wait * 2, _RETRY_MAX_WAIT)
+
 
 class GoogleSheetsService:
+    # TTL cho id→listing index - tránh download cả sheet mỗi lookup
+    LISTING_INDEX_TTL = 60.0
+
     def __init__(self):
         self.service = None
         self.spreadsheet_id = settings.SPREADSHEET_ID
         self.sheet_name = settings.SHEET_NAME
         self.use_fallback = False
         self.fallback_data = []
+        self._listing_index: Dict[str, Dict[str, Any]] = {}
+        self._listing_index_at = 0.0
         self._initialize_service()
     
     def _initialize_service(self):
@@ -103,10 +150,10 @@ class GoogleSheetsService:
         
         try:
             range_name = f"{target_sheet}!A:T"  # Optimized to 20 columns
-            result = self.service.spreadsheets().values().get(
+            result = _execute_with_backoff(self.service.spreadsheets().values().get(
                 spreadsheetId=self.spreadsheet_id,
                 range=range_name
-            ).execute()
+            ))
             
             values = result.get('values', [])
             
@@ -194,6 +241,39 @@ class GoogleSheetsService:
             print(f"An error occurred fetching listings: {error}")
             return []
     
+    def _refresh_listing_index(self, force: bool = False):
+        """Rebuild id→listing index nếu quá TTL (hoặc force)"""
+        now = time.monotonic()
+        if not force and self._listing_index and now - self._listing_index_at < self.LISTING_INDEX_TTL:
+            return
+        self._listing_index = {
+            listing['id']: listing
+            for listing in self.get_all_listings()
+            if listing.get('id')
+        }
+        self._listing_index_at = now
+
+    def get_listings_by_ids(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Batch lookup listings theo ID qua cached index
+
+        Một lần download sheet phục vụ nhiều lookup trong TTL window,
+        thay vì get_all_listings() + linear scan cho mỗi request.
+        Index được refresh lại một lần nếu có ID chưa thấy (row mới).
+        """
+        self._refresh_listing_index()
+        wanted = set(ids)
+        found = {i: self._listing_index[i] for i in wanted if i in self._listing_index}
+
+        if len(found) < len(wanted):
+            self._refresh_listing_index(force=True)
+            found = {i: self._listing_index[i] for i in wanted if i in self._listing_index}
+
+        return found
+
+    def get_listing_by_id(self, listing_id: str) -> Optional[Dict[str, Any]]:
+        """Single listing lookup backed by cùng index"""
+        return self.get_listings_by_ids([listing_id]).get(listing_id)
+
     def update_listing(self, row: int, listing_data: Dict[str, Any]) -> bool:
         """Update a specific listing in Google Sheets or fallback data"""
         if self.use_fallback:
@@ -228,12 +308,12 @@ class GoogleSheetsService:
                 'values': values
             }
             
-            result = self.service.spreadsheets().values().update(
+            result = _execute_with_backoff(self.service.spreadsheets().values().update(
                 spreadsheetId=self.spreadsheet_id,
                 range=range_name,
                 valueInputOption='USER_ENTERED',
                 body=body
-            ).execute()
+            ))
             
             return True
             
@@ -271,13 +351,13 @@ class GoogleSheetsService:
                 'values': values
             }
             
-            result = self.service.spreadsheets().values().append(
+            result = _execute_with_backoff(self.service.spreadsheets().values().append(
                 spreadsheetId=self.spreadsheet_id,
                 range=f"{self.sheet_name}!A:J",
                 valueInputOption='USER_ENTERED',
                 insertDataOption='INSERT_ROWS',
                 body=body
-            ).execute()
+            ))
             
             return True
             
@@ -285,68 +365,91 @@ class GoogleSheetsService:
             print(f"An error occurred adding listing: {error}")
             return False
     
+    # field → cột trong listings sheet (A..J layout của update/add paths)
+    _LISTING_COLUMNS = {
+        'title': 'B',
+        'description': 'C',
+        'category': 'D',
+        'price': 'E',
+        'quantity': 'F',
+        'keywords': 'G',
+        'status': 'H',
+        'item_specifics': 'I',
+    }
+
     def batch_update_listings(self, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Batch update multiple listings"""
+        """Batch update listings - nhận partial records keyed by id/sheet_row
+
+        Chỉ các field có mặt trong mỗi update được ghi (per-cell ranges
+        trong một values.batchUpdate), nên caller gửi patch dict nhỏ
+        thay vì copy cả listing với description multi-KB.
+        """
         if self.use_fallback:
-            # Update in fallback data
+            # Merge partial update vào fallback data
             success_count = 0
             for update in updates:
-                row = update.get('sheet_row')
-                if row:
-                    for i, listing in enumerate(self.fallback_data):
-                        if listing.get('sheet_row') == row:
-                            self.fallback_data[i].update(update)
-                            success_count += 1
-                            break
+                for i, listing in enumerate(self.fallback_data):
+                    row_match = update.get('sheet_row') and listing.get('sheet_row') == update.get('sheet_row')
+                    id_match = update.get('id') and listing.get('id') == update.get('id')
+                    if row_match or id_match:
+                        self.fallback_data[i].update(update)
+                        success_count += 1
+                        break
             return {'success': success_count, 'failed': len(updates) - success_count}
-            
+
         if not self.service or not self.spreadsheet_id:
             return {'success': 0, 'failed': len(updates)}
-        
+
         success_count = 0
         failed_count = 0
-        
+
         try:
-            # Prepare batch update data
+            # Per-cell ranges cho các field thay đổi - payload chỉ chứa
+            # cells thực sự được ghi
             data = []
             for update in updates:
                 row = update.get('sheet_row')
-                if row:
-                    values = [[
-                        update.get('id', ''),
-                        update.get('title', ''),
-                        update.get('description', ''),
-                        update.get('category', ''),
-                        str(update.get('price', '')),
-                        str(update.get('quantity', '')),
-                        ','.join(update.get('keywords', [])) if update.get('keywords') else '',
-                        update.get('status', ListingStatus.OPTIMIZED),
-                        json.dumps(update.get('item_specifics', {})) if update.get('item_specifics') else '{}',
-                        datetime.now().isoformat()
-                    ]]
-                    
+                if not row:
+                    continue
+
+                for field, col in self._LISTING_COLUMNS.items():
+                    if field not in update:
+                        continue
+                    value = update[field]
+                    if field == 'keywords':
+                        value = ','.join(value) if value else ''
+                    elif field == 'item_specifics':
+                        value = json.dumps(value) if value else '{}'
+                    elif field in ('price', 'quantity'):
+                        value = str(value)
                     data.append({
-                        'range': f"{self.sheet_name}!A{row}:J{row}",
-                        'values': values
+                        'range': f"{self.sheet_name}!{col}{row}",
+                        'values': [[value]]
                     })
-            
+
+                # Last Updated luôn được stamp
+                data.append({
+                    'range': f"{self.sheet_name}!J{row}",
+                    'values': [[datetime.now().isoformat()]]
+                })
+                success_count += 1
+
             if data:
                 body = {
                     'valueInputOption': 'USER_ENTERED',
                     'data': data
                 }
-                
-                result = self.service.spreadsheets().values().batchUpdate(
+
+                result = _execute_with_backoff(self.service.spreadsheets().values().batchUpdate(
                     spreadsheetId=self.spreadsheet_id,
                     body=body
-                ).execute()
-                
-                success_count = len(data)
-            
+                ))
+
         except HttpError as error:
             print(f"An error occurred in batch update: {error}")
+            success_count = 0
             failed_count = len(updates)
-        
+
         return {
             'success': success_count,
             'failed': failed_count
@@ -361,9 +464,9 @@ class GoogleSheetsService:
         
         try:
             # Check if sheet exists
-            spreadsheet = self.service.spreadsheets().get(
+            spreadsheet = _execute_with_backoff(self.service.spreadsheets().get(
                 spreadsheetId=self.spreadsheet_id
-            ).execute()
+            ))
             
             sheet_exists = any(
                 sheet['properties']['title'] == target_sheet 
@@ -382,10 +485,10 @@ class GoogleSheetsService:
                     }]
                 }
                 
-                self.service.spreadsheets().batchUpdate(
+                _execute_with_backoff(self.service.spreadsheets().batchUpdate(
                     spreadsheetId=self.spreadsheet_id,
                     body=request_body
-                ).execute()
+                ))
                 
                 print(f"✅ Created new sheet: {target_sheet}")
             
@@ -401,12 +504,12 @@ class GoogleSheetsService:
             last_column = chr(ord('A') + len(headers) - 1)
             range_name = f"{target_sheet}!A1:{last_column}1"
             
-            self.service.spreadsheets().values().update(
+            _execute_with_backoff(self.service.spreadsheets().values().update(
                 spreadsheetId=self.spreadsheet_id,
                 range=range_name,
                 valueInputOption='USER_ENTERED',
                 body=body
-            ).execute()
+            ))
             
             print(f"✅ Headers added to {target_sheet}: {len(headers)} columns")
             return True
@@ -491,10 +594,10 @@ class GoogleSheetsService:
         
         try:
             range_name = f"{target_sheet}!A:K"  # Orders may have more columns
-            result = self.service.spreadsheets().values().get(
+            result = _execute_with_backoff(self.service.spreadsheets().values().get(
                 spreadsheetId=self.spreadsheet_id,
                 range=range_name
-            ).execute()
+            ))
             
             values = result.get('values', [])
             if not values:
@@ -563,10 +666,10 @@ class GoogleSheetsService:
         
         try:
             range_name = f"{target_sheet}!A:H"  # Sources have different column structure
-            result = self.service.spreadsheets().values().get(
+            result = _execute_with_backoff(self.service.spreadsheets().values().get(
                 spreadsheetId=self.spreadsheet_id,
                 range=range_name
-            ).execute()
+            ))
             
             values = result.get('values', [])
             if not values:
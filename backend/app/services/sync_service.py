@@ -4,20 +4,37 @@ Hybrid architecture: SQLite as primary, Google Sheets as backup/collaboration
 """
 
 import json
+import time
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func
 
 from app.db.database import SessionLocal
-from app.services.google_sheets import GoogleSheetsService
+from app.services.google_sheets import GoogleSheetsService, _execute_with_backoff
 from app.core.config import settings
 from app.repositories import listing_repo, order_repo, source_repo, account_repo
 from app.models.database_models import (
-    Listing, Order, Source, Account, ActivityLog,
+    Listing, Order, Source, Account, ActivityLog, SystemSetting,
     ListingStatusEnum, OrderStatusEnum, SourceStatusEnum, AccountStatusEnum
 )
 
+# Sync config persist dưới dạng global system_settings row (user_id NULL);
+# mỗi process giữ bản cache với TTL ngắn nên đọc config không tốn DB hit
+_SYNC_CONFIG_KEY = "sync_config"
+_SYNC_CONFIG_TTL = 30.0
+
+# Token no-op-sync chỉ tin trong cửa sổ ngắn: phía Sheets chỉ nhìn thấy
+# grid metadata (edit cell in-place không đổi rowCount) nên sau TTL vẫn
+# sync đầy đủ để không bỏ sót thay đổi từ collaborator
+_SYNC_TOKEN_TTL = 300.0
+
+# Action tuples cho các query last-sync - hằng module thay vì list literal
+# build lại mỗi call; .in_() nhận tuple y như list
+_ALL_SYNC_ACTIONS = ("sync_export", "sync_import", "full_sync")
+_EXPORT_ACTIONS = ("sync_export", "full_sync")
+_IMPORT_ACTIONS = ("sync_import", "full_sync")
+
 
 class SyncService:
     """
@@ -35,7 +52,90 @@ class SyncService:
             "dry_run_mode": False
         }
         self._backup_data = {}  # Store backup data
-    
+        self._config_loaded_at = 0.0  # monotonic; 0 = chưa load từ DB
+        # user_id -> (monotonic_ts, change token) của lần full sync cuối
+        self._last_sync_token: Dict[int, Tuple[float, Tuple]] = {}
+
+    def load_sync_config(self, db: Session, force: bool = False) -> Dict[str, Any]:
+        """Refresh sync_config từ system_settings nếu cache quá TTL
+
+        Config trước đây chỉ sống trong dict process-local, nên khi chạy
+        nhiều worker thì PUT /config chỉ đổi được một worker. Persist vào
+        system_settings làm source of truth; các worker khác pick up thay
+        đổi trong vòng _SYNC_CONFIG_TTL giây.
+        """
+        now = time.monotonic()
+        if not force and now - self._config_loaded_at < _SYNC_CONFIG_TTL:
+            return self.sync_config
+
+        row = db.query(SystemSetting).filter(
+            SystemSetting.user_id.is_(None),
+            SystemSetting.key == _SYNC_CONFIG_KEY
+        ).first()
+        if row and isinstance(row.value, dict):
+            # Merge lên defaults để key thêm sau này vẫn có giá trị
+            self.sync_config.update(row.value)
+        self._config_loaded_at = now
+        return self.sync_config
+
+    def save_sync_config(self, db: Session, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply updates và persist toàn bộ config vào system_settings"""
+        self.load_sync_config(db, force=True)
+        self.sync_config.update(updates)
+
+        row = db.query(SystemSetting).filter(
+            SystemSetting.user_id.is_(None),
+            SystemSetting.key == _SYNC_CONFIG_KEY
+        ).first()
+        if row:
+            row.value = dict(self.sync_config)
+        else:
+            db.add(SystemSetting(
+                key=_SYNC_CONFIG_KEY,
+                value=dict(self.sync_config),
+                category="sync",
+                description="Bi-directional SQLite ↔ Sheets sync configuration"
+            ))
+        db.commit()
+        self._config_loaded_at = time.monotonic()
+        return self.sync_config
+
+    def _change_token(self, db: Session, user_id: int) -> Optional[Tuple]:
+        """Token rẻ tiền đại diện cho trạng thái hai phía của sync
+
+        Phía SQLite: max(updated_at) + count listings của user (một
+        aggregate query). Phía Sheets: grid metadata (sheetId, rowCount,
+        columnCount) qua spreadsheets.get fields - vài trăm byte thay vì
+        download toàn bộ values. Trả None khi không chắc chắn (fallback
+        mode, lỗi API) để caller không bao giờ skip nhầm.
+        """
+        try:
+            if self.sheets_service.use_fallback or not self.sheets_service.service:
+                return None
+
+            max_updated, listing_count = db.query(
+                func.max(Listing.updated_at), func.count(Listing.id)
+            ).filter(Listing.user_id == user_id).first()
+
+            result = _execute_with_backoff(
+                self.sheets_service.service.spreadsheets().get(
+                    spreadsheetId=self.sheets_service.spreadsheet_id,
+                    fields="sheets(properties(sheetId,gridProperties(rowCount,columnCount)))"
+                )
+            )
+            sheets_meta = tuple(
+                (
+                    sheet["properties"].get("sheetId"),
+                    sheet["properties"].get("gridProperties", {}).get("rowCount"),
+                    sheet["properties"].get("gridProperties", {}).get("columnCount")
+                )
+                for sheet in result.get("sheets", [])
+            )
+            return (max_updated, listing_count, sheets_meta)
+
+        except Exception:
+            return None
+
     def _create_backup(self, db: Session, user_id: int, entity_type: str) -> bool:
         """Create backup before sync operation"""
         try:
@@ -65,7 +165,7 @@ class SyncService:
             last_sync = db.query(ActivityLog).filter(
                 and_(
                     ActivityLog.user_id == user_id,
-                    ActivityLog.action.in_(["sync_export", "sync_import", "full_sync"]),
+                    ActivityLog.action.in_(_ALL_SYNC_ACTIONS),
                     ActivityLog.entity_type == entity_type,
                     ActivityLog.success == True
                 )
@@ -294,6 +394,7 @@ class SyncService:
             activity = ActivityLog(
                 user_id=user_id,
                 action="sync_export",
+                action_category=1,
                 entity_type="listings",
                 description=f"Smart export: {success_count} new items to Sheets, {len(merge_result['conflicts'])} conflicts detected",
                 success=True,
@@ -304,9 +405,11 @@ class SyncService:
                     "merge_strategy": self.sync_config["conflict_resolution"]
                 }
             )
+            # Flush thay vì commit riêng - activity row ride cùng commit
+            # cuối của caller (job-status update), bớt một fsync mỗi sync
             db.add(activity)
-            db.commit()
-            
+            db.flush()
+
             return {
                 "success": True,
                 "message": f"Smart sync completed: {success_count} new items exported",
@@ -318,18 +421,20 @@ class SyncService:
             }
             
         except Exception as e:
-            # Log error
+            # Log error - rollback trước vì session có thể đang dirty
+            db.rollback()
             activity = ActivityLog(
                 user_id=user_id,
                 action="sync_export",
+                action_category=1,
                 entity_type="listings",
                 description=f"Failed to export listings to Google Sheets",
                 success=False,
                 error_message=str(e)
             )
             db.add(activity)
-            db.commit()
-            
+            db.flush()
+
             return {"success": False, "message": f"Sync failed: {str(e)}"}
     
     def sync_listings_from_sheets(self, db: Session, user_id: int, sheet_name: Optional[str] = None) -> Dict[str, Any]:
@@ -440,6 +545,7 @@ class SyncService:
             activity = ActivityLog(
                 user_id=user_id,
                 action="sync_import",
+                action_category=1,
                 entity_type="listings",
                 description=f"Smart import: {imported_count} new from Sheets, {updated_count} conflicts resolved",
                 success=len(errors) == 0,
@@ -452,8 +558,8 @@ class SyncService:
                 }
             )
             db.add(activity)
-            db.commit()
-            
+            db.flush()
+
             return {
                 "success": True,
                 "message": f"Smart import completed: {imported_count} new items, {updated_count} conflicts resolved",
@@ -465,18 +571,20 @@ class SyncService:
             }
             
         except Exception as e:
-            # Log error
+            # Log error - rollback trước vì session có thể đang dirty
+            db.rollback()
             activity = ActivityLog(
                 user_id=user_id,
                 action="sync_import",
+                action_category=1,
                 entity_type="listings",
                 description=f"Failed to import listings from Google Sheets",
                 success=False,
                 error_message=str(e)
             )
             db.add(activity)
-            db.commit()
-            
+            db.flush()
+
             return {"success": False, "message": f"Import failed: {str(e)}"}
     
     def should_update_from_sheets(self, sqlite_listing: Listing, sheets_listing: Dict[str, Any]) -> bool:
@@ -708,6 +816,8 @@ class SyncService:
         Perform full synchronization with smart merge
         direction: "to_sheets", "from_sheets", "bidirectional"
         """
+        # Pick up conflict_resolution mới nhất từ DB trước khi merge
+        self.load_sync_config(db)
         results = {
             "success": True,
             "message": "Smart bidirectional sync completed",
@@ -722,8 +832,20 @@ class SyncService:
         try:
             # Đặc biệt xử lý bidirectional để tránh mất dữ liệu
             if direction == "bidirectional":
+                # Bước 0: short-circuit khi không có gì đổi từ lần sync
+                # trước - một aggregate query + một metadata fetch thay
+                # vì download toàn bộ sheets để rồi merge ra no-op
+                token = self._change_token(db, user_id)
+                cached = self._last_sync_token.get(user_id)
+                if (token is not None and cached is not None
+                        and time.monotonic() - cached[0] < _SYNC_TOKEN_TTL
+                        and cached[1] == token):
+                    results["message"] = "No changes since last sync - skipped"
+                    results["skipped"] = True
+                    return results
+
                 # Thực hiện smart sync thông minh
-                
+
                 # Bước 1: Phân tích trước khi sync
                 sqlite_result = listing_repo.get_multi(db, skip=0, limit=1000, user_id=user_id)
                 sqlite_listings = sqlite_result["items"]
@@ -788,6 +910,7 @@ class SyncService:
             sync_activity = ActivityLog(
                 user_id=user_id,
                 action="full_sync",
+                action_category=1,
                 entity_type="system",
                 description=f"Smart {direction} sync: {results['summary']['total_new_items']} new items, {results['summary']['total_conflicts_resolved']} conflicts resolved",
                 success=True,
@@ -799,10 +922,17 @@ class SyncService:
                 }
             )
             db.add(sync_activity)
-            db.commit()
-            
+            db.flush()
+
+            # Ghi lại token sau sync thành công - lần full sync kế tiếp
+            # trong cửa sổ TTL mà hai phía không đổi sẽ được skip
+            if direction == "bidirectional":
+                token = self._change_token(db, user_id)
+                if token is not None:
+                    self._last_sync_token[user_id] = (time.monotonic(), token)
+
             return results
-            
+
         except Exception as e:
             results["success"] = False
             results["message"] = f"Full sync failed: {str(e)}"
@@ -817,14 +947,14 @@ class SyncService:
             last_export = db.query(ActivityLog).filter(
                 and_(
                     ActivityLog.user_id == user_id,
-                    ActivityLog.action.in_(["sync_export", "full_sync"])
+                    ActivityLog.action.in_(_EXPORT_ACTIONS)
                 )
             ).order_by(ActivityLog.created_at.desc()).first()
             
             last_import = db.query(ActivityLog).filter(
                 and_(
                     ActivityLog.user_id == user_id,
-                    ActivityLog.action.in_(["sync_import", "full_sync"])
+                    ActivityLog.action.in_(_IMPORT_ACTIONS)
                 )
             ).order_by(ActivityLog.created_at.desc()).first()
             
@@ -866,17 +996,20 @@ class SyncService:
         """
         Schedule automatic synchronization (to be called by background task)
         """
-        if not self.sync_config["enabled"]:
-            return False
-        
         try:
             db = SessionLocal()
-            
+
+            if not self.load_sync_config(db)["enabled"]:
+                db.close()
+                return False
+
             # Perform bidirectional sync
             result = self.full_sync(db, user_id, "bidirectional")
-            
+
+            # full_sync chỉ flush activity log - commit trước khi đóng session
+            db.commit()
             db.close()
-            
+
             return result["success"]
             
         except Exception as e:
@@ -0,0 +1,56 @@
+"""
+Draft Listings Full-Text Search Migration
+Adds a generated tsvector column + GIN index on PostgreSQL deployments
+so search_drafts uses an index lookup instead of LIKE '%q%' table scans.
+SQLite (default dev database) keeps the LIKE fallback and is skipped here.
+"""
+
+from sqlalchemy import text
+from app.db.database import engine
+
+
+def upgrade():
+    """Add search_tsv generated column and GIN index (PostgreSQL only)"""
+    if engine.dialect.name != "postgresql":
+        print("⚠️  Skipping: full-text search index requires PostgreSQL "
+              f"(current dialect: {engine.dialect.name})")
+        return
+
+    print("🚀 Creating draft_listings full-text search index...")
+
+    with engine.begin() as conn:
+        conn.execute(text("""
+            ALTER TABLE draft_listings
+            ADD COLUMN IF NOT EXISTS search_tsv tsvector
+            GENERATED ALWAYS AS (
+                to_tsvector('english', coalesce(title,'') || ' ' || coalesce(description,''))
+            ) STORED;
+        """))
+
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_drafts_tsv
+            ON draft_listings USING GIN(search_tsv);
+        """))
+
+    print("✅ Full-text search index created successfully")
+
+
+def downgrade():
+    """Drop search_tsv column and index"""
+    if engine.dialect.name != "postgresql":
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX IF EXISTS ix_drafts_tsv;"))
+        conn.execute(text("ALTER TABLE draft_listings DROP COLUMN IF EXISTS search_tsv;"))
+
+    print("✅ Full-text search index dropped successfully")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "downgrade":
+        downgrade()
+    else:
+        upgrade()
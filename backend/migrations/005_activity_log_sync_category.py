@@ -0,0 +1,65 @@
+"""
+Activity Log Sync Category Migration
+Adds an indexed integer action_category column (0 = non-sync, 1 = sync) so
+sync-history queries filter on a small indexed int instead of an IN-list of
+action strings, which forced a full scan of the log table.
+"""
+
+from sqlalchemy import text
+from app.db.database import engine
+
+SYNC_ACTIONS = (
+    "sync_export", "sync_import", "full_sync", "sync_listings", "sync_orders"
+)
+
+
+def _column_exists(conn) -> bool:
+    if engine.dialect.name == "sqlite":
+        rows = conn.execute(text("PRAGMA table_info(activity_logs)")).fetchall()
+        return any(row[1] == "action_category" for row in rows)
+    rows = conn.execute(text("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_name = 'activity_logs' AND column_name = 'action_category'
+    """)).fetchall()
+    return bool(rows)
+
+
+def upgrade():
+    """Add action_category column, backfill from action, create index"""
+    print("🚀 Adding activity_logs.action_category...")
+
+    with engine.begin() as conn:
+        if not _column_exists(conn):
+            conn.execute(text(
+                "ALTER TABLE activity_logs "
+                "ADD COLUMN action_category SMALLINT NOT NULL DEFAULT 0"
+            ))
+
+        # Backfill: one UPDATE with a CASE instead of per-row writes
+        placeholders = ", ".join(f"'{action}'" for action in SYNC_ACTIONS)
+        conn.execute(text(f"""
+            UPDATE activity_logs
+            SET action_category = CASE
+                WHEN action IN ({placeholders}) THEN 1 ELSE 0
+            END
+        """))
+
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_activity_user_cat_ts
+            ON activity_logs(user_id, action_category, created_at)
+        """))
+
+    print("✅ action_category column and index created successfully")
+
+
+def downgrade():
+    """Drop action_category index and column"""
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX IF EXISTS idx_activity_user_cat_ts"))
+        conn.execute(text("ALTER TABLE activity_logs DROP COLUMN action_category"))
+
+    print("✅ action_category column and index dropped successfully")
+
+
+if __name__ == "__main__":
+    upgrade()
@@ -0,0 +1,48 @@
+"""
+Backup/Sync Composite Indexes Migration
+Adds composite (timestamp, id) indexes on orders and listings so the backup
+and sync paths that ORDER BY created_at/updated_at with LIMIT/OFFSET are
+index-backed instead of scanning the full table. The indexes are also
+declared in the model __table_args__ for fresh databases; this migration
+covers databases created before that change.
+"""
+
+from sqlalchemy import text
+from app.db.database import engine
+
+
+def upgrade():
+    """Create composite indexes for backup/sync queries"""
+    print("🚀 Creating backup/sync composite indexes...")
+
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_order_created_id
+            ON orders(created_at, id)
+        """))
+
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_listing_created_id
+            ON listings(created_at, id)
+        """))
+
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_listing_updated_id
+            ON listings(updated_at, id)
+        """))
+
+    print("✅ Backup/sync composite indexes created successfully")
+
+
+def downgrade():
+    """Drop backup/sync composite indexes"""
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX IF EXISTS idx_order_created_id"))
+        conn.execute(text("DROP INDEX IF EXISTS idx_listing_created_id"))
+        conn.execute(text("DROP INDEX IF EXISTS idx_listing_updated_id"))
+
+    print("✅ Backup/sync composite indexes dropped successfully")
+
+
+if __name__ == "__main__":
+    upgrade()